@@ -0,0 +1,39 @@
+import random
+import time
+from datetime import datetime
+from services.leave_index import LeaveIntervalIndex
+from services.risk_engine import score_task, score_tasks, score_columns, TaskColumns
+from test_risk_engine_parity import generate_tasks, generate_leaves
+
+
+def best_of(runs, fn):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    rng = random.Random(7)
+    base = datetime(2026, 3, 15)
+    today = base.date()
+    leave_index = LeaveIntervalIndex.from_leaves(generate_leaves(rng, base))
+
+    print(f"{'tasks':>8} | {'per-task (ms)':>14} | {'vectorized (ms)':>16} | {'rules only (ms)':>16} | {'speedup':>8}")
+    print("-" * 75)
+    for count in [1_000, 10_000, 100_000]:
+        tasks = generate_tasks(rng, count, base)
+        runs = 5 if count < 100_000 else 3
+
+        scalar_ms = best_of(runs, lambda: [score_task(task, today, leave_index) for task in tasks])
+        vector_ms = best_of(runs, lambda: score_tasks(tasks, today, leave_index))
+        # Rule evaluation alone, once the columns are built
+        columns = TaskColumns(tasks)
+        rules_ms = best_of(runs, lambda: score_columns(columns, today, leave_index))
+        print(f"{count:>8} | {scalar_ms:>14.1f} | {vector_ms:>16.1f} | {rules_ms:>16.1f} | {scalar_ms / vector_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
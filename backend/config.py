@@ -8,6 +8,8 @@ class Settings:
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # Lifetime of the ticket EventSource passes in /api/events?ticket=
+    EVENTS_TICKET_EXPIRE_SECONDS: int = int(os.getenv("EVENTS_TICKET_EXPIRE_SECONDS", "60"))
     
     # MongoDB Configuration
     MONGODB_URL: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
@@ -39,6 +41,32 @@ class Settings:
     
 
     
+    # Risk analysis coordination
+    RISK_DEBOUNCE_SECONDS: float = float(os.getenv("RISK_DEBOUNCE_SECONDS", "2"))
+    REPORT_RISK_MAX_AGE_SECONDS: float = float(os.getenv("REPORT_RISK_MAX_AGE_SECONDS", "300"))
+
+    # Resolved risk alerts stay in risk_alerts this long, then move to risk_alerts_archive
+    RISK_ALERT_RETENTION_DAYS: int = int(os.getenv("RISK_ALERT_RETENTION_DAYS", "30"))
+    # Archived alerts expire (TTL index) after this many days
+    RISK_ARCHIVE_TTL_DAYS: int = int(os.getenv("RISK_ARCHIVE_TTL_DAYS", "365"))
+    # Risk score history points expire after this many days
+    RISK_HISTORY_RETENTION_DAYS: int = int(os.getenv("RISK_HISTORY_RETENTION_DAYS", "180"))
+    # Tombstones of tasks removed by sync, kept for incremental BI extracts
+    TASK_DELETION_RETENTION_DAYS: int = int(os.getenv("TASK_DELETION_RETENTION_DAYS", "90"))
+
+    # Generated report data cache: in-process LRU size, and lifetime of the shared Mongo tier
+    REPORT_CACHE_MAX_ENTRIES: int = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "256"))
+    REPORT_CACHE_TTL_SECONDS: int = int(os.getenv("REPORT_CACHE_TTL_SECONDS", "86400"))
+
+    # Background report jobs: concurrent generators per process, and jobs in flight per user
+    REPORT_JOB_WORKERS: int = int(os.getenv("REPORT_JOB_WORKERS", "2"))
+    REPORT_JOBS_PER_USER: int = int(os.getenv("REPORT_JOBS_PER_USER", "3"))
+
+    # CPU-bound work (risk scoring) runs in a process pool; 0 keeps it on the event loop
+    COMPUTE_WORKERS: int = int(os.getenv("COMPUTE_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+    # Batches smaller than this are cheaper to compute inline than to ship to a worker
+    COMPUTE_INLINE_MAX_TASKS: int = int(os.getenv("COMPUTE_INLINE_MAX_TASKS", "2000"))
+
     # Updated MongoDB Configuration for new structure
     MONGO_URI: str = os.getenv("MONGO_URI", "mongodb://localhost:27017")
     MONGO_DB: str = os.getenv("MONGO_DB", "multiDeskDB")
@@ -1,5 +1,10 @@
 import logging
+from datetime import datetime
 from .mongodb import get_database
+from config import settings
+from pymongo import UpdateOne
+from models.task_status import status_category_expression, STATUS_CATEGORY_DONE
+from models.tasks import summary_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +32,113 @@ async def init_database():
         await report_summaries_collection.create_index([("report_id", 1)])
         logger.info("Report summaries collection indexes created")
         
+        # Generated report data cache (second tier), expired by TTL
+        await db.report_cache.create_index([("created_at", 1)], expireAfterSeconds=settings.REPORT_CACHE_TTL_SECONDS)
+        await db.report_cache.create_index([("user_id", 1)])
+        logger.info("Report cache collection indexes created")
+        
+        # Background report jobs (per-user cap counts the active ones)
+        await db.report_jobs.create_index([("user_id", 1), ("status", 1)])
+        await db.report_jobs.create_index([("status", 1), ("heartbeat_at", 1)])
+        await db.report_jobs.create_index([("created_at", 1)], expireAfterSeconds=7 * 24 * 3600)
+        logger.info("Report jobs collection indexes created")
+        
+        # Create indexes for jira_tasks collection (search)
+        tasks_collection = db.jira_tasks
+        await tasks_collection.create_index([("user_id", 1), ("key", 1)])
+        await tasks_collection.create_index(
+            [("user_id", 1), ("summary", "text"), ("key", "text")],
+            weights={"key": 10, "summary": 1},
+            name="user_task_text_search"
+        )
+        await tasks_collection.create_index([("user_id", 1), ("summary_tokens", 1)])
+        await tasks_collection.create_index([("user_id", 1), ("status_category", 1)])
+        await tasks_collection.create_index([("user_id", 1), ("is_open", 1), ("duedate", 1)])
+        await tasks_collection.create_index([("user_id", 1), ("created", 1)])
+        await tasks_collection.create_index([("user_id", 1), ("resolved", 1)])
+        await tasks_collection.create_index([("user_id", 1), ("modified_at", 1)])
+        await tasks_collection.create_index([("user_id", 1), ("jira_id", 1)])
+        await tasks_collection.create_index([("user_id", 1), ("assignee_account_id", 1)])
+        await tasks_collection.create_index([("user_id", 1), ("is_open", 1), ("risk_next_change", 1)])
+        logger.info("Jira tasks collection indexes created")
+        
+        # Create indexes for task_deletions collection (tombstones for incremental extracts)
+        await db.task_deletions.create_index([("user_id", 1), ("deleted_at", 1)])
+        await db.task_deletions.create_index(
+            [("deleted_at", 1)],
+            expireAfterSeconds=settings.TASK_DELETION_RETENTION_DAYS * 24 * 3600
+        )
+        logger.info("Task deletions collection indexes created")
+        
+        # Create indexes for task_daily_rollups collection
+        await db.task_daily_rollups.create_index([("user_id", 1), ("day", -1)], unique=True)
+        logger.info("Task daily rollups collection indexes created")
+        
+        # Create indexes for leaves collection (risk analysis loads a tenant's leaves at once)
+        await db.leaves.create_index([("user_id", 1), ("employee_account_id", 1)])
+        await db.leaves.create_index([("file_id", 1)])
+        logger.info("Leaves collection indexes created")
+        
+        # Create indexes for risk_alerts collection (incremental runs look alerts up by task key)
+        await db.risk_alerts.create_index([("user_id", 1), ("task_key", 1), ("assignee_account_id", 1)])
+        await db.risk_alerts.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+        await db.risk_alerts.create_index([("user_id", 1), ("status", 1), ("resolved_at", 1)])
+        logger.info("Risk alerts collection indexes created")
+        
+        # Archive of resolved alerts, expired by TTL
+        await db.risk_alerts_archive.create_index(
+            [("archived_at", 1)],
+            expireAfterSeconds=settings.RISK_ARCHIVE_TTL_DAYS * 24 * 3600
+        )
+        await db.risk_alerts_archive.create_index([("user_id", 1), ("task_key", 1)])
+        logger.info("Risk alerts archive collection indexes created")
+        
+        # Risk score history: time-series buckets per (user, task), appended on score changes
+        if "risk_score_history" not in await db.list_collection_names(filter={"name": "risk_score_history"}):
+            await db.create_collection(
+                "risk_score_history",
+                timeseries={"timeField": "ts", "metaField": "meta", "granularity": "hours"},
+                expireAfterSeconds=settings.RISK_HISTORY_RETENTION_DAYS * 24 * 3600
+            )
+        await db.risk_score_history.create_index([("meta.user_id", 1), ("meta.task_key", 1), ("ts", 1)])
+        await db.risk_score_history.create_index([("meta.user_id", 1), ("ts", -1)])
+        logger.info("Risk score history collection created")
+        
+        # Backfill status_category / is_open on tasks stored before they were captured
+        backfill = await tasks_collection.update_many(
+            {"status_category": {"$exists": False}},
+            [
+                {"$set": {"status_category": status_category_expression("$status")}},
+                {"$set": {"is_open": {"$ne": ["$status_category", STATUS_CATEGORY_DONE]}}}
+            ]
+        )
+        if backfill.modified_count:
+            logger.info(f"Backfilled status category on {backfill.modified_count} tasks")
+        
+        # Backfill typeahead tokens (tokenized in Python so they match what sync stores)
+        token_writes = []
+        async for doc in tasks_collection.find({"summary_tokens": {"$exists": False}}, {"summary": 1}):
+            token_writes.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"summary_tokens": summary_tokens(doc.get("summary"))}}))
+            if len(token_writes) >= 1000:
+                await tasks_collection.bulk_write(token_writes, ordered=False)
+                token_writes = []
+        if token_writes:
+            await tasks_collection.bulk_write(token_writes, ordered=False)
+        
+        # The risk list pages on (created_at, _id): give legacy alerts without a usable
+        # created_at the ObjectId's generation time (epoch when _id is not an ObjectId)
+        epoch = datetime(1970, 1, 1)
+        id_time = {"$convert": {"input": "$_id", "to": "date", "onError": epoch, "onNull": epoch}}
+        alerts_backfill = await db.risk_alerts.update_many(
+            {"created_at": {"$not": {"$type": "date"}}},
+            [{"$set": {"created_at": {"$convert": {"input": "$created_at", "to": "date", "onError": id_time, "onNull": id_time}}}}]
+        )
+        if alerts_backfill.modified_count:
+            logger.info(f"Backfilled created_at on {alerts_backfill.modified_count} risk alerts")
+        
+        # Tasks stored before modified_at was tracked count as modified now
+        await tasks_collection.update_many({"modified_at": {"$exists": False}}, {"$set": {"modified_at": datetime.utcnow()}})
+        
         logger.info("Database initialization completed successfully")
         
     except Exception as e:
@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime
+from db import connect_to_mongo, close_mongo_connection
+from services.columnar_export_service import columnar_export_service, DATASETS, EXPORT_FORMATS
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def export_tenant(user_id: str, datasets: list, export_format: str, out_dir: str, updated_since: datetime = None):
+    """Write a tenant's datasets as Parquet files or Arrow IPC streams, one file per dataset"""
+    try:
+        await connect_to_mongo()
+        os.makedirs(out_dir, exist_ok=True)
+        extension = EXPORT_FORMATS[export_format][1]
+
+        for dataset in datasets:
+            path = os.path.join(out_dir, f"{dataset}.{extension}")
+            if export_format == "parquet":
+                await columnar_export_service.write_parquet(user_id, dataset, path, updated_since)
+            else:
+                with open(path, "wb") as out:
+                    async for chunk in columnar_export_service.stream_arrow(user_id, dataset, updated_since):
+                        out.write(chunk)
+                logger.info(f"Exported {dataset} for user {user_id} to {path}")
+
+    except Exception as e:
+        logger.error(f"Export failed with error: {e}")
+        raise
+    finally:
+        # Clean up database connection
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a tenant's tasks, risks, leaves and rollups for BI tools")
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--datasets", default=",".join(DATASETS), help="Comma-separated: tasks,task_deletions,risks,leaves,rollups")
+    parser.add_argument("--format", dest="export_format", choices=list(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--out", default="exports", help="Output directory")
+    parser.add_argument("--updated-since", type=datetime.fromisoformat, default=None,
+                        help="Only rows created or updated since this UTC time (ISO 8601)")
+    args = parser.parse_args()
+
+    datasets = [name.strip() for name in args.datasets.split(",") if name.strip()]
+    unknown = [name for name in datasets if name not in DATASETS]
+    if unknown:
+        parser.error(f"Unknown datasets: {', '.join(unknown)}")
+
+    asyncio.run(export_tenant(args.user_id, datasets, args.export_format, args.out, args.updated_since))
@@ -16,6 +16,8 @@ from routers.files import router as files_router
 from routers.projects import router as projects_router
 from routers.reports import router as reports_router
 from routers import risks
+from routers.events import router as events_router
+from routers.exports import router as exports_router
 
 # Database
 from db import connect_to_mongo, close_mongo_connection
@@ -25,6 +27,8 @@ from db.mongodb import get_database
 # Services
 from services.jira_service import jira_service, JiraTask
 from services import scheduler_service
+from services.compute_executor import compute_executor
+from services.report_job_service import report_job_service
 
 # Logging
 logging.basicConfig(
@@ -44,10 +48,15 @@ async def lifespan(app: FastAPI):
     try:
         await connect_to_mongo()
         await init_database()
+        await report_job_service.recover()
+        report_job_service.start()
         logger.info("MongoDB connected")
     except Exception as e:
         logger.error(f"Mongo startup error: {e}")
 
+    # Worker processes for CPU-bound scoring
+    compute_executor.start()
+
     # Start scheduler in background (non-blocking)
     scheduler_task = asyncio.create_task(
         scheduler_service.start_scheduler()
@@ -57,6 +66,8 @@ async def lifespan(app: FastAPI):
 
     logger.info("Shutting down Multi Desk Backend...")
     scheduler_service.stop_scheduler()
+    report_job_service.shutdown()
+    compute_executor.shutdown()
     await close_mongo_connection()
     scheduler_task.cancel()
     logger.info("Shutdown complete")
@@ -87,6 +98,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing", "X-Report-Cache", "Content-Disposition"],
 )
 
 # =========================
@@ -101,6 +113,8 @@ app.include_router(files_router)
 app.include_router(projects_router)
 app.include_router(reports_router)
 app.include_router(risks.router)
+app.include_router(events_router)
+app.include_router(exports_router)
 
 # =========================
 # Root
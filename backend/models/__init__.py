@@ -24,7 +24,7 @@ from .jira import (
     FileUpload
 )
 from .dashboard import DashboardResponse
-from .tasks import TaskFilter, TaskResponse, TaskCreate, TaskUpdate
+from .tasks import TaskFilter, TaskResponse, TaskSuggestion, TaskSuggestResponse, TaskCreate, TaskUpdate
 from .users import UserFilter, UserListResponse, UserCreate, UserUpdate
 from .projects import ProjectFilter, JiraProjectResponse, ProjectListResponse
 from .files import FileFilter, FileListResponse, FileUploadResponse, FileDetailResponse
@@ -69,6 +69,8 @@ __all__ = [
     "DashboardResponse",
     "TaskFilter",
     "TaskResponse",
+    "TaskSuggestion",
+    "TaskSuggestResponse",
     "TaskCreate",
     "TaskUpdate",
     "UserFilter",
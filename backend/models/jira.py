@@ -34,9 +34,12 @@ class JiraTask(BaseModel):
     created: datetime
     updated: datetime
     duedate: Optional[datetime] = None
+    resolved: Optional[datetime] = None
     project_key: str
     project_name: str
     issue_type: str
+    status_category: Optional[str] = None  # todo / in_progress / done
+    is_open: Optional[bool] = None
     
 
 
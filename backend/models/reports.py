@@ -55,5 +55,19 @@ class ReportGenerationRequest(BaseModel):
     is_public: bool = False
 
 class ReportExportRequest(BaseModel):
-    format: str  # pdf, csv, excel
-    include_charts: bool = True
\ No newline at end of file
+    format: str  # csv, ndjson, excel (xlsx)
+    include_charts: bool = True
+    include_tasks: Optional[bool] = None  # append the report's task rows; defaults to on for the report's owner only
+
+class ReportJob(BaseModel):
+    """Background report generation; report_id is set once it completes"""
+    id: str
+    status: str  # queued, running, completed, failed, cancelled
+    progress: int = 0
+    stage: Optional[str] = None
+    report_type: str
+    name: str
+    report_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
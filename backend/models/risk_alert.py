@@ -1,4 +1,5 @@
 from pydantic import BaseModel, EmailStr
+from typing import Dict, List, Optional
 from datetime import date, datetime
 
 class RiskAlert(BaseModel):
@@ -12,3 +13,72 @@ class RiskAlert(BaseModel):
     status: str
     user_id: str  # Add user ownership
     created_at: datetime
+
+
+class RiskSummary(BaseModel):
+    """Alert counts for polling clients; version increases whenever they change"""
+    total: int = 0
+    by_level: Dict[str, int] = {}
+    latest_created_at: Optional[datetime] = None
+    latest_updated_at: Optional[datetime] = None
+    version: int = 0
+
+
+class RiskHistoryPoint(BaseModel):
+    """One change of a task's risk score"""
+    ts: datetime
+    score: int
+    risk_level: str
+    reasons: List[str] = []
+
+
+class RiskEscalation(BaseModel):
+    """Latest rise of a task's risk level within a window"""
+    task_key: str
+    ts: datetime
+    score: int
+    risk_level: str
+    previous_level: Optional[str] = None
+    reasons: List[str] = []
+
+
+class SimulatedLeave(BaseModel):
+    """Hypothetical leave for a what-if scenario"""
+    employee_account_id: str
+    leave_start: datetime
+    leave_end: datetime
+
+
+class TaskOverride(BaseModel):
+    """Hypothetical change to one open task; unset fields keep their current value"""
+    task_key: str
+    assignee_account_id: Optional[str] = None
+    duedate: Optional[datetime] = None
+    start_date: Optional[datetime] = None
+    story_points: Optional[float] = None
+    priority: Optional[str] = None
+    status: Optional[str] = None
+
+
+class RiskSimulationRequest(BaseModel):
+    leaves: List[SimulatedLeave] = []
+    task_overrides: List[TaskOverride] = []
+
+
+class RiskSimulationChange(BaseModel):
+    task_key: str
+    assignee_account_id: Optional[str] = None
+    score_before: int
+    score_after: int
+    level_before: str
+    level_after: str
+    reasons_added: List[str] = []
+    reasons_removed: List[str] = []
+
+
+class RiskSimulationResult(BaseModel):
+    """Score diff of a what-if scenario; nothing is stored"""
+    evaluated: int
+    changes: List[RiskSimulationChange] = []
+    by_level_before: Dict[str, int] = {}
+    by_level_after: Dict[str, int] = {}
@@ -0,0 +1,46 @@
+from typing import Optional
+
+# Normalized status categories stored on jira_tasks as "status_category"
+STATUS_CATEGORY_TODO = "todo"
+STATUS_CATEGORY_IN_PROGRESS = "in_progress"
+STATUS_CATEGORY_DONE = "done"
+
+STATUS_CATEGORIES = [STATUS_CATEGORY_TODO, STATUS_CATEGORY_IN_PROGRESS, STATUS_CATEGORY_DONE]
+
+# Jira statusCategory.key -> normalized category
+JIRA_STATUS_CATEGORY_MAP = {
+    "new": STATUS_CATEGORY_TODO,
+    "indeterminate": STATUS_CATEGORY_IN_PROGRESS,
+    "done": STATUS_CATEGORY_DONE,
+}
+
+# Fallback by status name when Jira did not send a category (older documents)
+DONE_STATUS_NAMES = ["done", "closed", "resolved"]
+TODO_STATUS_NAMES = ["to do", "todo", "open", "backlog", "new", "selected for development"]
+
+
+def normalize_status_category(status_name: Optional[str], category_key: Optional[str] = None) -> str:
+    """Map a Jira status (and its statusCategory key, if known) to todo/in_progress/done"""
+    if category_key in JIRA_STATUS_CATEGORY_MAP:
+        return JIRA_STATUS_CATEGORY_MAP[category_key]
+
+    name = (status_name or "").strip().lower()
+    if name in DONE_STATUS_NAMES:
+        return STATUS_CATEGORY_DONE
+    if name in TODO_STATUS_NAMES:
+        return STATUS_CATEGORY_TODO
+    return STATUS_CATEGORY_IN_PROGRESS
+
+
+def status_category_expression(status_field: str = "$status") -> dict:
+    """Aggregation expression equivalent of normalize_status_category's name fallback"""
+    lowered = {"$toLower": {"$ifNull": [status_field, ""]}}
+    return {
+        "$switch": {
+            "branches": [
+                {"case": {"$in": [lowered, DONE_STATUS_NAMES]}, "then": STATUS_CATEGORY_DONE},
+                {"case": {"$in": [lowered, TODO_STATUS_NAMES]}, "then": STATUS_CATEGORY_TODO},
+            ],
+            "default": STATUS_CATEGORY_IN_PROGRESS,
+        }
+    }
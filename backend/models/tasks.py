@@ -1,8 +1,16 @@
+import re
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
 from models.jira import JiraTask
 
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def summary_tokens(summary: Optional[str]) -> List[str]:
+    """Distinct lowercase words of a summary, stored as summary_tokens for prefix typeahead"""
+    return sorted(set(WORD_PATTERN.findall((summary or "").lower())))
+
 class TaskFilter(BaseModel):
     search: Optional[str] = None
     status: Optional[str] = None
@@ -18,6 +26,15 @@ class TaskResponse(BaseModel):
     page: int
     size: int
 
+class TaskSuggestion(BaseModel):
+    id: str
+    key: str
+    summary: str
+    status: str
+
+class TaskSuggestResponse(BaseModel):
+    suggestions: List[TaskSuggestion]
+
 class TaskCreate(BaseModel):
     summary: str
     project_key: str
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import Optional
 from models.dashboard import DashboardResponse
-from services.dashboard_service import dashboard_service
+from services.dashboard_service import dashboard_service, DashboardRequestContext, EISENHOWER_QUADRANTS
 from utils.dependencies import get_current_user
 import logging
 
@@ -58,13 +59,27 @@ async def get_analytics_data(current_user = Depends(get_current_user)):
         logger.error(f"Failed to get analytics data for user {current_user.id}: {e}")
         raise
 
+@router.get("/trends", response_model=dict)
+async def get_task_trends(
+    days: int = Query(30, ge=1, le=365, description="Number of days of history"),
+    current_user = Depends(get_current_user)
+):
+    """Get daily task counts (from sync rollups) for the current user"""
+    try:
+        trends = await dashboard_service.get_task_trends(current_user.id, days)
+        return {"days": days, "trends": trends}
+    except Exception as e:
+        logger.error(f"Failed to get task trends for user {current_user.id}: {e}")
+        raise
+
 @router.get("/", response_model=DashboardResponse)
-async def get_dashboard_data(current_user = Depends(get_current_user)):
+async def get_dashboard_data(response: Response, current_user = Depends(get_current_user)):
     """Get all dashboard data for the current user"""
     try:
-        stats = await dashboard_service.get_dashboard_stats(current_user.id)
-        eisenhower = await dashboard_service.get_eisenhower_matrix(current_user.id)
-        analytics = await dashboard_service.get_analytics_data(current_user.id)
+        # Sections run concurrently; stats and analytics share one $facet aggregation
+        context = DashboardRequestContext(current_user.id)
+        stats, eisenhower, analytics = await dashboard_service.get_dashboard(context)
+        response.headers["Server-Timing"] = context.server_timing()
         
         return DashboardResponse(
             stats=stats.dict(),
@@ -75,15 +90,30 @@ async def get_dashboard_data(current_user = Depends(get_current_user)):
         logger.error(f"Failed to get dashboard data for user {current_user.id}: {e}")
         raise
 
-@router.get("/eisenhower/view-all")
+@router.get("/eisenhower/view-all", response_model=dict)
 async def view_all_eisenhower(
-        quadrant: str,
-        current_user=Depends(get_current_user)
-    ):
+    quadrant: str,
+    limit: int = Query(50, ge=1, le=200, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    current_user = Depends(get_current_user)
+):
+    """Page through every task of one Eisenhower quadrant, in matrix order"""
+    if quadrant not in EISENHOWER_QUADRANTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown quadrant. Expected one of: {', '.join(EISENHOWER_QUADRANTS)}"
+        )
+    try:
         return await dashboard_service.get_eisenhower_tasks_by_quadrant(
             current_user.id,
-            quadrant
+            quadrant,
+            limit=limit,
+            cursor=cursor,
+            fields=[field.strip() for field in fields.split(",")] if fields else None
         )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/debug-velocity")
 async def debug_task_velocity(current_user = Depends(get_current_user)):
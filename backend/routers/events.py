@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from config import settings
+from services.auth_service import auth_service
+from services.event_bus import event_bus
+from utils.dependencies import get_current_user, get_current_user_from_ticket
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/events", tags=["Events"])
+
+# Comment line sent when idle so proxies keep the connection open
+HEARTBEAT_SECONDS = 15
+# Client reconnect delay announced to EventSource
+RETRY_MILLISECONDS = 5000
+
+
+@router.post("/ticket")
+async def create_events_ticket(current_user = Depends(get_current_user)):
+    """Short-lived ticket for opening the event stream, so the access token never goes in a URL"""
+    return {
+        "ticket": auth_service.create_stream_ticket(current_user.email),
+        "expires_in": settings.EVENTS_TICKET_EXPIRE_SECONDS
+    }
+
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    resume_after: Optional[str] = Query(None, description="Last event id seen, when the client reopens the stream itself"),
+    current_user = Depends(get_current_user_from_ticket)
+):
+    """Server-Sent Events stream of the current user's risk, sync, leave and report events"""
+    user_id = current_user.id
+    last_event_id = last_event_id or resume_after
+    subscription = event_bus.subscribe(user_id)
+
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
+    missed = event_bus.replay(user_id, resume_from)
+
+    async def event_stream():
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n"
+            last_sent = resume_from or 0
+            if missed is None:
+                # Too far behind for the ring buffer: the client should refetch everything
+                yield "event: resync\ndata: {}\n\n"
+            else:
+                for event in missed:
+                    yield event.encode()
+                    last_sent = event.id
+
+            while not subscription.overflowed:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=HEARTBEAT_SECONDS)
+                    # Already sent from the replay (published between subscribe and replay)
+                    if event.id <= last_sent:
+                        continue
+                    yield event.encode()
+                    last_sent = event.id
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": heartbeat\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+            logger.info(f"Event stream closed for user {user_id}")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
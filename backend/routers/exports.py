@@ -0,0 +1,55 @@
+import logging
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from utils.dependencies import get_current_user
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/exports", tags=["Exports"])
+
+DATASET_NAMES = ["tasks", "task_deletions", "risks", "leaves", "rollups"]
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    export_format: str = Query("parquet", alias="format", description="parquet or arrow (IPC stream)"),
+    updated_since: Optional[datetime] = Query(None, description="Only rows created or updated since then (incremental extract)"),
+    current_user = Depends(get_current_user)
+):
+    """Bulk columnar export of the current user's tasks, task deletions, risks, leaves or daily rollups"""
+    if dataset not in DATASET_NAMES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown dataset: {dataset}. Use one of: {', '.join(DATASET_NAMES)}"
+        )
+
+    # pyarrow is only needed here; the rest of the API runs without it
+    try:
+        from services.columnar_export_service import columnar_export_service, EXPORT_FORMATS
+    except ImportError as e:
+        logger.error(f"Columnar export unavailable: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Columnar export requires pyarrow"
+        )
+
+    export_format = export_format.lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format: {export_format}. Use parquet or arrow"
+        )
+
+    if updated_since and updated_since.tzinfo is not None:
+        updated_since = updated_since.replace(tzinfo=None) - updated_since.utcoffset()
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"{dataset}-{datetime.utcnow():%Y%m%dT%H%M%S}.{extension}"
+    return StreamingResponse(
+        columnar_export_service.stream(current_user.id, dataset, export_format, updated_since),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -35,10 +35,10 @@ async def connect_jira(credentials: JiraCredentialsCreate, current_user = Depend
         
         if sync_success:
             # Trigger risk analysis after successful initial sync
-            from services.risk_service import run_risk_analysis
+            from services.risk_coordinator import request_risk_analysis
             logger.info(f"Triggering risk analysis after initial Jira sync for user {current_user.id}")
             try:
-                risk_result = await run_risk_analysis(current_user.id)
+                risk_result = await request_risk_analysis(current_user.id)
                 logger.info(f"Risk analysis completed after initial sync: {risk_result['count']} risks processed")
             except Exception as risk_error:
                 logger.error(f"Risk analysis failed after initial sync: {risk_error}")
@@ -97,10 +97,10 @@ async def sync_jira_data(current_user = Depends(get_current_user)):
         
         if success:
             # Trigger risk analysis after successful sync
-            from services.risk_service import run_risk_analysis
+            from services.risk_coordinator import request_risk_analysis
             logger.info(f"Triggering risk analysis after Jira sync for user {current_user.id}")
             try:
-                risk_result = await run_risk_analysis(current_user.id)
+                risk_result = await request_risk_analysis(current_user.id)
                 logger.info(f"Risk analysis completed after sync: {risk_result['count']} risks processed")
             except Exception as risk_error:
                 logger.error(f"Risk analysis failed after sync: {risk_error}")
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional, Union
 from models.reports import (
     ReportListResponse,
     ReportResponse,
     ReportGenerationRequest,
-    ReportExportRequest
+    ReportExportRequest,
+    ReportJob
 )
 from services.reports_service import reports_service
+from services.report_job_service import report_job_service, ReportJobLimitError
+from services.export_service import export_service, normalize_export_format, export_filename, EXPORT_FORMATS
 from services.jira_service import jira_service
 from services.users_service import users_service
 from utils.dependencies import get_current_user
@@ -82,16 +86,36 @@ async def get_reportable_users(current_user = Depends(get_current_user)):
             detail="Failed to get users"
         )
 
-@router.post("/generate", response_model=ReportResponse)
-async def generate_report(request: ReportGenerationRequest, current_user = Depends(get_current_user)):
-    """Generate a new report"""
+@router.post("/generate", response_model=Union[ReportResponse, ReportJob])
+async def generate_report(
+    request: ReportGenerationRequest,
+    response: Response,
+    run_async: bool = Query(False, alias="async", description="Queue the report and return a job to poll"),
+    current_user = Depends(get_current_user)
+):
+    """Generate a new report; X-Report-Cache tells whether its data was reused (HIT) or computed (MISS)"""
+    if run_async:
+        try:
+            job = await report_job_service.submit(current_user.id, request)
+        except ReportJobLimitError as e:
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+        except Exception as e:
+            logger.error(f"Failed to queue report for user {current_user.id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to queue report"
+            )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return job
+
     try:
-        report = await reports_service.generate_report(current_user.id, request)
+        report, cache_hit = await reports_service.generate_report(current_user.id, request)
         if not report:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to generate report"
             )
+        response.headers["X-Report-Cache"] = "HIT" if cache_hit else "MISS"
         return report
     except HTTPException:
         raise
@@ -102,6 +126,28 @@ async def generate_report(request: ReportGenerationRequest, current_user = Depen
             detail="Failed to generate report"
         )
 
+@router.get("/jobs/{job_id}", response_model=ReportJob)
+async def get_report_job(job_id: str, current_user = Depends(get_current_user)):
+    """Status and progress of a background report job"""
+    job = await report_job_service.get_job(current_user.id, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found"
+        )
+    return job
+
+@router.delete("/jobs/{job_id}", response_model=ReportJob)
+async def cancel_report_job(job_id: str, current_user = Depends(get_current_user)):
+    """Cancel a queued or running report job"""
+    job = await report_job_service.cancel(current_user.id, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found"
+        )
+    return job
+
 # Generic routes should be defined AFTER specific routes
 
 @router.get("/{report_id}", response_model=ReportResponse)
@@ -144,17 +190,41 @@ async def delete_report(report_id: str, current_user = Depends(get_current_user)
             detail="Failed to delete report"
         )
 
-@router.post("/{report_id}/export", response_model=dict)
+@router.post("/{report_id}/export")
 async def export_report(report_id: str, request: ReportExportRequest, current_user = Depends(get_current_user)):
-    """Export a report in the specified format"""
+    """Export a report's data points, summary and task rows as a streamed CSV, NDJSON or XLSX file"""
+    export_format = normalize_export_format(request.format)
+    if not export_format:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format: {request.format}. Use one of: csv, ndjson, excel"
+        )
+
     try:
-        # For now, we'll return a placeholder response
-        # In a real implementation, this would generate and return the actual file
-        return {
-            "message": f"Report {report_id} exported successfully",
-            "format": request.format,
-            "download_url": f"/api/reports/{report_id}/download/{request.format}"
-        }
+        report = await export_service.get_report(current_user.id, report_id)
+        if not report:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Report not found"
+            )
+
+        can_export_tasks = export_service.can_export_tasks(report, current_user.id)
+        if request.include_tasks and not can_export_tasks:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only the report's owner can export its task rows"
+            )
+        include_tasks = can_export_tasks if request.include_tasks is None else request.include_tasks
+
+        media_type, extension = EXPORT_FORMATS[export_format]
+        filename = export_filename(report, extension)
+        return StreamingResponse(
+            export_service.stream(report, export_format, include_tasks=include_tasks),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to export report {report_id} for user {current_user.id}: {e}")
         raise HTTPException(
@@ -1,23 +1,60 @@
-from fastapi import APIRouter, Depends
-from services.risk_service import run_risk_analysis
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
+from bson import ObjectId
+from models.risk_alert import RiskEscalation, RiskHistoryPoint, RiskSimulationRequest, RiskSimulationResult, RiskSummary
+from services.risk_summary_service import risk_summary_service
+from services.risk_history_service import risk_history_service
+from services.risk_simulation_service import risk_simulation_service
+from services.risk_engine import LEVEL_RANKS
+from utils.clock import utcnow
+from services.risk_coordinator import request_risk_analysis
 from db import get_database
 from utils.dependencies import get_current_user
-from datetime import datetime
+from datetime import datetime, timedelta
+import base64
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Alert fields the list returns as plain dates
+RISK_DATE_FIELDS = ["due_date", "start_date", "leave_start", "leave_end"]
+
+
+def date_only(field: str) -> dict:
+    return {"$cond": [
+        {"$eq": [{"$type": f"${field}"}, "date"]},
+        {"$dateToString": {"format": "%Y-%m-%d", "date": f"${field}"}},
+        f"${field}"
+    ]}
+
+
+def encode_risk_cursor(created_at: datetime, last_id: ObjectId) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at.isoformat(), str(last_id)]).encode()).decode()
+
+
+def decode_risk_cursor(cursor: str):
+    try:
+        created_at, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), ObjectId(last_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
 router = APIRouter(
     prefix="/api/risks",
     tags=["Risks"]
 )
 
 @router.get("/check")
-async def check_risks(current_user: dict = Depends(get_current_user)):
+async def check_risks(
+    full: bool = Query(False, description="Rescore every open task instead of only changed ones"),
+    current_user: dict = Depends(get_current_user)
+):
     """Trigger risk analysis for current user"""
     user_id = getattr(current_user, "id", "unknown_user")
     logger.info(f"🔍 Starting risk analysis for user {user_id}...")
-    risk_result = await run_risk_analysis(user_id)
+    risk_result = await request_risk_analysis(user_id, full=full)
     logger.info(f"✅ Risk analysis completed: {risk_result['count']} risks created")
 
     return {
@@ -27,46 +64,126 @@ async def check_risks(current_user: dict = Depends(get_current_user)):
     }
 
 
+@router.get("/summary", response_model=RiskSummary)
+async def get_risk_summary(request: Request, response: Response, current_user: dict = Depends(get_current_user)):
+    """Risk counts by level for polling clients; answers 304 while nothing changed"""
+    user_id = getattr(current_user, "id", "unknown_user")
+    summary = await risk_summary_service.get_summary(user_id)
+
+    etag = f'"risk-summary-{user_id}-{summary.version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return summary
+
+
+@router.post("/simulate", response_model=RiskSimulationResult)
+async def simulate_risks(
+    scenario: RiskSimulationRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """What-if: score hypothetical leaves and task changes against current data without storing anything"""
+    user_id = getattr(current_user, "id", "unknown_user")
+    try:
+        return await risk_simulation_service.simulate(user_id, scenario)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to simulate risks for user {user_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to simulate risks")
+
+
+@router.get("/history/{task_key}", response_model=List[RiskHistoryPoint])
+async def get_risk_history(
+    task_key: str,
+    days: int = Query(30, ge=1, le=365, description="How far back to look"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Risk score changes of one task, oldest first (for trend charts)"""
+    user_id = getattr(current_user, "id", "unknown_user")
+    try:
+        return await risk_history_service.get_task_history(user_id, task_key, utcnow() - timedelta(days=days))
+    except Exception as e:
+        logger.error(f"Failed to get risk history for {task_key}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to get risk history")
+
+
+@router.get("/escalations", response_model=List[RiskEscalation])
+async def get_risk_escalations(
+    hours: int = Query(24, ge=1, le=24 * 90, description="Window to look back over"),
+    min_level: str = Query("HIGH", description="Lowest level an escalation must reach"),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: dict = Depends(get_current_user)
+):
+    """Tasks whose risk level went up recently, newest first"""
+    user_id = getattr(current_user, "id", "unknown_user")
+    min_level = min_level.upper()
+    if min_level not in LEVEL_RANKS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown risk level: {min_level}")
+    try:
+        return await risk_history_service.get_escalations(user_id, utcnow() - timedelta(hours=hours), min_level, limit)
+    except Exception as e:
+        logger.error(f"Failed to get risk escalations for user {user_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to get risk escalations")
+
+
 @router.get("")
-async def get_all_risks(current_user: dict = Depends(get_current_user)):
-    """Get risk alerts for current user"""
+async def get_all_risks(
+    response: Response,
+    level: Optional[str] = Query(None, description="Comma-separated risk levels, e.g. CRITICAL,HIGH"),
+    project_key: Optional[str] = Query(None),
+    assignee: Optional[str] = Query(None, description="Assignee account id"),
+    risk_status: str = Query("ALL", alias="status", description="Alert status (OPEN, RESOLVED) or ALL (default)"),
+    limit: int = Query(50, ge=1, le=200, description="Page size"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get risk alerts for current user, newest first, one page at a time"""
     user_id = getattr(current_user, "id", "unknown_user")
     logger.info(f"📋 Fetching risk alerts for user {user_id}...")
     db = get_database()
-    risks = []
-
-    async for doc in db.risk_alerts.find({"user_id": user_id}).sort("created_at", -1):
-        doc["_id"] = str(doc["_id"])
-        # Convert date objects to strings for JSON serialization
-        if "due_date" in doc and doc["due_date"]:
-            if isinstance(doc["due_date"], datetime):
-                doc["due_date"] = doc["due_date"].date().isoformat()
-            elif hasattr(doc["due_date"], 'date'):
-                doc["due_date"] = doc["due_date"].date().isoformat()
-            else:
-                doc["due_date"] = str(doc["due_date"])
-        if "start_date" in doc and doc["start_date"]:
-            if isinstance(doc["start_date"], datetime):
-                doc["start_date"] = doc["start_date"].date().isoformat()
-            elif hasattr(doc["start_date"], 'date'):
-                doc["start_date"] = doc["start_date"].date().isoformat()
-            else:
-                doc["start_date"] = str(doc["start_date"])
-        if "leave_start" in doc and doc["leave_start"]:
-            if isinstance(doc["leave_start"], datetime):
-                doc["leave_start"] = doc["leave_start"].date().isoformat()
-            elif hasattr(doc["leave_start"], 'date'):
-                doc["leave_start"] = doc["leave_start"].date().isoformat()
-            else:
-                doc["leave_start"] = str(doc["leave_start"])
-        if "leave_end" in doc and doc["leave_end"]:
-            if isinstance(doc["leave_end"], datetime):
-                doc["leave_end"] = doc["leave_end"].date().isoformat()
-            elif hasattr(doc["leave_end"], 'date'):
-                doc["leave_end"] = doc["leave_end"].date().isoformat()
-            else:
-                doc["leave_end"] = str(doc["leave_end"])
-        risks.append(doc)
-    
+
+    match = {"user_id": user_id}
+    if level:
+        match["risk_level"] = {"$in": [value.strip().upper() for value in level.split(",") if value.strip()]}
+    if project_key:
+        match["project_key"] = project_key
+    if assignee:
+        match["assignee_account_id"] = assignee
+    if risk_status.upper() != "ALL":
+        match["status"] = risk_status.upper()
+
+    if cursor:
+        try:
+            created_at, last_id = decode_risk_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        # Keyset on (created_at desc, _id desc) over the (user_id, created_at, _id) index
+        match["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}}
+        ]
+
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$limit": limit + 1},
+        {"$addFields": {
+            "cursor_id": "$_id",
+            "_id": {"$toString": "$_id"},
+            # Dates as YYYY-MM-DD, anything else (e.g. ISO strings) passes through
+            **{field: date_only(field) for field in RISK_DATE_FIELDS}
+        }}
+    ]
+    risks = await db.risk_alerts.aggregate(pipeline).to_list(length=limit + 1)
+
+    if len(risks) > limit:
+        risks = risks[:limit]
+        response.headers["X-Next-Cursor"] = encode_risk_cursor(risks[-1]["created_at"], risks[-1]["cursor_id"])
+    for risk in risks:
+        del risk["cursor_id"]
+
     logger.info(f"✅ Found {len(risks)} risk alerts")
     return risks
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Query
 from typing import Optional
-from models.tasks import TaskResponse, TaskFilter, TaskCreate, TaskUpdate
+from models.tasks import TaskResponse, TaskFilter, TaskSuggestResponse, TaskCreate, TaskUpdate
 from services.tasks_service import tasks_service
 from utils.dependencies import get_current_user
 import logging
@@ -39,6 +39,35 @@ async def get_tasks(
             detail="Failed to get tasks"
         )
 
+@router.get("/search", response_model=TaskResponse)
+async def search_tasks(
+    q: str = Query(..., min_length=1, description="Issue key (prefix) or words from the summary"),
+    page: int = Query(1, ge=1, description="Page number"),
+    size: int = Query(20, ge=1, le=100, description="Page size"),
+    current_user = Depends(get_current_user)
+):
+    """Ranked search over the current user's tasks"""
+    try:
+        result = await tasks_service.search_tasks(current_user.id, q, page, size)
+        return TaskResponse(**result)
+        
+    except Exception as e:
+        logger.error(f"Failed to search tasks for user {current_user.id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search tasks"
+        )
+
+@router.get("/suggest", response_model=TaskSuggestResponse)
+async def suggest_tasks(
+    q: str = Query(..., min_length=1, description="Typeahead input"),
+    limit: int = Query(8, ge=1, le=20, description="Maximum number of suggestions"),
+    current_user = Depends(get_current_user)
+):
+    """Lightweight typeahead suggestions for the task search box"""
+    suggestions = await tasks_service.suggest_tasks(current_user.id, q, limit)
+    return TaskSuggestResponse(suggestions=suggestions)
+
 @router.get("/{task_id}", response_model=dict)
 async def get_task(task_id: str, current_user = Depends(get_current_user)):
     """Get a specific task by ID"""
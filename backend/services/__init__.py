@@ -7,6 +7,8 @@ from .users_service import users_service
 from .files_service import files_service
 from .scheduler_service import scheduler_service
 from .reports_service import reports_service
+from .rollup_service import rollup_service
+from .data_version_service import data_version_service
 
 __all__ = [
     "auth_service",
@@ -17,5 +19,7 @@ __all__ = [
     "users_service",
     "files_service",
     "scheduler_service",
-    "reports_service"
+    "reports_service",
+    "rollup_service",
+    "data_version_service"
 ]
\ No newline at end of file
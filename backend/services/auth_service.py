@@ -11,6 +11,9 @@ from bson import ObjectId
 
 logger = logging.getLogger(__name__)
 
+# Scope claim of stream tickets; access tokens carry no scope
+EVENTS_TICKET_SCOPE = "events"
+
 # Password hashing - fallback to sha256_crypt if bcrypt has issues
 pwd_context = CryptContext(
     schemes=["sha256_crypt", "bcrypt"],
@@ -46,10 +49,18 @@ class AuthService:
         encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
         return encoded_jwt
 
-    async def verify_token(self, token: str) -> Optional[TokenData]:
-        """Verify and decode access token"""
+    def create_stream_ticket(self, email: str) -> str:
+        """Create a short-lived ticket that only opens the /api/events stream"""
+        expire = datetime.utcnow() + timedelta(seconds=settings.EVENTS_TICKET_EXPIRE_SECONDS)
+        return jwt.encode({"sub": email, "scope": EVENTS_TICKET_SCOPE, "exp": expire}, self.secret_key, algorithm=self.algorithm)
+
+    async def verify_token(self, token: str, scope: Optional[str] = None) -> Optional[TokenData]:
+        """Verify and decode access token (or, with scope, a ticket issued for that scope)"""
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            if payload.get("scope") != scope:
+                logger.warning(f"Token scope {payload.get('scope')!r} does not match {scope!r}")
+                return None
             email: str = payload.get("sub")
             if email is None:
                 logger.warning("Token payload missing 'sub' field")
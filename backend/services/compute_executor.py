@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, Optional
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_up() -> bool:
+    # Pay the worker's import cost at startup rather than on the first large tenant
+    import services.risk_engine  # noqa: F401
+    return True
+
+
+class ComputeExecutor:
+    """
+    Managed process pool for CPU-bound work, so one large tenant does not stall
+    the event loop for everyone else.
+
+    Work is submitted as a module-level function plus compact, picklable
+    arguments (NumPy arrays, plain lists), never Pydantic models or Mongo
+    cursors. Small inputs, or a pool that is disabled or not started, run inline.
+    """
+
+    def __init__(self, workers: int = settings.COMPUTE_WORKERS, inline_max: int = settings.COMPUTE_INLINE_MAX_TASKS):
+        self.workers = workers
+        self.inline_max = inline_max
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._pool is not None
+
+    def start(self):
+        if self._pool is not None or self.workers <= 0:
+            return
+        # spawn: forking a process that runs an event loop and Motor's threads is unsafe
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        for _ in range(self.workers):
+            self._pool.submit(_warm_up)
+        logger.info(f"Compute executor started with {self.workers} worker processes")
+
+    def shutdown(self):
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        logger.info("Compute executor stopped")
+
+    async def run(self, fn: Callable, *args, size: int = 0):
+        """Run fn(*args) in a worker process, or inline for inputs below the inline threshold"""
+        if self._pool is None or size < self.inline_max:
+            return fn(*args)
+
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            return await loop.run_in_executor(pool, partial(fn, *args))
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); replace the pool and compute this batch inline.
+            # Concurrent batches see the same broken pool; only the first replaces it.
+            if self._pool is pool:
+                logger.error("Compute worker pool broke, restarting it")
+                # Stops the broken pool's management thread and any surviving workers
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+                self.start()
+            return fn(*args)
+
+# Create global compute executor instance
+compute_executor = ComputeExecutor()
@@ -1,11 +1,24 @@
+import asyncio
+import base64
+import json
 import logging
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+from bson import ObjectId
 from db import get_database
 from models.jira import JiraTask, DashboardStats, EisenhowerQuadrant, TaskByStatus, TaskVelocityData, IssueTypeData, AnalyticsData
+from models.task_status import STATUS_CATEGORY_TODO, STATUS_CATEGORY_IN_PROGRESS, STATUS_CATEGORY_DONE
+from services.rollup_service import rollup_service, percent_change, TREND_PERIOD_DAYS
+from services.data_version_service import data_version_service
+from services.score_cache import score_cache
+from utils.clock import utcnow
 
 logger = logging.getLogger(__name__)
 
+# Rolling window of calendar months shown in the velocity chart
+VELOCITY_MONTHS = 6
+
 def calculate_importance(task: dict) -> int:
     score = 0
 
@@ -39,7 +52,7 @@ def calculate_importance(task: dict) -> int:
 
 def calculate_urgency(task: dict) -> int:
     score = 0
-    now = datetime.utcnow()
+    now = utcnow()
 
     due_date = task.get("duedate")
     status = task.get("status")
@@ -63,47 +76,260 @@ def calculate_urgency(task: dict) -> int:
     return score
 
 
+# -----------------------------
+# Eisenhower scoring in aggregation pipelines
+# (mirrors calculate_importance / calculate_urgency)
+# -----------------------------
+
+EISENHOWER_QUADRANTS = [
+    "urgent_important",
+    "urgent_not_important",
+    "not_urgent_important",
+    "not_urgent_not_important"
+]
+QUADRANT_THRESHOLD = 40
+EISENHOWER_TOP_K = 5
+MS_PER_DAY = 24 * 60 * 60 * 1000
+# Tasks without a due date sort after every dated task
+NO_DUE_DATE_SORT = datetime(9999, 12, 31)
+
+# Matrix order: most urgent, most important, earliest due, biggest first (_id breaks ties)
+EISENHOWER_SORT = {"urgency": -1, "importance": -1, "due_sort": 1, "points_sort": -1, "_id": 1}
+
+
+def importance_expression() -> dict:
+    story_points = {"$ifNull": ["$story_points", 0]}
+    return {"$add": [
+        {"$switch": {"branches": [
+            {"case": {"$eq": ["$priority", "Highest"]}, "then": 40},
+            {"case": {"$eq": ["$priority", "High"]}, "then": 30},
+            {"case": {"$eq": ["$priority", "Medium"]}, "then": 15}
+        ], "default": 0}},
+        {"$switch": {"branches": [
+            {"case": {"$gte": [story_points, 8]}, "then": 20},
+            {"case": {"$gte": [story_points, 5]}, "then": 12}
+        ], "default": 0}},
+        {"$switch": {"branches": [
+            {"case": {"$eq": ["$issue_type", "Bug"]}, "then": 10},
+            {"case": {"$eq": ["$issue_type", "Story"]}, "then": 8}
+        ], "default": 0}}
+    ]}
+
+
+# calculate_urgency steps up when whole days left drops to these values
+URGENCY_THRESHOLD_DAYS = [10, 5, 2]
+
+
+def urgency_expression(now: datetime) -> dict:
+    # Same as timedelta.days: whole days left, floored
+    days_left = {"$floor": {"$divide": [{"$subtract": ["$duedate", now]}, MS_PER_DAY]}}
+    return {"$add": [
+        {"$cond": [
+            {"$eq": [{"$type": "$duedate"}, "date"]},
+            {"$switch": {"branches": [
+                {"case": {"$lte": [days_left, 2]}, "then": 40},
+                {"case": {"$lte": [days_left, 5]}, "then": 25},
+                {"case": {"$lte": [days_left, 10]}, "then": 15}
+            ], "default": 0}},
+            0
+        ]},
+        {"$cond": [{"$in": ["$status", ["In Progress", "In Review"]]}, 10, 0]},
+        {"$cond": [{"$eq": ["$status", "Blocked"]}, 20, 0]}
+    ]}
+
+
+def eisenhower_scoring_stages(now: datetime) -> List[dict]:
+    """Stages adding urgency, importance, sort keys and quadrant to each open task"""
+    return [
+        {"$addFields": {
+            # Importance is stored at ingest; compute it for older documents
+            "importance": {"$ifNull": ["$importance", importance_expression()]},
+            "urgency": urgency_expression(now),
+            "due_sort": {"$cond": [{"$eq": [{"$type": "$duedate"}, "date"]}, "$duedate", NO_DUE_DATE_SORT]},
+            "points_sort": {"$ifNull": ["$story_points", 0]}
+        }},
+        {"$addFields": {
+            "quadrant": {"$switch": {"branches": [
+                {"case": {"$and": [
+                    {"$gte": ["$urgency", QUADRANT_THRESHOLD]},
+                    {"$gte": ["$importance", QUADRANT_THRESHOLD]}
+                ]}, "then": "urgent_important"},
+                {"case": {"$gte": ["$urgency", QUADRANT_THRESHOLD]}, "then": "urgent_not_important"},
+                {"case": {"$gte": ["$importance", QUADRANT_THRESHOLD]}, "then": "not_urgent_important"}
+            ], "default": "not_urgent_not_important"}}
+        }}
+    ]
+
+
+# Fields the quadrant "view all" list can return (sparse selection via ?fields=)
+VIEW_ALL_FIELDS = [
+    "jira_id", "key", "summary", "status", "priority", "assignee", "assignee_email",
+    "duedate", "story_points", "start_date", "sprint", "issue_type",
+    "project_key", "project_name", "created", "updated", "urgency", "importance"
+]
+
+
+def encode_eisenhower_cursor(doc: dict) -> str:
+    """Opaque keyset cursor holding the sort key of the last row of a page"""
+    values = [doc["urgency"], doc["importance"], doc["due_sort"].isoformat(), doc["points_sort"], str(doc["_id"])]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_eisenhower_cursor(cursor: str) -> dict:
+    """Inverse of encode_eisenhower_cursor; raises ValueError for malformed cursors"""
+    try:
+        urgency, importance, due_sort, points_sort, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return {
+            "urgency": urgency,
+            "importance": importance,
+            "due_sort": datetime.fromisoformat(due_sort),
+            "points_sort": points_sort,
+            "_id": ObjectId(task_id)
+        }
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_after(last: dict) -> dict:
+    """Match rows that sort strictly after `last` under EISENHOWER_SORT"""
+    clauses = []
+    equal = {}
+    for key, direction in EISENHOWER_SORT.items():
+        clauses.append({**equal, key: {"$lt" if direction == -1 else "$gt": last[key]}})
+        equal[key] = last[key]
+    return {"$or": clauses}
+
+
+def velocity_months(now: datetime, count: int = VELOCITY_MONTHS) -> List[datetime]:
+    """Start of each of the last `count` calendar months (current month last)"""
+    year, month = now.year, now.month
+    months = []
+    for _ in range(count):
+        months.append(datetime(year, month, 1))
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return list(reversed(months))
+
+
+# Shape of get_dashboard_facets with no tasks; sections fall back to it when the $facet fails
+EMPTY_FACETS: Dict[str, Any] = {
+    "total": 0,
+    "overdue": 0,
+    "by_status_category": {},
+    "by_status": [],
+    "by_issue_type": [],
+    "created_by_month": {},
+    "resolved_by_month": {}
+}
+
+
+class DashboardRequestContext:
+    """Per-request state for the composite dashboard: shared task reads and section timings"""
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.timings: Dict[str, float] = {}
+        self._facets: Optional[asyncio.Task] = None
+
+    async def facets(self) -> Dict[str, Any]:
+        # The first section to ask starts the aggregation; the others await the same task
+        if self._facets is None:
+            self._facets = asyncio.ensure_future(
+                self.timed("facets", dashboard_service.get_dashboard_facets(self.user_id))
+            )
+        return await self._facets
+
+    async def timed(self, name: str, awaitable):
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.timings[name] = (time.perf_counter() - started) * 1000
+
+    def server_timing(self) -> str:
+        """Format the section timings as a Server-Timing header value"""
+        return ", ".join(f"{name};dur={duration:.1f}" for name, duration in self.timings.items())
+
+
 class DashboardService:
-    async def get_dashboard_stats(self, user_id: str) -> DashboardStats:
+    def __init__(self):
+        # user_id -> (current month start, velocity buckets)
+        self._velocity_cache: Dict[str, Tuple[datetime, List[TaskVelocityData]]] = {}
+
+    async def get_dashboard_facets(self, user_id: str) -> Dict[str, Any]:
+        """Totals, status buckets, overdue count, issue types and velocity buckets in one $facet pass"""
+        db = get_database()
+        now = utcnow()
+        window_start = velocity_months(now)[0]
+        
+        def count_by(field):
+            return [
+                {"$group": {"_id": field, "count": {"$sum": 1}}},
+                {"$sort": {"count": -1}}
+            ]
+        
+        def monthly(field):
+            return [
+                {"$match": {field: {"$gte": window_start}}},
+                {"$group": {
+                    "_id": {"$dateTrunc": {"date": f"${field}", "unit": "month"}},
+                    "count": {"$sum": 1}
+                }}
+            ]
+        
+        pipeline = [
+            {"$match": {"user_id": user_id}},
+            {"$facet": {
+                "total": [{"$count": "count"}],
+                "by_status_category": count_by("$status_category"),
+                "by_status": count_by("$status"),
+                "by_issue_type": count_by("$issue_type"),
+                "overdue": [
+                    {"$match": {"is_open": True, "duedate": {"$lt": now}}},
+                    {"$count": "count"}
+                ],
+                "created_by_month": monthly("created"),
+                "resolved_by_month": monthly("resolved")
+            }}
+        ]
+        
+        result = await db.jira_tasks.aggregate(pipeline).to_list(length=1)
+        facets = result[0] if result else {}
+        
+        return {
+            "total": facets["total"][0]["count"] if facets.get("total") else 0,
+            "overdue": facets["overdue"][0]["count"] if facets.get("overdue") else 0,
+            "by_status_category": {doc["_id"]: doc["count"] for doc in facets.get("by_status_category", [])},
+            "by_status": [(doc["_id"], doc["count"]) for doc in facets.get("by_status", [])],
+            "by_issue_type": [(doc["_id"], doc["count"]) for doc in facets.get("by_issue_type", [])],
+            "created_by_month": {doc["_id"]: doc["count"] for doc in facets.get("created_by_month", [])},
+            "resolved_by_month": {doc["_id"]: doc["count"] for doc in facets.get("resolved_by_month", [])}
+        }
+
+    async def get_dashboard_stats(self, user_id: str, facets: Optional[Dict[str, Any]] = None) -> DashboardStats:
         """Get dashboard statistics for a user"""
         try:
-            db = get_database()
-            tasks_collection = db.jira_tasks
-            
-            # Get total tasks
-            total_tasks = await tasks_collection.count_documents({"user_id": user_id})
-            
-            # Get TODO tasks
-            todo_tasks = await tasks_collection.count_documents({
-                "user_id": user_id,
-                "status": {"$in": ["To Do", "Todo", "TO DO"]}
-            })
+            if facets is None:
+                facets = await self.get_dashboard_facets(user_id)
             
-            # Get tasks in progress
-            in_progress_tasks = await tasks_collection.count_documents({
-                "user_id": user_id,
-                "status": {"$in": ["In Progress", "In Review", "In Development"]}
-            })
+            total_tasks = facets["total"]
+            todo_tasks = facets["by_status_category"].get(STATUS_CATEGORY_TODO, 0)
+            in_progress_tasks = facets["by_status_category"].get(STATUS_CATEGORY_IN_PROGRESS, 0)
+            completed_tasks = facets["by_status_category"].get(STATUS_CATEGORY_DONE, 0)
+            overdue_tasks = facets["overdue"]
             
-            # Get completed tasks
-            completed_tasks = await tasks_collection.count_documents({
-                "user_id": user_id,
-                "status": {"$in": ["Done", "Closed", "Resolved"]}
-            })
+            # Calculate trends against the daily rollup from the previous period
+            baseline = await rollup_service.get_rollup_on_or_before(
+                user_id, utcnow() - timedelta(days=TREND_PERIOD_DAYS)
+            ) or {}
+            baseline_categories = baseline.get("by_status_category", {})
             
-            # Get overdue tasks (tasks with due date in the past and not completed)
-            overdue_tasks = await tasks_collection.count_documents({
-                "user_id": user_id,
-                "duedate": {"$lt": datetime.utcnow()},
-                "status": {"$nin": ["Done", "Closed", "Resolved"]}
-            })
-            
-            # Calculate trends (simplified - in a real app, you'd compare with previous period)
-            total_tasks_trend = 4.5  # Simulated trend
-            todo_tasks_trend = 15.2
-            in_progress_tasks_trend = 8.2
-            completed_tasks_trend = 12.3
-            overdue_tasks_trend = 16.3
+            total_tasks_trend = percent_change(total_tasks, baseline.get("total"))
+            todo_tasks_trend = percent_change(todo_tasks, baseline_categories.get(STATUS_CATEGORY_TODO))
+            in_progress_tasks_trend = percent_change(in_progress_tasks, baseline_categories.get(STATUS_CATEGORY_IN_PROGRESS))
+            completed_tasks_trend = percent_change(completed_tasks, baseline_categories.get(STATUS_CATEGORY_DONE))
+            overdue_tasks_trend = percent_change(overdue_tasks, baseline.get("overdue"))
             
             return DashboardStats(
                 total_tasks=total_tasks,
@@ -143,14 +369,13 @@ class DashboardService:
         - not_urgent_not_important
         """
 
-        today = datetime.utcnow().date()
+        today = utcnow().date()
         duedate = task.get("duedate")
         story_points = task.get("story_points") or 0
         priority = task.get("priority", "")
-        status = task.get("status", "")
 
         # Completed tasks → Not urgent & not important
-        if status in ["Done", "Closed", "Resolved"]:
+        if task.get("status_category") == STATUS_CATEGORY_DONE:
             return "not_urgent_not_important"
 
         # Urgency
@@ -176,54 +401,65 @@ class DashboardService:
 
 
 
+    async def next_urgency_change(self, user_id: str, now: datetime) -> datetime:
+        """Earliest instant at which any open task's urgency can cross a day threshold"""
+        db = get_database()
+
+        # Urgency for threshold N changes once due - now < N + 1 days, i.e. at due - (N + 1) days
+        offsets = [timedelta(days=days + 1) for days in URGENCY_THRESHOLD_DAYS]
+        pipeline = [
+            {"$match": {"user_id": user_id, "is_open": True, "duedate": {"$gte": now}}},
+            {"$facet": {
+                str(index): [
+                    {"$match": {"duedate": {"$gte": now + offset}}},
+                    {"$sort": {"duedate": 1}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 0, "duedate": 1}}
+                ]
+                for index, offset in enumerate(offsets)
+            }}
+        ]
+
+        result = await db.jira_tasks.aggregate(pipeline).to_list(length=1)
+        crossings = [NO_DUE_DATE_SORT]
+        if result:
+            for index, offset in enumerate(offsets):
+                docs = result[0].get(str(index))
+                if docs:
+                    crossings.append(docs[0]["duedate"] - offset)
+        return min(crossings)
+
     async def get_eisenhower_matrix(self, user_id: str) -> EisenhowerQuadrant:
         try:
+            now = utcnow()
+            version = await data_version_service.get_version(user_id)
+            cached = score_cache.get(user_id, "eisenhower", version, now)
+            if cached is not None:
+                return cached
+
             db = get_database()
             tasks_collection = db.jira_tasks
 
-            quadrants = {
-                "urgent_important": [],
-                "urgent_not_important": [],
-                "not_urgent_important": [],
-                "not_urgent_not_important": []
-            }
-
-            async for task in tasks_collection.find({
-                "user_id": user_id,
-                "status": {"$nin": ["Done", "Closed", "Resolved"]}
-            }):
-                urgency = calculate_urgency(task)
-                importance = calculate_importance(task)
-
-                enriched_task = {
-                    **task,
-                    "urgency": urgency,
-                    "importance": importance
-                }
-
-                # Quadrant decision
-                if urgency >= 40 and importance >= 40:
-                    quadrants["urgent_important"].append(enriched_task)
-                elif urgency >= 40 and importance < 40:
-                    quadrants["urgent_not_important"].append(enriched_task)
-                elif urgency < 40 and importance >= 40:
-                    quadrants["not_urgent_important"].append(enriched_task)
-                else:
-                    quadrants["not_urgent_not_important"].append(enriched_task)
-
-            # Sorting logic (VERY IMPORTANT)
-            def sort_key(t):
-                return (
-                    -t["urgency"],
-                    -t["importance"],
-                    t.get("duedate") or datetime.max,
-                    -(t.get("story_points") or 0)
-                )
+            # Counts and the top tasks per quadrant are computed in Mongo;
+            # only EISENHOWER_TOP_K documents per quadrant come back
+            pipeline = [
+                {"$match": {"user_id": user_id, "is_open": True}},
+                *eisenhower_scoring_stages(now),
+                {"$group": {
+                    "_id": "$quadrant",
+                    "count": {"$sum": 1},
+                    "tasks": {"$topN": {
+                        "n": EISENHOWER_TOP_K,
+                        "sortBy": EISENHOWER_SORT,
+                        "output": "$$ROOT"
+                    }}
+                }}
+            ]
 
-            for key in quadrants:
-                quadrants[key].sort(key=sort_key)
+            quadrants = {key: {"count": 0, "tasks": []} for key in EISENHOWER_QUADRANTS}
+            async for doc in tasks_collection.aggregate(pipeline):
+                quadrants[doc["_id"]] = {"count": doc["count"], "tasks": doc["tasks"]}
 
-            # Take top 5 only
             def build_tasks(task_list):
                 return [
                     JiraTask(
@@ -233,6 +469,8 @@ class DashboardService:
                         key=t["key"],
                         summary=t["summary"],
                         status=t["status"],
+                        status_category=t.get("status_category"),
+                        is_open=t.get("is_open"),
                         priority=t["priority"],
                         assignee=t.get("assignee"),
                         assignee_email=t.get("assignee_email"),
@@ -247,21 +485,25 @@ class DashboardService:
                         start_date=t.get("start_date"),
                         sprint=t.get("sprint")
                     )
-                    for t in task_list[:5]
+                    for t in task_list
                 ]
 
-            return EisenhowerQuadrant(
-                urgent_important=len(quadrants["urgent_important"]),
-                urgent_not_important=len(quadrants["urgent_not_important"]),
-                not_urgent_important=len(quadrants["not_urgent_important"]),
-                not_urgent_not_important=len(quadrants["not_urgent_not_important"]),
-
-                urgent_important_tasks=build_tasks(quadrants["urgent_important"]),
-                urgent_not_important_tasks=build_tasks(quadrants["urgent_not_important"]),
-                not_urgent_important_tasks=build_tasks(quadrants["not_urgent_important"]),
-                not_urgent_not_important_tasks=build_tasks(quadrants["not_urgent_not_important"]),
+            matrix = EisenhowerQuadrant(
+                urgent_important=quadrants["urgent_important"]["count"],
+                urgent_not_important=quadrants["urgent_not_important"]["count"],
+                not_urgent_important=quadrants["not_urgent_important"]["count"],
+                not_urgent_not_important=quadrants["not_urgent_not_important"]["count"],
+
+                urgent_important_tasks=build_tasks(quadrants["urgent_important"]["tasks"]),
+                urgent_not_important_tasks=build_tasks(quadrants["urgent_not_important"]["tasks"]),
+                not_urgent_important_tasks=build_tasks(quadrants["not_urgent_important"]["tasks"]),
+                not_urgent_not_important_tasks=build_tasks(quadrants["not_urgent_not_important"]["tasks"]),
             )
 
+            # Valid until a task crosses an urgency threshold or the data version moves
+            score_cache.put(user_id, "eisenhower", matrix, version, await self.next_urgency_change(user_id, now))
+            return matrix
+
         except Exception as e:
             logger.error(f"Eisenhower failed: {e}")
             return EisenhowerQuadrant(
@@ -275,163 +517,156 @@ class DashboardService:
                 not_urgent_not_important_tasks=[]
                 )
 
-    async def _calculate_real_task_velocity(self, user_id: str) -> List[TaskVelocityData]:
-        """Calculate real task velocity based on actual task creation and completion dates"""
+    def invalidate_velocity(self, user_id: str):
+        """Drop the cached velocity buckets after a sync changed created/resolved tasks"""
+        self._velocity_cache.pop(user_id, None)
+
+    def _empty_velocity(self, months: List[datetime]) -> List[TaskVelocityData]:
+        return [TaskVelocityData(month=month.strftime("%b"), tasks=0, completed=0) for month in months]
+
+    async def _calculate_real_task_velocity(self, user_id: str, facets: Optional[Dict[str, Any]] = None) -> List[TaskVelocityData]:
+        """Calculate real task velocity based on actual task creation and resolution dates"""
+        months = velocity_months(utcnow())
+        
+        # Cached per user for the current rolling window until a sync changes the data
+        cached = self._velocity_cache.get(user_id)
+        if cached and cached[0] == months[-1]:
+            return cached[1]
+        
+        # Fallback facets after a failed aggregation: show zeros, but don't cache them
+        if facets is EMPTY_FACETS:
+            return self._empty_velocity(months)
+        
         try:
-            db = get_database()
-            tasks_collection = db.jira_tasks
-            
-            from datetime import datetime
-            now = datetime.utcnow()
-            
-            logger.info(f"🔍 Calculating task velocity for user: {user_id}")
-            
-            # Get real counts from database
-            total_tasks = await tasks_collection.count_documents({"user_id": user_id})
-            logger.info(f"📊 Found {total_tasks} total tasks for user {user_id}")
-            
-            if total_tasks == 0:
-                logger.info("⚠️ No tasks found for user - returning realistic defaults")
-                # Return varied realistic data instead of all zeros
-                return [
-                    TaskVelocityData(month="Aug", tasks=3, completed=1),
-                    TaskVelocityData(month="Sep", tasks=7, completed=4),
-                    TaskVelocityData(month="Oct", tasks=11, completed=8),
-                    TaskVelocityData(month="Nov", tasks=14, completed=10),
-                    TaskVelocityData(month="Dec", tasks=9, completed=6),
-                    TaskVelocityData(month="Jan", tasks=6, completed=3)
-                ]
+            if facets is None:
+                facets = await self.get_dashboard_facets(user_id)
             
-            # Get completed tasks count
-            completed_tasks = await tasks_collection.count_documents({
-                "user_id": user_id,
-                "status": {"$in": ["Done", "Closed", "Resolved"]}
-            })
-            
-            logger.info(f"✅ Found {completed_tasks} completed tasks out of {total_tasks} total")
-            
-            # Create realistic variation instead of flat distribution
-            # This ensures we don't get the same numbers every time
-            import random
-            random.seed(user_id)  # Consistent but varied per user
-            
-            # Base calculations
-            base_tasks = max(1, total_tasks // 6)
-            base_completed = max(0, completed_tasks // 6)
-            
-            # Add realistic variation (±40%)
-            months_data = [
-                ("Aug", base_tasks, base_completed),
-                ("Sep", base_tasks + 2, base_completed + 1),
-                ("Oct", base_tasks + 4, base_completed + 2),
-                ("Nov", base_tasks + 6, base_completed + 3),
-                ("Dec", base_tasks + 3, base_completed + 2),
-                ("Jan", base_tasks + 1, base_completed + 1)
+            velocity = [
+                TaskVelocityData(
+                    month=month.strftime("%b"),
+                    tasks=facets["created_by_month"].get(month, 0),
+                    completed=facets["resolved_by_month"].get(month, 0)
+                )
+                for month in months
             ]
             
-            # Apply variation and ensure minimums
-            result = []
-            for month, task_base, completed_base in months_data:
-                # Add some randomness
-                task_variation = random.randint(-2, 3)
-                completed_variation = random.randint(-1, 2)
-                
-                tasks = max(1, task_base + task_variation)
-                completed = max(0, min(completed_base + completed_variation, tasks))
-                
-                result.append(TaskVelocityData(
-                    month=month,
-                    tasks=tasks,
-                    completed=completed
-                ))
-                
-                logger.info(f"📊 {month}: {tasks} tasks, {completed} completed")
-            
-            return result
+            self._velocity_cache[user_id] = (months[-1], velocity)
+            return velocity
             
         except Exception as e:
-            logger.error(f"💥 Failed to calculate task velocity for user {user_id}: {e}", exc_info=True)
-            # Return varied realistic data as fallback
-            import random
-            random.seed(f"fallback_{user_id}")
-            
-            return [
-                TaskVelocityData(month="Aug", tasks=random.randint(4, 8), completed=random.randint(2, 5)),
-                TaskVelocityData(month="Sep", tasks=random.randint(6, 12), completed=random.randint(4, 8)),
-                TaskVelocityData(month="Oct", tasks=random.randint(8, 15), completed=random.randint(6, 11)),
-                TaskVelocityData(month="Nov", tasks=random.randint(10, 18), completed=random.randint(8, 14)),
-                TaskVelocityData(month="Dec", tasks=random.randint(7, 13), completed=random.randint(5, 10)),
-                TaskVelocityData(month="Jan", tasks=random.randint(5, 10), completed=random.randint(3, 7))
-            ]
+            logger.error(f"Failed to calculate task velocity for user {user_id}: {e}", exc_info=True)
+            return self._empty_velocity(months)
     
-    async def get_eisenhower_tasks_by_quadrant(self, user_id: str, quadrant: str):
+    async def get_dashboard(self, context: DashboardRequestContext) -> Tuple[DashboardStats, EisenhowerQuadrant, AnalyticsData]:
+        """Compute all dashboard sections concurrently over one shared request context"""
+        user_id = context.user_id
+
+        async def facets():
+            # One failed $facet degrades the stats and analytics sections, not the whole dashboard
+            try:
+                return await context.facets()
+            except Exception as e:
+                logger.error(f"Failed to get dashboard facets for user {user_id}: {e}")
+                return EMPTY_FACETS
+
+        async def stats():
+            return await self.get_dashboard_stats(user_id, await facets())
+
+        async def analytics():
+            return await self.get_analytics_data(user_id, await facets())
+
+        return await context.timed("total", asyncio.gather(
+            context.timed("stats", stats()),
+            context.timed("eisenhower", self.get_eisenhower_matrix(user_id)),
+            context.timed("analytics", analytics())
+        ))
+
+    async def get_task_trends(self, user_id: str, days: int = 30) -> List[Dict[str, Any]]:
+        """Daily counts for sparklines and historical charts, read from rollups"""
+        rollups = await rollup_service.get_rollups(user_id, days)
+        return [
+            {
+                "day": rollup["day"].date().isoformat(),
+                "total": rollup.get("total", 0),
+                "todo": rollup.get("by_status_category", {}).get(STATUS_CATEGORY_TODO, 0),
+                "in_progress": rollup.get("by_status_category", {}).get(STATUS_CATEGORY_IN_PROGRESS, 0),
+                "done": rollup.get("by_status_category", {}).get(STATUS_CATEGORY_DONE, 0),
+                "overdue": rollup.get("overdue", 0)
+            }
+            for rollup in rollups
+        ]
+
+    async def get_eisenhower_tasks_by_quadrant(
+        self,
+        user_id: str,
+        quadrant: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Page through one quadrant in matrix order, using the matrix scoring pipeline"""
         db = get_database()
         tasks = db.jira_tasks
 
-        base_query = {
-            "user_id": user_id,
-            "status": {"$nin": ["Done", "Closed", "Resolved"]}
+        pipeline = [
+            {"$match": {"user_id": user_id, "is_open": True}},
+            *eisenhower_scoring_stages(utcnow()),
+            {"$match": {"quadrant": quadrant}}
+        ]
+
+        page = []
+        if cursor:
+            page.append({"$match": keyset_after(decode_eisenhower_cursor(cursor))})
+        page.extend([
+            {"$sort": EISENHOWER_SORT},
+            {"$limit": limit + 1}
+        ])
+
+        projected = [field for field in (fields or VIEW_ALL_FIELDS) if field in VIEW_ALL_FIELDS]
+        page.append({"$project": {
+            **{field: 1 for field in projected},
+            **{key: 1 for key in EISENHOWER_SORT}
+        }})
+
+        # The first page also reports the quadrant size, which matches the matrix count
+        if cursor:
+            docs = await tasks.aggregate(pipeline + page).to_list(length=limit + 1)
+            count = None
+        else:
+            pipeline.append({"$facet": {"page": page, "count": [{"$count": "count"}]}})
+            result = await tasks.aggregate(pipeline).to_list(length=1)
+            docs = result[0]["page"] if result else []
+            count = result[0]["count"][0]["count"] if result and result[0]["count"] else 0
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_eisenhower_cursor(docs[-1])
+
+        rows = []
+        for doc in docs:
+            row = {"id": str(doc["_id"])}
+            row.update({field: doc.get(field) for field in projected})
+            rows.append(row)
+
+        return {
+            "quadrant": quadrant,
+            "count": count,
+            "tasks": rows,
+            "next_cursor": next_cursor
         }
 
-        if quadrant == "urgent_important":
-            base_query["priority"] = {"$in": ["High", "Highest"]}
-
-        elif quadrant == "urgent_not_important":
-            base_query["priority"] = "Medium"
-
-        elif quadrant == "not_urgent_important":
-            base_query["priority"] = {"$in": ["Low"]}
-
-        elif quadrant == "not_urgent_not_important":
-            base_query["$or"] = [
-                {"status": {"$in": ["Done", "Closed", "Resolved"]}},
-                {"priority": "Lowest"}
-            ]
-
-        cursor = tasks.find(base_query).sort("duedate", 1)
-
-        result = []
-        async for doc in cursor:
-            result.append({
-                "id": str(doc["_id"]),  # ✅ FIX
-                "jira_id": doc.get("jira_id"),
-                "key": doc.get("key"),
-                "summary": doc.get("summary"),
-                "status": doc.get("status"),
-                "priority": doc.get("priority"),
-                "assignee": doc.get("assignee"),
-                "assignee_email": doc.get("assignee_email"),
-                "duedate": doc.get("duedate"),
-                "story_points": doc.get("story_points"),
-                "start_date": doc.get("start_date"),
-                "sprint": doc.get("sprint"),
-                "issue_type": doc.get("issue_type"),
-                "project_key": doc.get("project_key"),
-                "project_name": doc.get("project_name"),
-                "created": doc.get("created"),
-                "updated": doc.get("updated")
-            })
-
-        return result
-
-    async def get_analytics_data(self, user_id: str) -> AnalyticsData:
+    async def get_analytics_data(self, user_id: str, facets: Optional[Dict[str, Any]] = None) -> AnalyticsData:
         """Get analytics data for a user"""
         try:
-            db = get_database()
-            tasks_collection = db.jira_tasks
+            if facets is None:
+                facets = await self.get_dashboard_facets(user_id)
             
             # Get tasks by status
-            status_pipeline = [
-                {"$match": {"user_id": user_id}},
-                {"$group": {"_id": "$status", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}}
+            tasks_by_status = [
+                TaskByStatus(name=name, value=count) for name, count in facets["by_status"]
             ]
             
-            status_cursor = tasks_collection.aggregate(status_pipeline)
-            tasks_by_status = []
-            async for doc in status_cursor:
-                tasks_by_status.append(TaskByStatus(name=doc["_id"], value=doc["count"]))
-            
             # If no data, provide default values
             if not tasks_by_status:
                 tasks_by_status = [
@@ -442,20 +677,13 @@ class DashboardService:
                 ]
             
             # Get REAL task velocity data
-            task_velocity = await self._calculate_real_task_velocity(user_id)
+            task_velocity = await self._calculate_real_task_velocity(user_id, facets)
             
             # Get issue type distribution
-            type_pipeline = [
-                {"$match": {"user_id": user_id}},
-                {"$group": {"_id": "$issue_type", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}}
+            issue_type_distribution = [
+                IssueTypeData(name=name, value=count) for name, count in facets["by_issue_type"]
             ]
             
-            type_cursor = tasks_collection.aggregate(type_pipeline)
-            issue_type_distribution = []
-            async for doc in type_cursor:
-                issue_type_distribution.append(IssueTypeData(name=doc["_id"], value=doc["count"]))
-            
             # If no data, provide default values
             if not issue_type_distribution:
                 issue_type_distribution = [
@@ -474,17 +702,7 @@ class DashboardService:
         except Exception as e:
             logger.error(f"Failed to get analytics data for user {user_id}: {e}")
             # Return default values with real velocity calculation
-            try:
-                real_velocity = await self._calculate_real_task_velocity(user_id)
-            except:
-                real_velocity = [
-                    TaskVelocityData(month="Jan", tasks=0, completed=0),
-                    TaskVelocityData(month="Feb", tasks=0, completed=0),
-                    TaskVelocityData(month="Mar", tasks=0, completed=0),
-                    TaskVelocityData(month="Apr", tasks=0, completed=0),
-                    TaskVelocityData(month="May", tasks=0, completed=0),
-                    TaskVelocityData(month="Jun", tasks=0, completed=0)
-                ]
+            real_velocity = await self._calculate_real_task_velocity(user_id)
             
             return AnalyticsData(
                 tasks_by_status=[
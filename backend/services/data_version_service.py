@@ -0,0 +1,39 @@
+import logging
+from datetime import datetime
+from pymongo import ReturnDocument
+from db import get_database
+
+logger = logging.getLogger(__name__)
+
+
+class DataVersionService:
+    """Per-user counter bumped whenever the task or leave data behind derived scores changes"""
+
+    async def get_version(self, user_id: str) -> int:
+        try:
+            db = get_database()
+            doc = await db.data_versions.find_one({"_id": user_id}, {"version": 1})
+            return doc["version"] if doc else 0
+
+        except Exception as e:
+            logger.error(f"Failed to get data version for user {user_id}: {e}")
+            return -1
+
+    async def bump(self, user_id: str, reason: str = "") -> int:
+        """Increment and return the user's data version"""
+        try:
+            db = get_database()
+            doc = await db.data_versions.find_one_and_update(
+                {"_id": user_id},
+                {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow(), "reason": reason}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return doc["version"]
+
+        except Exception as e:
+            logger.error(f"Failed to bump data version for user {user_id}: {e}")
+            return -1
+
+# Create global data version service instance
+data_version_service = DataVersionService()
@@ -0,0 +1,92 @@
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+from utils.clock import utcnow
+
+logger = logging.getLogger(__name__)
+
+# Recent events kept per user so a reconnecting client can resume via Last-Event-ID
+RING_BUFFER_SIZE = 100
+# Events queued per connection before a slow client is cut off (it resumes from the ring)
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class Event:
+    def __init__(self, event_id: int, event_type: str, data: Dict[str, Any]):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+
+    def encode(self) -> str:
+        """Server-Sent Events wire format"""
+        payload = json.dumps(self.data, default=str)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+
+class EventBus:
+    """In-process pub/sub of per-user events (risks, syncs, leave uploads, reports)"""
+
+    def __init__(self):
+        # Millisecond-based start keeps ids increasing across restarts, so a stale
+        # Last-Event-ID from before a restart is detected as a gap
+        self._first_id = int(time.time() * 1000)
+        self._ids = itertools.count(self._first_id)
+        self._history: Dict[str, Deque[Event]] = {}
+        self._evicted_through: Dict[str, int] = {}
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def publish(self, user_id: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> Event:
+        event = Event(next(self._ids), event_type, {**(data or {}), "at": utcnow().isoformat()})
+        history = self._history.setdefault(user_id, deque(maxlen=RING_BUFFER_SIZE))
+        if len(history) == history.maxlen:
+            self._evicted_through[user_id] = history[0].id
+        history.append(event)
+
+        for subscription in list(self._subscribers.get(user_id, ())):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Backpressure: drop the slow connection rather than buffer without bound
+                subscription.overflowed = True
+                self.unsubscribe(subscription)
+                logger.warning(f"Dropped slow event subscriber for user {user_id}")
+        return event
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(user_id)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def replay(self, user_id: str, last_event_id: Optional[int]) -> Optional[List[Event]]:
+        """Events after last_event_id; None when they already fell out of the ring buffer"""
+        if last_event_id is None:
+            return []
+        if last_event_id < self._evicted_through.get(user_id, 0) or last_event_id < self._first_id:
+            return None
+        return [event for event in self._history.get(user_id, ()) if event.id > last_event_id]
+
+    def subscriber_count(self, user_id: Optional[str] = None) -> int:
+        if user_id is not None:
+            return len(self._subscribers.get(user_id, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+# Create global event bus instance
+event_bus = EventBus()
@@ -0,0 +1,245 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from db import get_database
+
+logger = logging.getLogger(__name__)
+
+# Task columns exported alongside a report, in order
+TASK_EXPORT_FIELDS = [
+    "key", "summary", "status", "status_category", "priority", "issue_type",
+    "assignee", "assignee_account_id", "project_key", "project_name",
+    "story_points", "sprint", "start_date", "duedate", "created", "updated", "resolved"
+]
+
+DATA_POINT_COLUMNS = ["label", "value", "category", "metadata"]
+
+# Rows buffered before a chunk is handed to the response
+CHUNK_ROWS = 500
+CURSOR_BATCH_SIZE = 1000
+FILE_CHUNK_BYTES = 64 * 1024
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+FORMAT_ALIASES = {"excel": "xlsx", "jsonl": "ndjson"}
+
+# Spreadsheet apps evaluate text starting with these as a formula (CSV/formula injection)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def normalize_export_format(value: str) -> Optional[str]:
+    value = (value or "").strip().lower()
+    value = FORMAT_ALIASES.get(value, value)
+    return value if value in EXPORT_FORMATS else None
+
+
+def export_filename(report: dict, extension: str) -> str:
+    name = re.sub(r"[^A-Za-z0-9]+", "-", report.get("name") or "report").strip("-").lower() or "report"
+    created_at = report.get("created_at")
+    return f"{name}-{created_at:%Y%m%d}.{extension}" if created_at else f"{name}.{extension}"
+
+
+def _text(value: Any) -> Any:
+    """Cell value for CSV: dates as ISO strings, lists and dicts as JSON, formula-like text quoted"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=str)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return "" if value is None else value
+
+
+def _cell(sheet, value: Any) -> Any:
+    # XLSX keeps numbers and dates typed; formula-like text is stored as a plain string cell
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=str)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        cell = WriteOnlyCell(sheet, value)
+        cell.data_type = "s"
+        return cell
+    return value
+
+
+def _data_point_row(point: dict) -> List[Any]:
+    metadata = point.get("metadata") or {}
+    return [point.get("label"), point.get("value"), metadata.get("category"), metadata or None]
+
+
+class ExportService:
+    """Streams a report's data points, summary and underlying task rows as CSV, NDJSON or XLSX"""
+
+    async def get_report(self, user_id: str, report_id: str) -> Optional[dict]:
+        """Report metadata the user may read (own or public)"""
+        db = get_database()
+        return await db.reports.find_one({
+            "_id": report_id,
+            "$or": [{"created_by": user_id}, {"is_public": True}]
+        })
+
+    @staticmethod
+    def can_export_tasks(report: dict, user_id: str) -> bool:
+        """Task rows are the owner's raw Jira data; public reports share only their results"""
+        return report.get("created_by") == user_id
+
+    @staticmethod
+    def task_query(report: dict) -> Dict[str, Any]:
+        """The report's filters as a jira_tasks query on its owner's data"""
+        filters = report.get("filters") or {}
+        query = {"user_id": report["created_by"]}
+        if filters.get("project_key"):
+            query["project_key"] = filters["project_key"]
+        if filters.get("user_id"):
+            query["$or"] = [
+                {"assignee_account_id": filters["user_id"]},
+                {"assignee": filters["user_id"]}
+            ]
+        if filters.get("start_date") or filters.get("end_date"):
+            created = {}
+            if filters.get("start_date"):
+                created["$gte"] = filters["start_date"]
+            if filters.get("end_date"):
+                created["$lte"] = filters["end_date"]
+            query["created"] = created
+        return query
+
+    def _data_points(self, report: dict):
+        db = get_database()
+        return db.report_data.find({"report_id": report["_id"]}, {"_id": 0, "report_id": 0}).batch_size(CURSOR_BATCH_SIZE)
+
+    async def _summary(self, report: dict) -> dict:
+        db = get_database()
+        doc = await db.report_summaries.find_one({"report_id": report["_id"]})
+        return (doc or {}).get("data") or {}
+
+    def _tasks(self, report: dict):
+        db = get_database()
+        projection = {"_id": 0, **{field: 1 for field in TASK_EXPORT_FIELDS}}
+        return db.jira_tasks.find(self.task_query(report), projection).sort("key", 1).batch_size(CURSOR_BATCH_SIZE)
+
+    async def stream_csv(self, report: dict, include_tasks: bool = True) -> AsyncIterator[bytes]:
+        """Data points, summary and tasks as three CSV blocks, each with its own header"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def flush() -> bytes:
+            chunk = buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+
+        # BOM so spreadsheet apps pick UTF-8
+        yield "\ufeff".encode("utf-8")
+
+        writer.writerow(DATA_POINT_COLUMNS)
+        async for point in self._data_points(report):
+            writer.writerow([_text(value) for value in _data_point_row(point)])
+        writer.writerow([])
+        writer.writerow(["summary", "value"])
+        for key, value in (await self._summary(report)).items():
+            writer.writerow([key, _text(value)])
+        yield flush()
+
+        if include_tasks:
+            writer.writerow([])
+            writer.writerow(TASK_EXPORT_FIELDS)
+            rows = 0
+            async for task in self._tasks(report):
+                writer.writerow([_text(task.get(field)) for field in TASK_EXPORT_FIELDS])
+                rows += 1
+                if rows % CHUNK_ROWS == 0:
+                    yield flush()
+        yield flush()
+
+    async def stream_ndjson(self, report: dict, include_tasks: bool = True) -> AsyncIterator[bytes]:
+        """One JSON object per line, tagged with its record type"""
+        lines = []
+
+        def flush() -> bytes:
+            chunk = "".join(lines).encode("utf-8")
+            lines.clear()
+            return chunk
+
+        def line(record_type: str, record: dict):
+            lines.append(json.dumps({"type": record_type, **record}, default=_text) + "\n")
+
+        line("report", {
+            "id": report["_id"],
+            "name": report.get("name"),
+            "report_type": report.get("type"),
+            "created_at": report.get("created_at"),
+            "filters": report.get("filters")
+        })
+        async for point in self._data_points(report):
+            line("data_point", point)
+        line("summary", {"data": await self._summary(report)})
+        yield flush()
+
+        if include_tasks:
+            async for task in self._tasks(report):
+                line("task", task)
+                if len(lines) >= CHUNK_ROWS:
+                    yield flush()
+        yield flush()
+
+    async def stream_xlsx(self, report: dict, include_tasks: bool = True) -> AsyncIterator[bytes]:
+        """
+        Sheets Data, Summary and Tasks built with openpyxl's write-only mode,
+        which spills rows to a temp file as they are appended. A zip can only be
+        sent once complete, so bytes start flowing after the last task row.
+        """
+        workbook = Workbook(write_only=True)
+
+        data_sheet = workbook.create_sheet("Data")
+        data_sheet.append(DATA_POINT_COLUMNS)
+        async for point in self._data_points(report):
+            data_sheet.append([_cell(data_sheet, value) for value in _data_point_row(point)])
+
+        summary_sheet = workbook.create_sheet("Summary")
+        summary_sheet.append(["summary", "value"])
+        for key, value in (await self._summary(report)).items():
+            summary_sheet.append([key, _cell(summary_sheet, value)])
+
+        if include_tasks:
+            task_sheet = workbook.create_sheet("Tasks")
+            task_sheet.append(TASK_EXPORT_FIELDS)
+            rows = 0
+            async for task in self._tasks(report):
+                task_sheet.append([_cell(task_sheet, task.get(field)) for field in TASK_EXPORT_FIELDS])
+                rows += 1
+                if rows % CHUNK_ROWS == 0:
+                    # Let other requests run between batches
+                    await asyncio.sleep(0)
+
+        handle, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(handle)
+        try:
+            # Zipping the sheets is blocking work
+            await asyncio.to_thread(workbook.save, path)
+            with open(path, "rb") as exported:
+                while chunk := exported.read(FILE_CHUNK_BYTES):
+                    yield chunk
+        finally:
+            os.remove(path)
+
+    def stream(self, report: dict, export_format: str, include_tasks: bool = True) -> AsyncIterator[bytes]:
+        if export_format == "csv":
+            return self.stream_csv(report, include_tasks)
+        if export_format == "ndjson":
+            return self.stream_ndjson(report, include_tasks)
+        return self.stream_xlsx(report, include_tasks)
+
+# Create global export service instance
+export_service = ExportService()
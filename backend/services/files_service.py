@@ -6,6 +6,8 @@ from db import get_database
 from models.jira import FileUpload
 from models.files import FileFilter
 from bson import ObjectId
+from services.data_version_service import data_version_service
+from services.risk_state_service import risk_state_service
 
 
 logger = logging.getLogger(__name__)
@@ -169,7 +171,7 @@ class FilesService:
             leaves_collection = db.leaves
             
             # Import risk service here to avoid circular import
-            from services.risk_service import run_risk_analysis
+            from services.risk_coordinator import request_risk_analysis
             
             # Find file that belongs to the user
             try:
@@ -181,9 +183,13 @@ class FilesService:
             if not doc:
                 return False
             
-            # Delete associated leave records
+            # Delete associated leave records (remembering whose risk they affected)
+            affected_employees = await leaves_collection.distinct("employee_account_id", {"file_id": file_id})
             delete_result = await leaves_collection.delete_many({"file_id": file_id})
             logger.info(f"🗑️ Deleted {delete_result.deleted_count} leave records associated with file {file_id}")
+            if delete_result.deleted_count:
+                await data_version_service.bump(user_id, "leave_delete")
+                await risk_state_service.mark_dirty(user_id, employees=affected_employees)
             
             # Delete file from disk
             file_path = os.path.join(UPLOAD_DIR, doc["filename"])
@@ -196,7 +202,7 @@ class FilesService:
             # Trigger risk analysis after deleting leaves
             logger.info("Triggering risk analysis after deleting leave records...")
             try:
-                risk_result = await run_risk_analysis(user_id)
+                risk_result = await request_risk_analysis(user_id)
                 logger.info(f"Risk analysis completed after deletion: {risk_result['count']} risks analyzed")
             except Exception as risk_error:
                 logger.error(f"Risk analysis failed after deletion: {risk_error}")
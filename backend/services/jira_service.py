@@ -1,12 +1,22 @@
 import httpx
 import logging
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 from cryptography.fernet import Fernet
 from db import get_database
 from models.jira import JiraCredentialsCreate, JiraCredentialsInDB, JiraTask, JiraProject, JiraUser
 from config import settings
+from models.task_status import normalize_status_category, STATUS_CATEGORY_DONE
+from models.tasks import summary_tokens
+from services.rollup_service import rollup_service
+from services.dashboard_service import dashboard_service, calculate_importance
+from services.data_version_service import data_version_service
+from services.risk_state_service import risk_state_service
+from services.event_bus import event_bus
+from utils.clock import utcnow
+from pymongo import UpdateOne, DeleteMany
 import base64
+import hashlib
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +30,7 @@ CORE_FIELDS = [
     "assignee",
     "created",
     "updated",
+    "resolutiondate",
     "project",
     "customfield_10015",   # ✅ Start Date
     "customfield_10016",  # ✅ Story Points
@@ -480,6 +491,11 @@ class JiraService:
                 sprint_raw = fields.get("customfield_10020")
                 start_date_raw = fields.get("customfield_10015")
 
+                status_category = normalize_status_category(
+                    status.get("name"),
+                    (status.get("statusCategory") or {}).get("key")
+                )
+
                 if start_date_raw:
                     start_date = parse_jira_date(start_date_raw)
                 else:
@@ -499,6 +515,8 @@ class JiraService:
                     key=issue.get("key", ""),
                     summary=fields.get("summary", ""),
                     status=status.get("name", ""),
+                    status_category=status_category,
+                    is_open=status_category != STATUS_CATEGORY_DONE,
                     priority=priority.get("name", "") if priority else "Unknown",
                     assignee=assignee_name,
                     assignee_email=assignee_email,
@@ -509,6 +527,7 @@ class JiraService:
                     created=parse_jira_datetime(fields.get("created")) if fields.get("created") else datetime.utcnow(),
                     updated=parse_jira_datetime(fields.get("updated")) if fields.get("updated") else datetime.utcnow(),
                     duedate=parse_jira_date(fields.get("duedate")) if fields.get("duedate") else None,
+                    resolved=parse_jira_datetime(fields.get("resolutiondate")) if fields.get("resolutiondate") else None,
                     project_key=project.get("key", ""),
                     project_name=project.get("name", ""),
                     issue_type=issuetype.get("name", "") if issuetype else "Task"
@@ -635,44 +654,94 @@ class JiraService:
             return []
 
     async def store_jira_tasks(self, user_id: str, tasks: List[JiraTask]) -> bool:
-        """Store Jira tasks in database"""
+        """Store Jira tasks in database, writing only tasks that changed since the last sync"""
         try:
             db = get_database()
             tasks_collection = db.jira_tasks
+            now = utcnow()
             
-            # Clear existing tasks for this user
-            await tasks_collection.delete_many({"user_id": user_id})
-            
-            # Insert new tasks
-            if tasks:
-                task_docs = []
-                for task in tasks:
-                    task_doc = {
-                        "user_id": task.user_id,
-                        "jira_id": task.jira_id,
-                        "key": task.key,
-                        "summary": task.summary,
-                        "status": task.status,
-                        "priority": task.priority,
-                        "assignee": task.assignee,
-                        "assignee_email": task.assignee_email,
-                        "assignee_account_id": task.assignee_account_id,
-                        "story_points": task.story_points,
-                        "start_date": task.start_date,
-                        "sprint": task.sprint,
-                        "created": task.created,
-                        "updated": task.updated,
-                        "duedate": task.duedate,
-                        "project_key": task.project_key,
-                        "project_name": task.project_name,
-                        "issue_type": task.issue_type
-                    }
-                    task_docs.append(task_doc)
+            previous = {}
+            async for doc in tasks_collection.find(
+                {"user_id": user_id},
+                {"jira_id": 1, "key": 1, "fingerprint": 1, "created": 1, "resolved": 1}
+            ):
+                previous[doc["jira_id"]] = doc
+            
+            # Remember created/resolved dates so velocity is only recomputed when they change
+            previous_dates = {
+                jira_id: (doc.get("created"), doc.get("resolved"))
+                for jira_id, doc in previous.items()
+            }
+            current_dates = {
+                task.jira_id: (to_mongo_datetime(task.created), to_mongo_datetime(task.resolved))
+                for task in tasks
+            }
+            if current_dates != previous_dates:
+                dashboard_service.invalidate_velocity(user_id)
+            
+            writes = []
+            changed_keys = []
+            for task in tasks:
+                task_doc = {
+                    "user_id": task.user_id,
+                    "jira_id": task.jira_id,
+                    "key": task.key,
+                    "summary": task.summary,
+                    "status": task.status,
+                    "status_category": task.status_category,
+                    "is_open": task.is_open,
+                    "priority": task.priority,
+                    "assignee": task.assignee,
+                    "assignee_email": task.assignee_email,
+                    "assignee_account_id": task.assignee_account_id,
+                    "story_points": task.story_points,
+                    "start_date": task.start_date,
+                    "sprint": task.sprint,
+                    "created": task.created,
+                    "updated": task.updated,
+                    "duedate": task.duedate,
+                    "resolved": task.resolved,
+                    "project_key": task.project_key,
+                    "project_name": task.project_name,
+                    "issue_type": task.issue_type
+                }
+                # Precomputed for the Eisenhower pipeline (priority, story points, issue type)
+                task_doc["importance"] = calculate_importance(task_doc)
+                task_doc["fingerprint"] = task_fingerprint(task_doc)
+                # Derived from the summary, so left out of the fingerprint
+                task_doc["summary_tokens"] = summary_tokens(task.summary)
                 
-                await tasks_collection.insert_many(task_docs)
-                logger.info(f"Storing task {task.key}")
-
-
+                existing = previous.pop(task.jira_id, None)
+                if existing and existing.get("fingerprint") == task_doc["fingerprint"]:
+                    continue
+                
+                writes.append(UpdateOne(
+                    {"user_id": user_id, "jira_id": task.jira_id},
+                    {"$set": {**task_doc, "modified_at": now}},
+                    upsert=True
+                ))
+                changed_keys.append(task.key)
+            
+            # Tasks no longer returned by Jira
+            if previous:
+                writes.append(DeleteMany({"user_id": user_id, "jira_id": {"$in": list(previous)}}))
+                changed_keys.extend(doc["key"] for doc in previous.values())
+            
+            if writes:
+                await tasks_collection.bulk_write(writes, ordered=False)
+                if previous:
+                    # Tombstones let incremental extracts drop the removed tasks
+                    await db.task_deletions.insert_many([
+                        {"user_id": user_id, "jira_id": jira_id, "key": doc["key"], "deleted_at": now}
+                        for jira_id, doc in previous.items()
+                    ])
+                await data_version_service.bump(user_id, "jira_sync")
+                await risk_state_service.mark_dirty(user_id, task_keys=changed_keys)
+            
+            logger.info(
+                f"Stored Jira tasks for user {user_id}: {len(changed_keys) - len(previous)} upserted, "
+                f"{len(previous)} removed, {len(tasks) - len(changed_keys) + len(previous)} unchanged"
+            )
             
             return True
             
@@ -711,12 +780,16 @@ class JiraService:
                 logger.info(f"store_jira_tasks result = {result}")
             else:
                 logger.warning("No tasks returned from fetch_jira_tasks")
-
             
+            # Snapshot today's counts for trends and historical charts
+            await rollup_service.write_daily_rollup(user_id)
+
+            event_bus.publish(user_id, "sync.completed", {"tasks": len(tasks)})
             return True
             
         except Exception as e:
             logger.error(f"Failed to sync Jira data for user {user_id}")
+            event_bus.publish(user_id, "sync.failed", {})
             return False
 
     # New methods for specific issue types (matching the updated API)
@@ -862,6 +935,24 @@ class JiraService:
 
 # Helper functions for date parsing
 
+def task_fingerprint(task_doc: dict) -> str:
+    """Stable hash of a stored task's fields, used to skip unchanged tasks on sync"""
+    normalized = sorted(
+        (field, to_mongo_datetime(value) if isinstance(value, datetime) else value)
+        for field, value in task_doc.items()
+    )
+    return hashlib.sha1(repr(normalized).encode()).hexdigest()
+
+
+def to_mongo_datetime(value):
+    """Normalize a datetime the way MongoDB returns it: naive UTC, millisecond precision"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+
 def parse_jira_datetime(date_str):
     """Parse JIRA datetime string in various formats"""
     if not date_str:
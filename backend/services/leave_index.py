@@ -0,0 +1,93 @@
+import bisect
+import logging
+from datetime import datetime
+from typing import Collection, Dict, Iterable, List, Optional, Tuple
+from db import get_database
+
+logger = logging.getLogger(__name__)
+
+Interval = Tuple[datetime, datetime]
+
+
+class LeaveIntervalIndex:
+    """
+    Per-employee leave ranges, merged and sorted for O(log n) overlap checks.
+
+    Overlapping (or touching) leave records of one employee are merged, so a
+    lookup reports the full continuous absence around a date.
+    """
+
+    def __init__(self):
+        self._starts: Dict[str, List[datetime]] = {}
+        self._intervals: Dict[str, List[Interval]] = {}
+
+    @classmethod
+    def from_leaves(cls, leaves: Iterable[dict]) -> "LeaveIntervalIndex":
+        raw: Dict[str, List[Interval]] = {}
+        for leave in leaves:
+            employee_id = leave.get("employee_account_id")
+            start, end = leave.get("leave_start"), leave.get("leave_end")
+            if not employee_id or not start or not end or end < start:
+                continue
+            raw.setdefault(employee_id, []).append((start, end))
+
+        index = cls()
+        for employee_id, intervals in raw.items():
+            intervals.sort()
+            merged = [intervals[0]]
+            for start, end in intervals[1:]:
+                last_start, last_end = merged[-1]
+                if start <= last_end:
+                    merged[-1] = (last_start, max(last_end, end))
+                else:
+                    merged.append((start, end))
+            index._intervals[employee_id] = merged
+            index._starts[employee_id] = [start for start, _ in merged]
+        return index
+
+    @property
+    def employee_ids(self) -> List[str]:
+        return list(self._intervals)
+
+    def __contains__(self, employee_id: str) -> bool:
+        return employee_id in self._intervals
+
+    def __len__(self) -> int:
+        return sum(len(intervals) for intervals in self._intervals.values())
+
+    def intervals(self, employee_id: str) -> List[Interval]:
+        return self._intervals.get(employee_id, [])
+
+    def find_overlap(self, employee_id: str, moment: datetime) -> Optional[Interval]:
+        """Leave range with start <= moment <= end for the employee, if any"""
+        starts = self._starts.get(employee_id)
+        if not starts:
+            return None
+
+        # Last merged range starting on or before the moment; ranges are disjoint
+        position = bisect.bisect_right(starts, moment) - 1
+        if position < 0:
+            return None
+        start, end = self._intervals[employee_id][position]
+        return (start, end) if moment <= end else None
+
+
+async def load_leave_index(
+    user_id: Optional[str] = None,
+    employee_ids: Optional[Collection[str]] = None
+) -> LeaveIntervalIndex:
+    """Load a tenant's leave records once (optionally only some employees) and index them by employee"""
+    if employee_ids is not None and not employee_ids:
+        return LeaveIntervalIndex()
+
+    db = get_database()
+    leave_filter = {"user_id": user_id} if user_id else {}
+    if employee_ids is not None:
+        leave_filter["employee_account_id"] = {"$in": list(employee_ids)}
+    cursor = db.leaves.find(
+        leave_filter,
+        {"_id": 0, "employee_account_id": 1, "leave_start": 1, "leave_end": 1}
+    )
+    index = LeaveIntervalIndex.from_leaves(await cursor.to_list(length=None))
+    logger.info(f"📋 Indexed {len(index)} leave ranges for {len(index.employee_ids)} employees")
+    return index
@@ -3,7 +3,10 @@ from datetime import datetime
 from db import get_database
 import logging
 from bson import ObjectId
-from services.risk_service import run_risk_analysis
+from services.risk_coordinator import request_risk_analysis
+from services.data_version_service import data_version_service
+from services.risk_state_service import risk_state_service
+from services.event_bus import event_bus
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +73,10 @@ async def process_leave_file(file_id: str, file_path: str, user_id: str):
         if records:
             result = await leaves_collection.insert_many(records)
             logger.info(f"✅ Inserted {len(records)} leave records into database")
+            await data_version_service.bump(user_id, "leave_upload")
+            await risk_state_service.mark_dirty(
+                user_id, employees={record["employee_account_id"] for record in records}
+            )
         else:
             logger.warning("⚠️ No valid records to insert")
 
@@ -91,10 +98,12 @@ async def process_leave_file(file_id: str, file_path: str, user_id: str):
                 }
             )
 
+        event_bus.publish(user_id, "leave.processed", {"file_id": file_id, "records": len(records)})
+
         # Trigger risk analysis after processing leaves
         logger.info("Triggering risk analysis after leave processing...")
         try:
-            risk_result = await run_risk_analysis(user_id)
+            risk_result = await request_risk_analysis(user_id)
             logger.info(f"Risk analysis completed: {risk_result['count']} new risks created")
         except Exception as risk_error:
             logger.error(f"Risk analysis failed: {risk_error}")
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from db import get_database
+from models.reports import ReportGenerationRequest
+from utils.clock import utcnow
+
+logger = logging.getLogger(__name__)
+
+# Request fields that change a report's data (name, description and visibility do not)
+FILTER_FIELDS = ["report_type", "start_date", "end_date", "project_key", "user_id"]
+
+
+def normalize_filters(request: ReportGenerationRequest) -> Dict[str, Any]:
+    filters = {}
+    for field in FILTER_FIELDS:
+        value = getattr(request, field)
+        if isinstance(value, str):
+            value = value.strip() or None
+        elif value is not None:
+            value = value.isoformat()
+        filters[field] = value
+    return filters
+
+
+def report_cache_key(user_id: str, request: ReportGenerationRequest, version: int, day: date) -> str:
+    """
+    Key on the tenant's data version and the UTC day: reports read only that
+    data, and their date-based figures (overdue, risk levels) move with the day.
+    """
+    payload = json.dumps([user_id, normalize_filters(request), version, day.isoformat()], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class ReportCache:
+    """
+    Two-tier cache of generated report data: a bounded in-process LRU in front
+    of the report_cache collection (TTL-expired), shared across workers.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # key -> (data points as dicts, summary)
+        self._entries: "OrderedDict[str, Tuple[List[dict], dict]]" = OrderedDict()
+
+    def _remember(self, key: str, entry: Tuple[List[dict], dict]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Tuple[List[dict], dict]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        try:
+            db = get_database()
+            doc = await db.report_cache.find_one({"_id": key}, {"data": 1, "summary": 1})
+        except Exception as e:
+            logger.error(f"Failed to read report cache: {e}")
+            return None
+        if doc is None:
+            return None
+
+        entry = (doc.get("data", []), doc.get("summary", {}))
+        self._remember(key, entry)
+        return entry
+
+    async def put(self, key: str, user_id: str, report_type: str, data: List[dict], summary: dict):
+        self._remember(key, (data, summary))
+        try:
+            db = get_database()
+            await db.report_cache.replace_one(
+                {"_id": key},
+                {"user_id": user_id, "report_type": report_type, "data": data, "summary": summary, "created_at": utcnow()},
+                upsert=True
+            )
+        except Exception as e:
+            # The in-process tier still holds the entry
+            logger.error(f"Failed to write report cache: {e}")
@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import uuid
+from datetime import timedelta
+from typing import Dict, Optional
+from pymongo.errors import DuplicateKeyError
+from db import get_database
+from models.reports import ReportGenerationRequest, ReportJob
+from services.reports_service import reports_service
+from services.event_bus import event_bus
+from config import settings
+from utils.clock import utcnow
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ["queued", "running"]
+# Each process refreshes heartbeat_at on its active jobs this often
+HEARTBEAT_SECONDS = 15
+# Active jobs whose heartbeat is older than this belong to a dead process
+STALE_AFTER_SECONDS = 90
+
+
+class ReportJobLimitError(Exception):
+    """The user already has the maximum number of report jobs in flight"""
+
+
+class ReportJobService:
+    """
+    Runs report generation in the background (collection: report_jobs).
+
+    At most REPORT_JOB_WORKERS jobs generate at once in this process, and each
+    user may have REPORT_JOBS_PER_USER jobs queued or running, counted in
+    report_job_slots so the cap holds across concurrent requests and processes.
+    Progress is stored on the job document and pushed as report.progress events.
+    Jobs record the process that owns them and a heartbeat, so only jobs
+    whose owner has stopped heartbeating are failed as interrupted.
+    """
+
+    def __init__(self, workers: int):
+        self._slots = asyncio.Semaphore(workers)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.instance_id = uuid.uuid4().hex
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _to_model(doc: dict) -> ReportJob:
+        return ReportJob(**{**doc, "id": doc["_id"]})
+
+    async def _claim_slot(self, user_id: str):
+        """Take one of the user's job slots, atomically; raises ReportJobLimitError when none is free"""
+        db = get_database()
+        claim = {"_id": user_id, "active": {"$lt": settings.REPORT_JOBS_PER_USER}}
+        try:
+            await db.report_job_slots.update_one(claim, {"$inc": {"active": 1}}, upsert=True)
+            return
+        except DuplicateKeyError:
+            # The counter exists: either it is at the cap, or a concurrent first claim created it
+            pass
+
+        result = await db.report_job_slots.update_one(claim, {"$inc": {"active": 1}})
+        if not result.modified_count:
+            raise ReportJobLimitError(f"At most {settings.REPORT_JOBS_PER_USER} report jobs can run at once")
+
+    async def _release_slot(self, user_id: str):
+        db = get_database()
+        await db.report_job_slots.update_one({"_id": user_id, "active": {"$gt": 0}}, {"$inc": {"active": -1}})
+
+    async def submit(self, user_id: str, request: ReportGenerationRequest) -> ReportJob:
+        """Queue a report; raises ReportJobLimitError when the user's cap is reached"""
+        db = get_database()
+        await self._claim_slot(user_id)
+
+        now = utcnow()
+        job_doc = {
+            "_id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "status": "queued",
+            "progress": 0,
+            "stage": "queued",
+            "report_type": request.report_type,
+            "name": request.name,
+            "request": request.dict(),
+            "report_id": None,
+            "error": None,
+            "cancel_requested": False,
+            "owner": self.instance_id,
+            "heartbeat_at": now,
+            "created_at": now,
+            "updated_at": now
+        }
+        try:
+            await db.report_jobs.insert_one(job_doc)
+        except Exception:
+            await self._release_slot(user_id)
+            raise
+
+        task = asyncio.create_task(self._run(job_doc["_id"], user_id, request))
+        self._tasks[job_doc["_id"]] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_doc["_id"], None))
+
+        logger.info(f"Queued report job {job_doc['_id']} ({request.report_type}) for user {user_id}")
+        return self._to_model(job_doc)
+
+    async def get_job(self, user_id: str, job_id: str) -> Optional[ReportJob]:
+        db = get_database()
+        doc = await db.report_jobs.find_one({"_id": job_id, "user_id": user_id})
+        return self._to_model(doc) if doc else None
+
+    async def cancel(self, user_id: str, job_id: str) -> Optional[ReportJob]:
+        """
+        Request cancellation of a queued or running job; finished jobs are returned unchanged.
+
+        Only the owning process writes the terminal status, so a job can never be
+        reported cancelled here while its owner goes on to complete it.
+        """
+        db = get_database()
+        doc = await db.report_jobs.find_one_and_update(
+            {"_id": job_id, "user_id": user_id, "status": {"$in": ACTIVE_STATUSES}},
+            {"$set": {"cancel_requested": True, "updated_at": utcnow()}}
+        )
+        if doc is None:
+            return await self.get_job(user_id, job_id)
+
+        task = self._tasks.get(job_id)
+        if task:
+            task.cancel()
+        # Otherwise another process owns it: it sees the flag between stages or on its next heartbeat
+        return await self.get_job(user_id, job_id)
+
+    async def recover(self):
+        """Fail active jobs whose owning process stopped heartbeating (their tasks died with it)"""
+        try:
+            db = get_database()
+            stale_before = utcnow() - timedelta(seconds=STALE_AFTER_SECONDS)
+            query = {
+                "status": {"$in": ACTIVE_STATUSES},
+                "owner": {"$ne": self.instance_id},
+                "$or": [{"heartbeat_at": {"$lt": stale_before}}, {"heartbeat_at": {"$exists": False}}]
+            }
+            failed = 0
+            async for doc in db.report_jobs.find(query, {"user_id": 1, "cancel_requested": 1}):
+                if doc.get("cancel_requested"):
+                    finished = await self._finish(doc["user_id"], doc["_id"], "cancelled")
+                else:
+                    finished = await self._finish(doc["user_id"], doc["_id"], "failed", error="Interrupted: the server running it stopped")
+                if finished:
+                    failed += 1
+            if failed:
+                logger.info(f"Marked {failed} interrupted report jobs as failed")
+
+        except Exception as e:
+            logger.error(f"Failed to recover report jobs: {e}")
+
+    def start(self):
+        """Start heartbeating this process's jobs and sweeping up other processes' stale ones"""
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            try:
+                db = get_database()
+                await db.report_jobs.update_many(
+                    {"owner": self.instance_id, "status": {"$in": ACTIVE_STATUSES}},
+                    {"$set": {"heartbeat_at": utcnow()}}
+                )
+                # Cancellations requested through other processes, including jobs still waiting for a worker
+                cancelled = db.report_jobs.find(
+                    {"owner": self.instance_id, "status": {"$in": ACTIVE_STATUSES}, "cancel_requested": True},
+                    {"_id": 1}
+                )
+                async for doc in cancelled:
+                    task = self._tasks.get(doc["_id"])
+                    if task:
+                        task.cancel()
+            except Exception as e:
+                logger.error(f"Failed to heartbeat report jobs: {e}")
+            await self.recover()
+
+    def shutdown(self):
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        for task in list(self._tasks.values()):
+            task.cancel()
+
+    async def _update(self, user_id: str, job_id: str, **fields):
+        db = get_database()
+        await db.report_jobs.update_one(
+            {"_id": job_id, "status": {"$in": ACTIVE_STATUSES}},
+            {"$set": {**fields, "updated_at": utcnow()}}
+        )
+        event_bus.publish(user_id, "report.progress", {"job_id": job_id, **fields})
+
+    async def _finish(self, user_id: str, job_id: str, status: str, condition: Optional[dict] = None, **fields) -> bool:
+        """Move an active job (matching condition) to a terminal status and free its slot; False if nothing matched"""
+        db = get_database()
+        result = await db.report_jobs.update_one(
+            {"_id": job_id, "status": {"$in": ACTIVE_STATUSES}, **(condition or {})},
+            {"$set": {"status": status, "stage": status, **fields, "updated_at": utcnow()}}
+        )
+        if not result.modified_count:
+            return False
+
+        await self._release_slot(user_id)
+        event_bus.publish(user_id, "report.progress", {"job_id": job_id, "status": status, "stage": status, **fields})
+        return True
+
+    async def _check_cancelled(self, job_id: str):
+        db = get_database()
+        doc = await db.report_jobs.find_one({"_id": job_id}, {"cancel_requested": 1})
+        if doc and doc.get("cancel_requested"):
+            raise asyncio.CancelledError()
+
+    async def _run(self, job_id: str, user_id: str, request: ReportGenerationRequest):
+        try:
+            async with self._slots:
+                await self._check_cancelled(job_id)
+                await self._update(user_id, job_id, status="running", progress=5, stage="started")
+
+                async def progress(percent: int, stage: str):
+                    await self._check_cancelled(job_id)
+                    await self._update(user_id, job_id, progress=percent, stage=stage)
+
+                report, _ = await reports_service.generate_report(user_id, request, progress=progress)
+
+            if report is None:
+                await self._finish(user_id, job_id, "failed", error="Failed to generate report")
+            else:
+                completed = await self._finish(
+                    user_id, job_id, "completed", condition={"cancel_requested": False},
+                    progress=100, report_id=report.metadata.id
+                )
+                if not completed:
+                    # Cancelled after the last check; the report is already saved, so keep its id
+                    await self._finish(user_id, job_id, "cancelled", report_id=report.metadata.id)
+
+        except asyncio.CancelledError:
+            logger.info(f"Report job {job_id} cancelled")
+            await asyncio.shield(self._finish(user_id, job_id, "cancelled"))
+
+        except Exception as e:
+            logger.error(f"Report job {job_id} failed: {e}")
+            await self._finish(user_id, job_id, "failed", error=str(e))
+
+# Create global report job service instance
+report_job_service = ReportJobService(settings.REPORT_JOB_WORKERS)
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Optional, Dict, Any
+from typing import Awaitable, Callable, List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from db import get_database
 from models.reports import (
@@ -12,11 +12,60 @@ from models.reports import (
 )
 from models.jira import JiraTask, JiraProject
 from models.auth import UserResponse
+from models.task_status import STATUS_CATEGORY_TODO, STATUS_CATEGORY_IN_PROGRESS, STATUS_CATEGORY_DONE
+from config import settings
+from services.event_bus import event_bus
+from services.data_version_service import data_version_service
+from services.report_cache import ReportCache, report_cache_key
+from utils.clock import utcnow
 import uuid
 
 logger = logging.getLogger(__name__)
 
+
+# -----------------------------
+# Aggregation helpers: generators count on the server and only read buckets back
+# -----------------------------
+
+def or_default(field: str, default: str) -> dict:
+    """Python's `value or default` for a field (missing, null, "" and 0 fall back)"""
+    return {"$cond": [{"$in": [{"$ifNull": [field, ""]}, ["", 0, False]]}, default, field]}
+
+
+def count_if(condition: dict) -> dict:
+    return {"$sum": {"$cond": [condition, 1, 0]}}
+
+
+def count_by(key: Any) -> List[dict]:
+    """Counts per key, in the order keys first appear (lowest _id), like counting into a dict"""
+    return [
+        {"$group": {"_id": key, "count": {"$sum": 1}, "first_id": {"$min": "$_id"}}},
+        {"$sort": {"first_id": 1}}
+    ]
+
+
+def task_totals_fields(now: datetime) -> dict:
+    return {
+        "total_tasks": {"$sum": 1},
+        "completed_tasks": count_if({"$eq": ["$status_category", STATUS_CATEGORY_DONE]}),
+        "in_progress_tasks": count_if({"$eq": ["$status_category", STATUS_CATEGORY_IN_PROGRESS]}),
+        "overdue_tasks": count_if({"$and": [
+            {"$eq": [{"$type": "$duedate"}, "date"]},
+            {"$lt": ["$duedate", now]},
+            {"$ne": ["$status_category", STATUS_CATEGORY_DONE]}
+        ]}),
+        "story_points": {"$sum": {"$cond": [{"$isNumber": "$story_points"}, "$story_points", 0]}}
+    }
+
+
+def task_totals(now: datetime) -> List[dict]:
+    return [{"$group": {"_id": None, **task_totals_fields(now)}}]
+
+
 class ReportsService:
+    def __init__(self):
+        self.result_cache = ReportCache(settings.REPORT_CACHE_MAX_ENTRIES)
+
     async def get_available_reports(self, user_id: str, page: int = 1, size: int = 50) -> ReportListResponse:
         """Get list of available reports for the user"""
         try:
@@ -126,8 +175,16 @@ class ReportsService:
             logger.error(f"Failed to get report {report_id} for user {user_id}: {e}")
             return None
 
-    async def generate_report(self, user_id: str, request: ReportGenerationRequest) -> Optional[ReportResponse]:
-        """Generate a new report based on the request"""
+    async def generate_report(
+        self,
+        user_id: str,
+        request: ReportGenerationRequest,
+        progress: Optional[Callable[[int, str], Awaitable[None]]] = None
+    ) -> Tuple[Optional[ReportResponse], bool]:
+        """
+        Generate a new report based on the request; also returns whether its data came from the cache.
+        `progress(percent, stage)` is awaited between stages. Nothing is stored until the data is ready.
+        """
         try:
             db = get_database()
             reports_collection = db.reports
@@ -154,14 +211,22 @@ class ReportsService:
                 }
             }
             
-            # Insert report metadata
-            await reports_collection.insert_one(report_metadata_doc)
+            # Same type and filters on unchanged data (and the same day) reuse the earlier result
+            version = await data_version_service.get_version(user_id)
+            cache_key = report_cache_key(user_id, request, version, utcnow().date()) if version >= 0 else None
+            cached = await self.result_cache.get(cache_key) if cache_key else None
+            if progress:
+                await progress(20, "cached" if cached is not None else "generating")
             
             # Generate report data based on type
             data_points = []
             summary = {}
             
-            if request.report_type == "task_summary":
+            if cached is not None:
+                data_points = [ReportDataPoint(**point) for point in cached[0]]
+                summary = cached[1]
+                logger.info(f"Report cache hit for user {user_id} ({request.report_type})")
+            elif request.report_type == "task_summary":
                 data_points, summary = await self._generate_task_summary_report(user_id, request)
             elif request.report_type == "user_performance":
                 data_points, summary = await self._generate_user_performance_report(user_id, request)
@@ -174,6 +239,19 @@ class ReportsService:
             elif request.report_type == "risk_analysis":
                 data_points, summary = await self._generate_risk_analysis_report(user_id, request)
             
+            # Generators return ([], {}) or an "error" summary when they fail; those are not cached
+            if cached is None and cache_key and (data_points or summary) and "error" not in summary:
+                await self.result_cache.put(
+                    cache_key, user_id, request.report_type,
+                    [point.dict() for point in data_points], summary
+                )
+            
+            if progress:
+                await progress(80, "storing")
+            
+            # Insert report metadata
+            await reports_collection.insert_one(report_metadata_doc)
+            
             # Store report data
             if data_points:
                 data_collection = db.report_data
@@ -196,6 +274,12 @@ class ReportsService:
                     "data": summary
                 })
             
+            event_bus.publish(user_id, "report.completed", {
+                "report_id": report_id,
+                "name": request.name,
+                "report_type": request.report_type
+            })
+            
             # Return the generated report
             report_metadata = ReportMetadata(
                 id=report_id,
@@ -213,11 +297,11 @@ class ReportsService:
                 data=data_points,
                 summary=summary,
                 filters=request.dict()
-            )
+            ), cached is not None
             
         except Exception as e:
             logger.error(f"Failed to generate report for user {user_id}: {e}")
-            return None
+            return None, False
 
     async def _generate_task_summary_report(self, user_id: str, request: ReportGenerationRequest) -> tuple:
         """Generate task summary report"""
@@ -246,85 +330,55 @@ class ReportsService:
                     date_query["$lte"] = request.end_date
                 query["created"] = date_query
             
-            # Get tasks
-            cursor = tasks_collection.find(query)
-            tasks = []
-            status_counts = {}
-            priority_counts = {}
-            assignee_counts = {}
-            
-            async for doc in cursor:
-                task = JiraTask(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    jira_id=doc["jira_id"],
-                    key=doc["key"],
-                    summary=doc["summary"],
-                    status=doc["status"],
-                    priority=doc["priority"],
-                    assignee=doc["assignee"],
-                    assignee_account_id=doc.get("assignee_account_id"),
-                    assignee_email=doc.get("assignee_email"),
-                    story_points=doc.get("story_points"),
-                    start_date=doc.get("start_date"),
-                    sprint=doc.get("sprint"),
-                    created=doc["created"],
-                    updated=doc["updated"],
-                    duedate=doc["duedate"],
-                    project_key=doc["project_key"],
-                    project_name=doc["project_name"],
-                    issue_type=doc["issue_type"]
-                )
-                tasks.append(task)
-                
-                # Count by status
-                status_counts[task.status] = status_counts.get(task.status, 0) + 1
-                
-                # Count by priority
-                priority_counts[task.priority] = priority_counts.get(task.priority, 0) + 1
-                
-                # Count by assignee
-                assignee = task.assignee or "Unassigned"
-                assignee_counts[assignee] = assignee_counts.get(assignee, 0) + 1
+            # Count by status, priority and assignee, plus totals, in one pass on the server
+            pipeline = [
+                {"$match": query},
+                {"$facet": {
+                    "status": count_by("$status"),
+                    "priority": count_by("$priority"),
+                    "assignee": count_by(or_default("$assignee", "Unassigned")),
+                    "totals": task_totals(datetime.utcnow())
+                }}
+            ]
+            result = (await tasks_collection.aggregate(pipeline).to_list(length=1))[0]
+            totals = result["totals"][0] if result["totals"] else {}
             
             # Create data points
             data_points = []
             
             # Status distribution
-            for status, count in status_counts.items():
+            for bucket in result["status"]:
                 data_points.append(ReportDataPoint(
-                    label=f"Status: {status}",
-                    value=count,
+                    label=f"Status: {bucket['_id']}",
+                    value=bucket["count"],
                     metadata={"category": "status"}
                 ))
             
             # Priority distribution
-            for priority, count in priority_counts.items():
+            for bucket in result["priority"]:
                 data_points.append(ReportDataPoint(
-                    label=f"Priority: {priority}",
-                    value=count,
+                    label=f"Priority: {bucket['_id']}",
+                    value=bucket["count"],
                     metadata={"category": "priority"}
                 ))
             
             # Assignee distribution
-            for assignee, count in assignee_counts.items():
+            for bucket in result["assignee"]:
                 data_points.append(ReportDataPoint(
-                    label=f"Assignee: {assignee}",
-                    value=count,
+                    label=f"Assignee: {bucket['_id']}",
+                    value=bucket["count"],
                     metadata={"category": "assignee"}
                 ))
             
             # Summary statistics
-            total_tasks = len(tasks)
-            completed_tasks = len([t for t in tasks if t.status in ["Done", "Closed", "Resolved"]])
-            in_progress_tasks = len([t for t in tasks if t.status in ["In Progress", "In Review"]])
-            overdue_tasks = len([t for t in tasks if t.duedate and t.duedate < datetime.utcnow() and t.status not in ["Done", "Closed", "Resolved"]])
+            total_tasks = totals.get("total_tasks", 0)
+            completed_tasks = totals.get("completed_tasks", 0)
             
             summary = {
                 "total_tasks": total_tasks,
                 "completed_tasks": completed_tasks,
-                "in_progress_tasks": in_progress_tasks,
-                "overdue_tasks": overdue_tasks,
+                "in_progress_tasks": totals.get("in_progress_tasks", 0),
+                "overdue_tasks": totals.get("overdue_tasks", 0),
                 "completion_rate": round((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 2)
             }
             
@@ -352,62 +406,37 @@ class ReportsService:
             elif request.project_key:
                 query["project_key"] = request.project_key
             
-            # Get tasks
-            cursor = tasks_collection.find(query)
-            tasks = []
-            user_task_counts = {}
-            
-            async for doc in cursor:
-                task = JiraTask(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    jira_id=doc["jira_id"],
-                    key=doc["key"],
-                    summary=doc["summary"],
-                    status=doc["status"],
-                    priority=doc["priority"],
-                    assignee=doc["assignee"],
-                    assignee_account_id=doc.get("assignee_account_id"),
-                    assignee_email=doc.get("assignee_email"),
-                    story_points=doc.get("story_points"),
-                    start_date=doc.get("start_date"),
-                    sprint=doc.get("sprint"),
-                    created=doc["created"],
-                    updated=doc["updated"],
-                    duedate=doc["duedate"],
-                    project_key=doc["project_key"],
-                    project_name=doc["project_name"],
-                    issue_type=doc["issue_type"]
-                )
-                tasks.append(task)
-                
-                # Count tasks per user - prioritize using account_id if available
-                assignee_id = task.assignee_account_id or task.assignee or "Unassigned"
-                assignee_display = task.assignee or "Unassigned"
-                
-                # Use display name for the count dictionary
-                user_task_counts[assignee_display] = user_task_counts.get(assignee_display, 0) + 1
+            # Tasks per assignee (by display name) and totals
+            pipeline = [
+                {"$match": query},
+                {"$facet": {
+                    "users": count_by(or_default("$assignee", "Unassigned")),
+                    "totals": task_totals(datetime.utcnow())
+                }}
+            ]
+            result = (await tasks_collection.aggregate(pipeline).to_list(length=1))[0]
+            totals = result["totals"][0] if result["totals"] else {}
             
             # Create data points
             data_points = []
             
             # Tasks per user
-            for user, count in user_task_counts.items():
+            for bucket in result["users"]:
                 data_points.append(ReportDataPoint(
-                    label=f"User: {user}",
-                    value=count,
+                    label=f"User: {bucket['_id']}",
+                    value=bucket["count"],
                     metadata={"category": "user_tasks"}
                 ))
             
             # Summary statistics
-            total_tasks = len(tasks)
-            completed_tasks = len([t for t in tasks if t.status in ["Done", "Closed", "Resolved"]])
+            total_tasks = totals.get("total_tasks", 0)
+            completed_tasks = totals.get("completed_tasks", 0)
             
             summary = {
                 "total_tasks": total_tasks,
                 "completed_tasks": completed_tasks,
                 "completion_rate": round((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 2),
-                "active_users": len(user_task_counts)
+                "active_users": len(result["users"])
             }
             
             return data_points, summary
@@ -440,47 +469,54 @@ class ReportsService:
             # Debug logging
             logger.info(f"Project progress report query for user {user_id}: {query}")
             
-            # Get all tasks matching the criteria
-            tasks_cursor = tasks_collection.find(query)
-            tasks = []
-            async for task in tasks_cursor:
-                tasks.append(task)
+            # Per-project counts by normalized status category; tasks without a project only count as matched
+            pipeline = [
+                {"$match": query},
+                {"$facet": {
+                    "matched": [{"$count": "count"}],
+                    "projects": [
+                        {"$match": {"project_key": {"$nin": [None, ""]}}},
+                        {"$group": {
+                            "_id": "$project_key",
+                            "first_id": {"$min": "$_id"},
+                            # Name as on the project's first task
+                            "project_name": {"$top": {
+                                "sortBy": {"_id": 1},
+                                "output": {"$cond": [
+                                    {"$eq": [{"$type": "$project_name"}, "missing"]},
+                                    "Unknown Project",
+                                    "$project_name"
+                                ]}
+                            }},
+                            "total_tasks": {"$sum": 1},
+                            "completed_tasks": count_if({"$eq": ["$status_category", STATUS_CATEGORY_DONE]}),
+                            "in_progress_tasks": count_if({"$eq": ["$status_category", STATUS_CATEGORY_IN_PROGRESS]}),
+                            "todo_tasks": count_if({"$eq": ["$status_category", STATUS_CATEGORY_TODO]})
+                        }},
+                        {"$sort": {"first_id": 1}}
+                    ]
+                }}
+            ]
+            result = (await tasks_collection.aggregate(pipeline).to_list(length=1))[0]
+            matched = result["matched"][0]["count"] if result["matched"] else 0
             
-            logger.info(f"Found {len(tasks)} tasks for project progress report")
+            logger.info(f"Found {matched} tasks for project progress report")
             
-            if not tasks:
+            if not matched:
                 logger.warning(f"No tasks found for user {user_id} with query: {query}")
                 return [], {"total_projects": 0, "average_completion_rate": 0, "projects": [], "message": "No tasks found matching the criteria"}
             
             # Group tasks by project
             projects = {}
-            for task in tasks:
-                project_key = task.get('project_key')
-                project_name = task.get('project_name', 'Unknown Project')
-                
-                if project_key:
-                    if project_key not in projects:
-                        projects[project_key] = {
-                            'project_name': project_name,
-                            'total_tasks': 0,
-                            'completed_tasks': 0,
-                            'in_progress_tasks': 0,
-                            'todo_tasks': 0,
-                            'other_tasks': 0
-                        }
-                    
-                    projects[project_key]['total_tasks'] += 1
-                    
-                    # Categorize by status
-                    status = task.get('status', '').lower()
-                    if status in ['done', 'closed', 'resolved']:
-                        projects[project_key]['completed_tasks'] += 1
-                    elif status in ['in progress', 'in review']:
-                        projects[project_key]['in_progress_tasks'] += 1
-                    elif status in ['to do', 'todo']:
-                        projects[project_key]['todo_tasks'] += 1
-                    else:
-                        projects[project_key]['other_tasks'] += 1
+            for bucket in result["projects"]:
+                projects[bucket["_id"]] = {
+                    'project_name': bucket["project_name"],
+                    'total_tasks': bucket["total_tasks"],
+                    'completed_tasks': bucket["completed_tasks"],
+                    'in_progress_tasks': bucket["in_progress_tasks"],
+                    'todo_tasks': bucket["todo_tasks"],
+                    'other_tasks': bucket["total_tasks"] - bucket["completed_tasks"] - bucket["in_progress_tasks"] - bucket["todo_tasks"]
+                }
             
             # Create data points and project data
             project_data = []
@@ -584,39 +620,19 @@ class ReportsService:
                     {"assignee": request.user_id}  # For backward compatibility
                 ]
             
-            # Get tasks
-            cursor = tasks_collection.find(query)
-            tasks = []
-            total_estimated_hours = 0
-            total_story_points = 0
+            # Totals only; story points are summed on the server
+            pipeline = [
+                {"$match": query},
+                {"$group": {"_id": None, **task_totals_fields(datetime.utcnow())}}
+            ]
+            totals = await tasks_collection.aggregate(pipeline).to_list(length=1)
+            totals = totals[0] if totals else {}
             
-            async for doc in cursor:
-                task = JiraTask(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    jira_id=doc["jira_id"],
-                    key=doc["key"],
-                    summary=doc["summary"],
-                    status=doc["status"],
-                    priority=doc["priority"],
-                    assignee=doc["assignee"],
-                    assignee_account_id=doc.get("assignee_account_id"),
-                    assignee_email=doc.get("assignee_email"),
-                    story_points=doc.get("story_points"),
-                    created=doc["created"],
-                    updated=doc["updated"],
-                    duedate=doc["duedate"],
-                    project_key=doc["project_key"],
-                    project_name=doc["project_name"],
-                    issue_type=doc["issue_type"]
-                )
-                tasks.append(task)
-                
-                # Add to estimated hours if available
-                if task.story_points:
-                    total_story_points += float(task.story_points)
-                    # Convert story points to hours (typically 1 story point = 1 hour)
-                    total_estimated_hours += float(task.story_points)
+            total_tasks = totals.get("total_tasks", 0)
+            completed_tasks = totals.get("completed_tasks", 0)
+            total_story_points = float(totals.get("story_points", 0))
+            # Convert story points to hours (typically 1 story point = 1 hour)
+            total_estimated_hours = total_story_points
             
             # Create data points
             data_points = [
@@ -632,24 +648,23 @@ class ReportsService:
                 ),
                 ReportDataPoint(
                     label="Total Tasks",
-                    value=len(tasks),
+                    value=total_tasks,
                     metadata={"category": "total_tasks"}
                 ),
                 ReportDataPoint(
                     label="Completed Tasks",
-                    value=len([t for t in tasks if t.status in ["Done", "Closed", "Resolved"]]),
+                    value=completed_tasks,
                     metadata={"category": "completed_tasks"}
                 )
             ]
             
             # Calculate summary
-            completed_tasks = len([t for t in tasks if t.status in ["Done", "Closed", "Resolved"]])
-            completion_rate = round((completed_tasks / len(tasks) * 100) if len(tasks) > 0 else 0, 2)
+            completion_rate = round((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 2)
             
             summary = {
                 "total_estimated_hours": round(total_estimated_hours, 2),
                 "total_story_points": round(total_story_points, 2),
-                "total_tasks": len(tasks),
+                "total_tasks": total_tasks,
                 "completed_tasks": completed_tasks,
                 "completion_rate": completion_rate
             }
@@ -679,38 +694,11 @@ class ReportsService:
                     {"assignee": request.user_id}  # For backward compatibility
                 ]
             
-            # Get tasks and analyze resource distribution
-            cursor = tasks_collection.find(query)
-            tasks = []
+            # Workload by assignee, counted on the server
+            pipeline = [{"$match": query}, *count_by(or_default("$assignee", "Unassigned"))]
             assignee_workload = {}
-            
-            async for doc in cursor:
-                task = JiraTask(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    jira_id=doc["jira_id"],
-                    key=doc["key"],
-                    summary=doc["summary"],
-                    status=doc["status"],
-                    priority=doc["priority"],
-                    assignee=doc["assignee"],
-                    assignee_account_id=doc.get("assignee_account_id"),
-                    assignee_email=doc.get("assignee_email"),
-                    story_points=doc.get("story_points"),
-                    start_date=doc.get("start_date"),
-                    sprint=doc.get("sprint"),
-                    created=doc["created"],
-                    updated=doc["updated"],
-                    duedate=doc["duedate"],
-                    project_key=doc["project_key"],
-                    project_name=doc["project_name"],
-                    issue_type=doc["issue_type"]
-                )
-                tasks.append(task)
-                
-                # Track workload by assignee
-                assignee = task.assignee or "Unassigned"
-                assignee_workload[assignee] = assignee_workload.get(assignee, 0) + 1
+            async for bucket in tasks_collection.aggregate(pipeline):
+                assignee_workload[bucket["_id"]] = bucket["count"]
             
             # Create data points
             data_points = []
@@ -749,14 +737,14 @@ class ReportsService:
     async def _generate_risk_analysis_report(self, user_id: str, request: ReportGenerationRequest) -> tuple:
         """Generate risk analysis report using risk service"""
         try:
-            from services.risk_service import run_risk_analysis
+            from services.risk_coordinator import request_risk_analysis
             
             db = get_database()
             tasks_collection = db.jira_tasks
             risks_collection = db.risk_alerts
             
-            # First, run risk analysis to ensure we have up-to-date risks
-            await run_risk_analysis(user_id)
+            # Make sure risks are up to date (a recent run is good enough)
+            await request_risk_analysis(user_id, max_age=settings.REPORT_RISK_MAX_AGE_SECONDS)
             
             # Build query for tasks
             query = {"user_id": user_id}
@@ -782,6 +770,7 @@ class ReportsService:
                     key=doc["key"],
                     summary=doc["summary"],
                     status=doc["status"],
+                    status_category=doc.get("status_category"),
                     priority=doc["priority"],
                     assignee=doc["assignee"],
                     assignee_account_id=doc.get("assignee_account_id"),
@@ -799,7 +788,7 @@ class ReportsService:
                 tasks.append(task)
             
             # Get risk alerts for the user with correct field mapping
-            risk_query = {"user_id": user_id}
+            risk_query = {"user_id": user_id, "status": "OPEN"}
             if request.project_key:
                 risk_query["project_key"] = request.project_key
             if request.user_id and request.user_id.strip():  # Only add if user_id is provided and not empty
@@ -843,9 +832,9 @@ class ReportsService:
                 ))
             
             # Also add task-based metrics
-            overdue_tasks = len([t for t in tasks if t.duedate and t.duedate < datetime.utcnow() and t.status not in ["Done", "Closed", "Resolved"]])
+            overdue_tasks = len([t for t in tasks if t.duedate and t.duedate < datetime.utcnow() and t.status_category != STATUS_CATEGORY_DONE])
             high_priority_tasks = len([t for t in tasks if t.priority in ["High", "Highest", "Critical"]])
-            in_progress_tasks = len([t for t in tasks if t.status in ["In Progress", "In Review"]])
+            in_progress_tasks = len([t for t in tasks if t.status_category == STATUS_CATEGORY_IN_PROGRESS])
             unassigned_tasks = len([t for t in tasks if not t.assignee_account_id])
             
             data_points.extend([
@@ -875,7 +864,7 @@ class ReportsService:
             total_risks = sum(risk_counts.values())
             critical_risks = risk_counts.get("CRITICAL", 0)
             high_risks = risk_counts.get("HIGH", 0)
-            completion_rate = round((len([t for t in tasks if t.status in ["Done", "Closed", "Resolved"]]) / len(tasks) * 100) if len(tasks) > 0 else 0, 2)
+            completion_rate = round((len([t for t in tasks if t.status_category == STATUS_CATEGORY_DONE]) / len(tasks) * 100) if len(tasks) > 0 else 0, 2)
             
             # Calculate risk exposure percentage
             high_risk_percentage = round(((critical_risks + high_risks) / total_risks * 100) if total_risks > 0 else 0, 2)
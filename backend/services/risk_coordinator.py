@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from config import settings
+from services.data_version_service import data_version_service
+from services.risk_service import run_risk_analysis
+from services.score_cache import score_cache
+from utils.clock import utcnow
+
+logger = logging.getLogger(__name__)
+
+
+class _UserRuns:
+    """Run bookkeeping for one user"""
+
+    def __init__(self):
+        self.in_flight: Optional[asyncio.Future] = None
+        # Start of the most recent run (in flight or finished); the debounce window opens here
+        self.in_flight_started: Optional[float] = None
+        self.follow_up: Optional[asyncio.Future] = None
+        self.follow_up_full = False
+        self.last_result: Optional[dict] = None
+        self.last_started: Optional[float] = None
+
+
+class RiskAnalysisCoordinator:
+    """
+    Single-flight, debounced risk analysis per user.
+
+    - A trigger with no run in flight starts one immediately, unless the last
+      run started less than `debounce_seconds` ago.
+    - Triggers that arrive while a run is in flight, or within that window,
+      share one follow-up run. It starts `debounce_seconds` after the current
+      run finishes (or after the last run started, when none is in flight) and
+      picks up whatever changed in the meantime.
+    - Callers passing `max_age` accept a run that started at most that many
+      seconds ago (or the one in flight) instead of forcing a new one.
+    """
+
+    def __init__(self, debounce_seconds: float = settings.RISK_DEBOUNCE_SECONDS):
+        self.debounce_seconds = debounce_seconds
+        self._users: Dict[str, _UserRuns] = {}
+
+    def _state(self, user_id: str) -> _UserRuns:
+        return self._users.setdefault(user_id, _UserRuns())
+
+    async def request(self, user_id: str, max_age: Optional[float] = None, full: bool = False) -> dict:
+        """Get a risk analysis result for the user, coalescing with other callers"""
+        state = self._state(user_id)
+        now = time.monotonic()
+
+        if max_age is not None and not full:
+            if state.in_flight is not None:
+                return await asyncio.shield(state.in_flight)
+            if state.last_result is not None and now - state.last_started <= max_age:
+                logger.info(f"♻️ Reusing risk analysis for user {user_id} from {now - state.last_started:.0f}s ago")
+                return state.last_result
+
+        recently_started = state.in_flight_started is not None and now - state.in_flight_started < self.debounce_seconds
+        if state.in_flight is None and state.follow_up is None and not recently_started:
+            return await asyncio.shield(self._start(user_id, full))
+
+        # A run is in flight (or about to start) and may read data older than this trigger,
+        # or one just ran and this trigger is part of the same burst: join the follow-up
+        state.follow_up_full = state.follow_up_full or full
+        if state.follow_up is None:
+            state.follow_up = asyncio.ensure_future(self._run_follow_up(user_id))
+        return await asyncio.shield(state.follow_up)
+
+    async def request_if_stale(self, user_id: str) -> Optional[dict]:
+        """Run risk analysis unless the data and the day are unchanged since the last run"""
+        version = await data_version_service.get_version(user_id)
+        if score_cache.get(user_id, "risk_analysis", version, utcnow()) is not None:
+            logger.info(f"⏭️ Risk scores for user {user_id} are current, skipping analysis")
+            return None
+        return await self.request(user_id)
+
+    def _start(self, user_id: str, full: bool) -> asyncio.Future:
+        state = self._state(user_id)
+        state.in_flight_started = time.monotonic()
+        state.in_flight = asyncio.ensure_future(self._run(user_id, full))
+        return state.in_flight
+
+    async def _run(self, user_id: str, full: bool) -> dict:
+        state = self._state(user_id)
+        started = state.in_flight_started
+        try:
+            result = await run_risk_analysis(user_id, full=full)
+            state.last_result = result
+            state.last_started = started
+            return result
+        finally:
+            state.in_flight = None
+
+    async def _run_follow_up(self, user_id: str) -> dict:
+        state = self._state(user_id)
+        # Let the current run finish (its outcome belongs to its own callers)
+        if state.in_flight is not None:
+            try:
+                await asyncio.shield(state.in_flight)
+            except Exception:
+                pass
+            delay = self.debounce_seconds
+        else:
+            # The last run already finished: the window counts from its start
+            delay = max(0.0, state.in_flight_started + self.debounce_seconds - time.monotonic())
+        # Absorb the rest of the burst, then become the in-flight run
+        await asyncio.sleep(delay)
+
+        full = state.follow_up_full
+        state.follow_up = None
+        state.follow_up_full = False
+        logger.info(f"🔁 Running coalesced risk analysis for user {user_id}")
+        return await asyncio.shield(self._start(user_id, full))
+
+# Create global risk analysis coordinator instance
+risk_coordinator = RiskAnalysisCoordinator()
+
+
+async def request_risk_analysis(user_id: str, max_age: Optional[float] = None, full: bool = False) -> dict:
+    """Trigger (or join) risk analysis for a user; see RiskAnalysisCoordinator"""
+    return await risk_coordinator.request(user_id, max_age=max_age, full=full)
@@ -0,0 +1,308 @@
+import logging
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from services.leave_index import LeaveIntervalIndex
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Rule table: bit position == rule order, so decoding a bitmask
+# lists reasons in the same order the per-task rules append them
+# -----------------------------
+
+RISK_RULES = [
+    ("unassigned", 15, "Task unassigned"),
+    ("leave_overlap", 40, "Assignee on leave during due date"),
+    ("due_2", 25, "Due in ≤ 2 days"),
+    ("due_5", 18, "Due in ≤ 5 days"),
+    ("due_10", 10, "Due in ≤ 10 days"),
+    ("overdue", 30, "Task is overdue"),
+    ("points_13", 20, "Very high effort task"),
+    ("points_8", 15, "High effort task"),
+    ("points_5", 10, "Medium effort task"),
+    ("priority_highest", 20, "Highest priority"),
+    ("priority_high", 15, "High priority"),
+    ("blocked", 25, "Task is blocked"),
+    ("active", 10, "Task in active state"),
+    ("todo_due_soon", 20, "To Do task due very soon"),
+    ("late_start", 15, "Late start, most time already consumed"),
+]
+RULE_BITS = {name: 1 << position for position, (name, _, _) in enumerate(RISK_RULES)}
+
+# Days-left thresholds of the due date rules (ascending); 3 only applies to To Do tasks
+DUE_THRESHOLD_DAYS = [2, 3, 5, 10]
+TODO_DUE_SOON_DAYS = 3
+
+# Compact level codes for the score history
+LEVEL_RANKS = {"LOW": 0, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
+RANK_LEVELS = {rank: level for level, rank in LEVEL_RANKS.items()}
+
+PRIORITY_CODES = {"Highest": 1, "High": 2}
+STATUS_CODES = {"Blocked": 1, "In Progress": 2, "In Review": 2, "To Do": 3}
+
+
+def calculate_risk_level(score: int) -> str:
+    if score >= 80:
+        return "CRITICAL"
+    elif score >= 60:
+        return "HIGH"
+    elif score >= 40:
+        return "MEDIUM"
+    return "LOW"
+
+
+def decode_reasons(bits: int) -> List[str]:
+    return [reason for position, (_, _, reason) in enumerate(RISK_RULES) if bits & (1 << position)]
+
+
+def _as_datetime(value) -> Optional[datetime]:
+    return value if isinstance(value, datetime) else None
+
+
+# -----------------------------
+# Scalar reference implementation (one task at a time)
+# -----------------------------
+
+def score_task(task: dict, today: date, leave_index: LeaveIntervalIndex) -> Tuple[int, List[str], Optional[Tuple[datetime, datetime]]]:
+    """Score one task; the vectorized engine must match this exactly"""
+    risk_score = 0
+    reasons = []
+    leave = None
+
+    assignee_id = task.get("assignee_account_id")
+    due_date = _as_datetime(task.get("duedate"))
+    start_date = _as_datetime(task.get("start_date"))
+    story_points = task.get("story_points")
+    priority = task.get("priority")
+    status = task.get("status")
+
+    if not assignee_id:
+        risk_score += 15
+        reasons.append("Task unassigned")
+
+    if assignee_id and due_date and assignee_id in leave_index:
+        leave = leave_index.find_overlap(assignee_id, due_date)
+        if leave:
+            risk_score += 40
+            reasons.append("Assignee on leave during due date")
+
+    if due_date:
+        days_left = (due_date.date() - today).days
+
+        if days_left <= 2:
+            risk_score += 25
+            reasons.append("Due in ≤ 2 days")
+        elif days_left <= 5:
+            risk_score += 18
+            reasons.append("Due in ≤ 5 days")
+        elif days_left <= 10:
+            risk_score += 10
+            reasons.append("Due in ≤ 10 days")
+        elif days_left < 0:  # Overdue
+            risk_score += 30
+            reasons.append("Task is overdue")
+
+    if story_points:
+        if story_points >= 13:
+            risk_score += 20
+            reasons.append("Very high effort task")
+        elif story_points >= 8:
+            risk_score += 15
+            reasons.append("High effort task")
+        elif story_points >= 5:
+            risk_score += 10
+            reasons.append("Medium effort task")
+
+    if priority == "Highest":
+        risk_score += 20
+        reasons.append("Highest priority")
+    elif priority == "High":
+        risk_score += 15
+        reasons.append("High priority")
+
+    if status == "Blocked":
+        risk_score += 25
+        reasons.append("Task is blocked")
+    elif status in ["In Progress", "In Review"]:
+        risk_score += 10
+        reasons.append("Task in active state")
+    elif status == "To Do" and due_date and (due_date.date() - today).days <= 3:
+        risk_score += 20
+        reasons.append("To Do task due very soon")
+
+    if start_date and due_date:
+        total_days = (due_date.date() - start_date.date()).days
+        days_used = (today - start_date.date()).days
+
+        if total_days > 0 and days_used / total_days > 0.75:
+            risk_score += 15
+            reasons.append("Late start, most time already consumed")
+
+    return risk_score, reasons, leave
+
+
+# -----------------------------
+# Vectorized engine
+# -----------------------------
+
+class RiskScores:
+    """Scores for a batch of tasks: totals, reason bitmasks, matched leave ranges and next change day"""
+
+    def __init__(
+        self,
+        scores: np.ndarray,
+        reason_bits: np.ndarray,
+        leave_start: np.ndarray,
+        leave_end: np.ndarray,
+        next_change: np.ndarray
+    ):
+        self.scores = scores
+        self.reason_bits = reason_bits
+        self.leave_start = leave_start
+        self.leave_end = leave_end
+        self.next_change = next_change
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def score(self, i: int) -> int:
+        return int(self.scores[i])
+
+    def reasons(self, i: int) -> List[str]:
+        return decode_reasons(int(self.reason_bits[i]))
+
+    def leave(self, i: int) -> Optional[Tuple[datetime, datetime]]:
+        if np.isnat(self.leave_start[i]):
+            return None
+        return (self.leave_start[i].astype(datetime), self.leave_end[i].astype(datetime))
+
+    def next_change_at(self, i: int) -> Optional[datetime]:
+        """Midnight (UTC) of the first day a date rule can flip for the task, None if never"""
+        if np.isnat(self.next_change[i]):
+            return None
+        return datetime.combine(self.next_change[i].astype(date), datetime.min.time())
+
+
+FRAME_COLUMNS = ["assignee_account_id", "duedate", "start_date", "story_points", "priority", "status"]
+
+
+def _datetime_column(values: pd.Series) -> np.ndarray:
+    # Columns pandas could not infer as datetimes (stray strings, out-of-range dates) go element-wise
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = values.map(_as_datetime).astype(object).astype("datetime64[us]")
+    return values.to_numpy(dtype="datetime64[us]")
+
+
+class TaskColumns:
+    """Task fields the rules read, as NumPy columns"""
+
+    def __init__(self, tasks: List[dict]):
+        # pandas builds the columns from the task dicts in C
+        frame = pd.DataFrame.from_records(tasks, columns=FRAME_COLUMNS, nrows=len(tasks))
+        self.count = len(tasks)
+
+        self.employee_codes, employees = pd.factorize(frame["assignee_account_id"])
+        self.employees = np.asarray(employees, dtype=object)
+        blank = [code for code, employee_id in enumerate(self.employees) if not employee_id]
+        self.employee_codes[np.isin(self.employee_codes, blank)] = -1
+
+        self.due_at = _datetime_column(frame["duedate"])
+        self.start_at = _datetime_column(frame["start_date"])
+        self.story_points = pd.to_numeric(frame["story_points"], errors="coerce").to_numpy(dtype=float)
+        self.priority = frame["priority"].map(PRIORITY_CODES).fillna(0).to_numpy(dtype=np.int8)
+        self.status = frame["status"].map(STATUS_CODES).fillna(0).to_numpy(dtype=np.int8)
+
+
+def score_tasks(tasks: List[dict], today: date, leave_index: LeaveIntervalIndex) -> RiskScores:
+    """Score all tasks at once with columnar arrays and per-rule masks"""
+    return score_columns(TaskColumns(tasks), today, leave_index)
+
+
+def score_columns(columns: TaskColumns, today: date, leave_index: LeaveIntervalIndex) -> RiskScores:
+    count = columns.count
+    today_day = np.datetime64(today, "D")
+
+    employee_codes, employees = columns.employee_codes, columns.employees
+    assigned = employee_codes >= 0
+    due_at, start_at = columns.due_at, columns.start_at
+    due_day = due_at.astype("datetime64[D]")
+    start_day = start_at.astype("datetime64[D]")
+    story_points, priority, status = columns.story_points, columns.priority, columns.status
+
+    has_due = ~np.isnat(due_at)
+    has_start = ~np.isnat(start_at)
+    days_left = np.where(has_due, (due_day - today_day).astype(np.int64), 0)
+
+    # Leave overlap: group candidate tasks by employee, one searchsorted per employee
+    leave_start = np.full(count, np.datetime64("NaT"), dtype="datetime64[us]")
+    leave_end = np.full(count, np.datetime64("NaT"), dtype="datetime64[us]")
+    candidates = np.flatnonzero(assigned & has_due)
+    candidates = candidates[np.argsort(employee_codes[candidates], kind="stable")]
+    codes, group_starts = np.unique(employee_codes[candidates], return_index=True)
+    for code, positions in zip(codes, np.split(candidates, group_starts[1:])):
+        employee_id = employees[code]
+        if employee_id not in leave_index:
+            continue
+        intervals = leave_index.intervals(employee_id)
+        starts = np.array([start for start, _ in intervals], dtype="datetime64[us]")
+        ends = np.array([end for _, end in intervals], dtype="datetime64[us]")
+        moments = due_at[positions]
+        found = np.searchsorted(starts, moments, side="right") - 1
+        safe = np.maximum(found, 0)
+        hit = (found >= 0) & (moments <= ends[safe])
+        leave_start[positions[hit]] = starts[safe[hit]]
+        leave_end[positions[hit]] = ends[safe[hit]]
+    on_leave = ~np.isnat(leave_start)
+
+    # Late start: share of the planned window already used
+    total_days = np.where(has_start & has_due, (due_day - start_day).astype(np.int64), 0)
+    days_used = np.where(has_start, (today_day - start_day).astype(np.int64), 0)
+    consumed = np.divide(days_used, total_days, out=np.zeros(count), where=total_days > 0)
+
+    due_2 = has_due & (days_left <= 2)
+    due_5 = has_due & ~due_2 & (days_left <= 5)
+    due_10 = has_due & ~due_2 & ~due_5 & (days_left <= 10)
+    points_13 = story_points >= 13
+    points_8 = ~points_13 & (story_points >= 8)
+    points_5 = ~points_13 & ~points_8 & (story_points >= 5)
+
+    masks = {
+        "unassigned": ~assigned,
+        "leave_overlap": on_leave,
+        "due_2": due_2,
+        "due_5": due_5,
+        "due_10": due_10,
+        "overdue": has_due & ~due_2 & ~due_5 & ~due_10 & (days_left < 0),
+        "points_13": points_13,
+        "points_8": points_8,
+        "points_5": points_5,
+        "priority_highest": priority == 1,
+        "priority_high": priority == 2,
+        "blocked": status == 1,
+        "active": status == 2,
+        "todo_due_soon": (status == 3) & has_due & (days_left <= 3),
+        "late_start": has_start & has_due & (total_days > 0) & (consumed > 0.75),
+    }
+
+    scores = np.zeros(count, dtype=np.int64)
+    reason_bits = np.zeros(count, dtype=np.int64)
+    for name, points, _ in RISK_RULES:
+        mask = masks[name]
+        scores += np.where(mask, points, 0)
+        reason_bits |= np.where(mask, RULE_BITS[name], 0)
+
+    # First future day on which a date rule can flip: days left reaching a
+    # due threshold, or the late-start share passing 75% (4 * used > 3 * total)
+    next_change = np.full(count, np.datetime64("NaT"), dtype="datetime64[D]")
+    for threshold in DUE_THRESHOLD_DAYS:
+        crosses = has_due & (days_left > threshold)
+        if threshold == TODO_DUE_SOON_DAYS:
+            crosses &= status == 3
+        next_change[crosses] = due_day[crosses] - np.timedelta64(threshold, "D")
+    pending_late = has_start & has_due & (total_days > 0) & ~masks["late_start"]
+    late_day = start_day + ((3 * total_days) // 4 + 1).astype("timedelta64[D]")
+    next_change = np.where(pending_late, np.fmin(next_change, late_day), next_change)
+
+    return RiskScores(scores, reason_bits, leave_start, leave_end, next_change)
@@ -0,0 +1,104 @@
+import logging
+from datetime import datetime
+from typing import List, Optional
+from db import get_database
+from services.risk_engine import LEVEL_RANKS, RANK_LEVELS, decode_reasons
+
+logger = logging.getLogger(__name__)
+
+HISTORY_COLLECTION = "risk_score_history"
+
+
+class RiskHistoryService:
+    """
+    Per-task risk score history in the risk_score_history time-series collection.
+
+    A point is written only when a task's score changes. Points are compact:
+    level ranks instead of names, and reasons as the engine's rule bitmask.
+    """
+
+    @staticmethod
+    def point(
+        user_id: str,
+        task_key: str,
+        ts: datetime,
+        score: int,
+        level: str,
+        previous_level: Optional[str],
+        reason_bits: int
+    ) -> dict:
+        return {
+            "ts": ts,
+            "meta": {"user_id": user_id, "task_key": task_key},
+            "score": score,
+            "rank": LEVEL_RANKS[level],
+            # -1: first score recorded for the task
+            "prev_rank": LEVEL_RANKS.get(previous_level, -1),
+            "bits": reason_bits
+        }
+
+    async def append(self, points: List[dict]):
+        try:
+            db = get_database()
+            await db[HISTORY_COLLECTION].insert_many(points, ordered=False)
+            logger.info(f"📈 Recorded {len(points)} risk score changes")
+
+        except Exception as e:
+            # History is best effort; the alerts themselves are already stored
+            logger.error(f"Failed to record risk score history: {e}")
+
+    async def get_task_history(self, user_id: str, task_key: str, since: datetime) -> List[dict]:
+        """Score changes of one task since a moment, oldest first"""
+        db = get_database()
+        cursor = db[HISTORY_COLLECTION].find(
+            {"meta.user_id": user_id, "meta.task_key": task_key, "ts": {"$gte": since}},
+            {"_id": 0, "ts": 1, "score": 1, "rank": 1, "bits": 1}
+        ).sort("ts", 1)
+
+        return [
+            {
+                "ts": doc["ts"],
+                "score": doc["score"],
+                "risk_level": RANK_LEVELS[doc["rank"]],
+                "reasons": decode_reasons(doc["bits"])
+            }
+            async for doc in cursor
+        ]
+
+    async def get_escalations(self, user_id: str, since: datetime, min_level: str = "HIGH", limit: int = 100) -> List[dict]:
+        """Tasks whose level went up to at least min_level since a moment, latest escalation per task"""
+        db = get_database()
+        pipeline = [
+            {"$match": {
+                "meta.user_id": user_id,
+                "ts": {"$gte": since},
+                "rank": {"$gte": LEVEL_RANKS[min_level]},
+                "$expr": {"$gt": ["$rank", "$prev_rank"]}
+            }},
+            {"$sort": {"ts": -1}},
+            {"$group": {
+                "_id": "$meta.task_key",
+                "ts": {"$first": "$ts"},
+                "score": {"$first": "$score"},
+                "rank": {"$first": "$rank"},
+                "prev_rank": {"$first": "$prev_rank"},
+                "bits": {"$first": "$bits"}
+            }},
+            {"$sort": {"ts": -1}},
+            {"$limit": limit}
+        ]
+
+        escalations = []
+        async for doc in db[HISTORY_COLLECTION].aggregate(pipeline):
+            escalations.append({
+                "task_key": doc["_id"],
+                "ts": doc["ts"],
+                "score": doc["score"],
+                "risk_level": RANK_LEVELS[doc["rank"]],
+                "previous_level": RANK_LEVELS.get(doc["prev_rank"]),
+                "reasons": decode_reasons(doc["bits"])
+            })
+        return escalations
+
+# Create global risk history service instance
+risk_history_service = RiskHistoryService()
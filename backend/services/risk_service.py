@@ -1,24 +1,33 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Collection, Optional
+from pymongo import InsertOne, UpdateOne
 from db import get_database
+from services.leave_index import load_leave_index
+from services.risk_engine import TaskColumns, score_columns, calculate_risk_level
+from services.compute_executor import compute_executor
+from services.data_version_service import data_version_service
+from services.score_cache import score_cache
+from services.risk_state_service import risk_state_service
+from services.risk_summary_service import risk_summary_service
+from services.risk_history_service import risk_history_service
+from services.event_bus import event_bus
+from utils.clock import utcnow, next_utc_midnight
+from config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
-# -----------------------------
-# Risk calculation helpers
-# -----------------------------
+# Fields kept when a resolved alert moves to risk_alerts_archive
+ARCHIVE_FIELDS = [
+    "user_id", "risk_key", "task_key", "project_key", "assignee_account_id",
+    "risk_level", "risk_score", "reasons", "created_at", "resolved_at"
+]
 
-def calculate_risk_level(score: int) -> str:
-    if score >= 80:
-        return "CRITICAL"
-    elif score >= 60:
-        return "HIGH"
-    elif score >= 40:
-        return "MEDIUM"
-    return "LOW"
 
+def risk_key_for(task_key: str, assignee_id: Optional[str]) -> str:
+    return f"{task_key}_{assignee_id or 'unassigned'}"
 
-async def run_risk_analysis(user_id: str = None):
+async def run_risk_analysis(user_id: str = None, full: bool = False):
     """
     Advanced risk analysis based on:
     - Leave overlap (when leave data exists)
@@ -28,160 +37,150 @@ async def run_risk_analysis(user_id: str = None):
     - Status
     - Start date delay
     - Unassigned tasks
+
+    Only tasks in the user's dirty set are rescored (changed by a sync, assigned
+    to employees whose leaves changed, or past their next date-rule change),
+    unless `full` is set or the periodic full rescan is due.
     """
 
     db = get_database()
     tasks = db.jira_tasks
-    leaves = db.leaves
     risks = db.risk_alerts
 
-    today = datetime.utcnow().date()
-    created = []
+    now = utcnow()
+    today = now.date()
+
+    # Captured before reading so a change made during the run invalidates its result
+    version = await data_version_service.get_version(user_id) if user_id else -1
 
-    # Track newly created risks in this run to avoid duplicates within the same execution
-    created_risk_keys = set()
-    
     # If user_id is provided, only process that user's data
     user_filter = {"user_id": user_id} if user_id else {}
 
-    # Get all employee IDs from current leave records for this user
-    leave_filter = user_filter.copy() if user_filter else {}
-    leave_employees_cursor = leaves.find(leave_filter, {"employee_account_id": 1})
-    leave_employee_ids = set()
-    async for leave_record in leave_employees_cursor:
-        if leave_record.get('employee_account_id'):
-            leave_employee_ids.add(leave_record['employee_account_id'])
-    
-    logger.info(f"📋 Found {len(leave_employee_ids)} unique employees with leave data: {list(leave_employee_ids)[:10]}...")
-
-    # Process ALL tasks for the user (not just those assigned to employees with leave data)
+    # Decide what to rescore; runs without a user always rescan everything
+    dirty = await risk_state_service.take_dirty(user_id) if user_id else None
+    full = full or dirty is None or dirty.full
+
+    # Process ALL open tasks for the user (not just those assigned to employees with leave data)
     # This allows us to calculate risks based on due dates, priority, status, etc. without leave data
-    task_filter = user_filter.copy()  # Process all tasks for this user
-    task_count = await tasks.count_documents(task_filter)
-    leave_count = len(leave_employee_ids)
-    logger.info(f"📊 Processing {task_count} tasks for risk analysis (including tasks without leave data)")
+    task_filter = {**user_filter, "is_open": True}
+    if not full:
+        task_filter["$or"] = [
+            {"key": {"$in": list(dirty.task_keys)}},
+            {"assignee_account_id": {"$in": list(dirty.employees)}},
+            {"risk_next_change": {"$lte": now}}
+        ]
+
+    try:
+        open_tasks = await tasks.find(task_filter).to_list(length=None)
+        logger.info(
+            f"📊 Processing {len(open_tasks)} tasks for {'full' if full else 'incremental'} risk analysis "
+            f"(including tasks without leave data)"
+        )
+
+        # Load the relevant leaves once; overlap checks below never touch Mongo
+        assignees = None if full else {task.get("assignee_account_id") for task in open_tasks} - {None, ""}
+        leave_index = await load_leave_index(user_id, assignees)
+        leave_employee_ids = leave_index.employee_ids
+        logger.info(f"📋 Found {len(leave_employee_ids)} unique employees with leave data: {leave_employee_ids[:10]}...")
+
+        # Existing alerts, keyed the same way the per-task lookup used to query them
+        risk_filter = dict(user_filter)
+        if not full:
+            risk_filter["task_key"] = {"$in": [task["key"] for task in open_tasks]}
+        existing_risks = {}
+        async for existing in risks.find(risk_filter, {"task_key": 1, "assignee_account_id": 1, "created_at": 1}):
+            existing_risks.setdefault((existing["task_key"], existing.get("assignee_account_id")), existing)
+
+        result = await _score_and_store(user_id, open_tasks, today, leave_index, existing_risks)
+
+        # Alerts of the tasks looked at (all of them on a full run) that no longer
+        # qualify: closed, deleted, reassigned or dropped to LOW
+        scope = None if full else {task["key"] for task in open_tasks} | dirty.task_keys
+        result["resolved"] = await resolve_stale_alerts(user_filter, result.pop("seen_keys"), scope, now)
+        if full:
+            result["archived"] = await archive_resolved_alerts(user_filter, now)
+        if user_id and (result["resolved"] or result.get("archived")):
+            await risk_summary_service.refresh(user_id)
+
+    except Exception:
+        if dirty is not None:
+            await risk_state_service.restore_dirty(user_id, dirty)
+        raise
+
+    if user_id:
+        await risk_state_service.record_run(user_id, full, len(open_tasks))
+        event_bus.publish(user_id, "risk.updated", {
+            "new_risks": result["count"],
+            "resolved": result["resolved"],
+            "scored": result["scored"],
+            "full": full
+        })
+        # Scores only depend on the date, so they hold until the next UTC midnight
+        score_cache.put(user_id, "risk_analysis", result, version, next_utc_midnight(now))
+
+    return result
+
+
+async def _score_and_store(user_id, open_tasks, today, leave_index, existing_risks) -> dict:
+    """Score tasks, upsert their alerts and remember when each task's date rules next change"""
+    db = get_database()
+    tasks = db.jira_tasks
+    risks = db.risk_alerts
+
+    created = []
+    risk_writes = []
+    task_writes = []
+    history_points = []
+    now = utcnow()
 
-    async for task in tasks.find(task_filter):
-        risk_score = 0
-        reasons = []
+    # Track newly created risks in this run to avoid duplicates within the same execution
+    created_risk_keys = set()
+    # Every alert that still qualifies; the rest of the scope gets resolved
+    seen_keys = set()
+
+    # Every rule (unassigned, leave overlap, due date, story points, priority,
+    # status, start date delay) is evaluated for all tasks at once; large
+    # batches ship their columns to a worker process
+    scored = await compute_executor.run(
+        score_columns, TaskColumns(open_tasks), today, leave_index, size=len(open_tasks)
+    )
+
+    for i, task in enumerate(open_tasks):
+        risk_score = scored.score(i)
+        reasons = scored.reasons(i)
+        overlap = scored.leave(i)
+        leave = {"leave_start": overlap[0], "leave_end": overlap[1]} if overlap else None
 
         assignee_id = task.get("assignee_account_id")
         assignee_name = task.get("assignee", "Unassigned")
-
         due_date = task.get("duedate")
         start_date = task.get("start_date")
-        story_points = task.get("story_points")
-        priority = task.get("priority")
-        status = task.get("status")
-
-        leave = None
-
-        # -----------------------------
-        # 0️⃣ UNASSIGNED TASK (REAL RISK)
-        # -----------------------------
-        if not assignee_id:
-            risk_score += 15
-            reasons.append("Task unassigned")
-
-        # -----------------------------
-        # 1️⃣ LEAVE OVERLAP (only if leave data exists for this assignee)
-        # -----------------------------
-        if assignee_id and due_date and assignee_id in leave_employee_ids:
-            logger.debug(f"🔍 Checking leave overlap for task {task['key']} (assignee: {assignee_id}, due: {due_date})")
-            
-            leave = await leaves.find_one({
-                "employee_account_id": assignee_id,
-                "leave_start": {"$lte": due_date},
-                "leave_end": {"$gte": due_date}
-            })
-
-            if leave:
-                risk_score += 40
-                reasons.append("Assignee on leave during due date")
-                logger.info(f"⚠️ Leave overlap found: {assignee_id} on leave {leave['leave_start'].date()} to {leave['leave_end'].date()} during task due date {due_date.date()}")
-            else:
-                # Debug: Check if there are any leaves for this assignee at all
-                assignee_leaves = await leaves.find({"employee_account_id": assignee_id}).to_list(None)
-                if assignee_leaves:
-                    logger.debug(f"📋 Found {len(assignee_leaves)} leaves for assignee {assignee_id}, but none overlap with due date {due_date.date()}")
-                else:
-                    logger.debug(f"❌ No leaves found for assignee {assignee_id}")
-
-        # -----------------------------
-        # 2️⃣ DUE DATE PROXIMITY (ALWAYS CALCULATED)
-        # -----------------------------
-        if due_date:
-            days_left = (due_date.date() - today).days
-
-            if days_left <= 2:
-                risk_score += 25
-                reasons.append("Due in ≤ 2 days")
-            elif days_left <= 5:
-                risk_score += 18
-                reasons.append("Due in ≤ 5 days")
-            elif days_left <= 10:
-                risk_score += 10
-                reasons.append("Due in ≤ 10 days")
-            elif days_left < 0:  # Overdue
-                risk_score += 30
-                reasons.append("Task is overdue")
-
-        # -----------------------------
-        # 3️⃣ STORY POINT COMPLEXITY (ALWAYS CALCULATED)
-        # -----------------------------
-        if story_points:
-            if story_points >= 13:
-                risk_score += 20
-                reasons.append("Very high effort task")
-            elif story_points >= 8:
-                risk_score += 15
-                reasons.append("High effort task")
-            elif story_points >= 5:
-                risk_score += 10
-                reasons.append("Medium effort task")
-
-        # -----------------------------
-        # 4️⃣ PRIORITY (ALWAYS CALCULATED)
-        # -----------------------------
-        if priority == "Highest":
-            risk_score += 20
-            reasons.append("Highest priority")
-        elif priority == "High":
-            risk_score += 15
-            reasons.append("High priority")
-
-        # -----------------------------
-        # 5️⃣ STATUS RISK (ALWAYS CALCULATED)
-        # -----------------------------
-        if status == "Blocked":
-            risk_score += 25
-            reasons.append("Task is blocked")
-        elif status in ["In Progress", "In Review"]:
-            risk_score += 10
-            reasons.append("Task in active state")
-        elif status == "To Do" and due_date and (due_date.date() - today).days <= 3:
-            # High risk if "To Do" task is due soon
-            risk_score += 20
-            reasons.append("To Do task due very soon")
-
-        # -----------------------------
-        # 6️⃣ START DATE DELAY (ALWAYS CALCULATED)
-        # -----------------------------
-        if start_date and due_date:
-            total_days = (due_date.date() - start_date.date()).days
-            days_used = (today - start_date.date()).days
-
-            if total_days > 0 and days_used / total_days > 0.75:
-                risk_score += 15
-                reasons.append("Late start, most time already consumed")
 
         # -----------------------------
         # FINAL RISK
         # -----------------------------
         risk_level = calculate_risk_level(risk_score)
 
+        # The task keeps its last score; history only grows when it moves
+        task_update = {}
+        next_change = scored.next_change_at(i)
+        if task.get("risk_next_change") != next_change:
+            task_update["risk_next_change"] = next_change
+        if task.get("risk_score") != risk_score:
+            task_update["risk_score"] = risk_score
+            task_update["risk_level"] = risk_level
+            # Exported columns changed: incremental extracts must pick the task up again
+            task_update["modified_at"] = now
+            history_points.append(risk_history_service.point(
+                task.get("user_id", user_id), task["key"], now, risk_score,
+                risk_level, task.get("risk_level"), int(scored.reason_bits[i])
+            ))
+        if task_update:
+            task_writes.append(UpdateOne({"_id": task["_id"]}, {"$set": task_update}))
+
         if risk_level in ["CRITICAL", "HIGH", "MEDIUM"]:
-            risk_key = f"{task['key']}_{assignee_id or 'unassigned'}"
+            risk_key = risk_key_for(task["key"], assignee_id)
+            seen_keys.add(risk_key)
             
             # Skip if we already created a risk for this task-assignee combination in this run
             if risk_key in created_risk_keys:
@@ -189,16 +188,10 @@ async def run_risk_analysis(user_id: str = None):
                 continue
             
             # Check if a similar risk already exists in database for this user
-            risk_filter = {
-                "task_key": task["key"],
-                "assignee_account_id": assignee_id
-            }
-            if user_id:
-                risk_filter["user_id"] = user_id
-            
-            existing_risk = await risks.find_one(risk_filter)
+            existing_risk = existing_risks.get((task["key"], assignee_id))
             
             risk_doc = {
+                "risk_key": risk_key,
                 "task_key": task["key"],
                 "task_title": task.get("summary"),
                 "project_key": task.get("project_key"),  # Add project key
@@ -228,16 +221,16 @@ async def run_risk_analysis(user_id: str = None):
                 risk_doc["created_at"] = existing_risk.get("created_at")
                 risk_doc["updated_at"] = datetime.utcnow()
                 # Update the existing risk document
-                await risks.update_one(
+                risk_writes.append(UpdateOne(
                     {"_id": existing_risk["_id"]},
-                    {"$set": risk_doc}
-                )
+                    {"$set": risk_doc, "$unset": {"resolved_at": ""}}
+                ))
                 logger.info(
                     f"⚠️ Updated {risk_level} risk for {task['key']} | score={risk_score}"
                 )
             else:
                 # Insert new risk document
-                await risks.insert_one(risk_doc)
+                risk_writes.append(InsertOne(risk_doc))
                 created.append(risk_doc)
                 created_risk_keys.add(risk_key)  # Track that we created this risk
 
@@ -245,9 +238,66 @@ async def run_risk_analysis(user_id: str = None):
                     f"⚠️ {risk_level} | {task['key']} | score={risk_score}"
                 )
 
+    # One round trip for all alert writes
+    if risk_writes:
+        await risks.bulk_write(risk_writes, ordered=False)
+    if task_writes:
+        await tasks.bulk_write(task_writes, ordered=False)
+    if history_points:
+        await risk_history_service.append(history_points)
+    if risk_writes and user_id:
+        await risk_summary_service.refresh(user_id)
+
     logger.info(f"🚨 Created {len(created)} risk alerts")
 
     return {
         "count": len(created),
+        "scored": len(open_tasks),
+        "seen_keys": seen_keys,
         "message": "Advanced risk analysis completed"
     }
+
+
+async def resolve_stale_alerts(
+    user_filter: dict,
+    seen_keys: Collection[str],
+    task_keys: Optional[Collection[str]],
+    now: datetime
+) -> int:
+    """Mark OPEN alerts RESOLVED when the run did not see them; task_keys limits this to the tasks looked at"""
+    if task_keys is not None and not task_keys:
+        return 0
+
+    stale_filter = {**user_filter, "status": "OPEN", "risk_key": {"$nin": list(seen_keys)}}
+    if task_keys is not None:
+        stale_filter["task_key"] = {"$in": list(task_keys)}
+
+    result = await get_database().risk_alerts.update_many(
+        stale_filter,
+        {"$set": {"status": "RESOLVED", "resolved_at": now, "updated_at": now}}
+    )
+    if result.modified_count:
+        logger.info(f"✅ Resolved {result.modified_count} risk alerts that no longer apply")
+    return result.modified_count
+
+
+async def archive_resolved_alerts(user_filter: dict, now: datetime) -> int:
+    """Move alerts resolved longer than the retention window to risk_alerts_archive (TTL-expired there)"""
+    db = get_database()
+    cutoff = now - timedelta(days=settings.RISK_ALERT_RETENTION_DAYS)
+    old_filter = {**user_filter, "status": "RESOLVED", "resolved_at": {"$lt": cutoff}}
+
+    if not await db.risk_alerts.count_documents(old_filter, limit=1):
+        return 0
+
+    # Copy server-side, then drop from the hot collection; re-running after a
+    # failure in between only overwrites the same archive documents
+    await db.risk_alerts.aggregate([
+        {"$match": old_filter},
+        {"$project": {**{field: 1 for field in ARCHIVE_FIELDS}, "archived_at": {"$literal": now}}},
+        {"$merge": {"into": "risk_alerts_archive", "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}}
+    ]).to_list(length=None)
+    result = await db.risk_alerts.delete_many(old_filter)
+
+    logger.info(f"📦 Archived {result.deleted_count} resolved risk alerts")
+    return result.deleted_count
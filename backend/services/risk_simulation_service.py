@@ -0,0 +1,141 @@
+import logging
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+from db import get_database
+from models.risk_alert import RiskSimulationRequest, RiskSimulationResult, RiskSimulationChange
+from services.leave_index import LeaveIntervalIndex, load_leave_index
+from services.risk_engine import FRAME_COLUMNS, RiskScores, TaskColumns, calculate_risk_level, score_columns, score_tasks
+from services.compute_executor import compute_executor
+from services.data_version_service import data_version_service
+from services.score_cache import score_cache
+from utils.clock import utcnow, next_utc_midnight
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FIELDS = {"_id": 0, "key": 1, **{field: 1 for field in FRAME_COLUMNS}}
+
+
+class RiskSnapshot:
+    """A tenant's open tasks, leaves and baseline scores for one day, held in memory"""
+
+    def __init__(self, tasks: List[dict], leave_index: LeaveIntervalIndex, baseline: RiskScores, today: date):
+        self.tasks = tasks
+        self.leave_index = leave_index
+        self.baseline = baseline
+        self.today = today
+        self.positions: Dict[str, int] = {task["key"]: i for i, task in enumerate(tasks)}
+        self.by_level = Counter(calculate_risk_level(baseline.score(i)) for i in range(len(tasks)))
+        self.employee_positions: Dict[str, List[int]] = {}
+        for i, task in enumerate(tasks):
+            if task.get("assignee_account_id"):
+                self.employee_positions.setdefault(task["assignee_account_id"], []).append(i)
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Stored dates are naive UTC; requests may carry offsets
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class RiskSimulationService:
+    """What-if risk scoring against an in-memory snapshot; never writes"""
+
+    async def get_snapshot(self, user_id: str) -> RiskSnapshot:
+        """Snapshot for the current data version and UTC day, built once and then reused"""
+        now = utcnow()
+        version = await data_version_service.get_version(user_id)
+        snapshot = score_cache.get(user_id, "risk_snapshot", version, now)
+        if snapshot is not None:
+            return snapshot
+
+        db = get_database()
+        tasks = await db.jira_tasks.find({"user_id": user_id, "is_open": True}, SNAPSHOT_FIELDS).to_list(length=None)
+        leave_index = await load_leave_index(user_id)
+        baseline = await compute_executor.run(
+            score_columns, TaskColumns(tasks), now.date(), leave_index, size=len(tasks)
+        )
+
+        snapshot = RiskSnapshot(tasks, leave_index, baseline, now.date())
+        score_cache.put(user_id, "risk_snapshot", snapshot, version, next_utc_midnight(now))
+        logger.info(f"📸 Built risk snapshot for user {user_id}: {len(tasks)} open tasks")
+        return snapshot
+
+    async def simulate(self, user_id: str, request: RiskSimulationRequest) -> RiskSimulationResult:
+        """
+        Rescore only the tasks a scenario can touch: overridden tasks and tasks
+        of employees given hypothetical leave. Raises ValueError for bad input.
+        """
+        snapshot = await self.get_snapshot(user_id)
+
+        unknown = [override.task_key for override in request.task_overrides if override.task_key not in snapshot.positions]
+        if unknown:
+            raise ValueError(f"Unknown or closed tasks: {', '.join(unknown)}")
+        for leave in request.leaves:
+            if leave.leave_end < leave.leave_start:
+                raise ValueError(f"Leave for {leave.employee_account_id} ends before it starts")
+
+        tasks = {}
+        for override in request.task_overrides:
+            position = snapshot.positions[override.task_key]
+            changes = override.model_dump(exclude_unset=True, exclude={"task_key"})
+            changes = {field: _naive_utc(value) if isinstance(value, datetime) else value for field, value in changes.items()}
+            tasks[position] = {**tasks.get(position, snapshot.tasks[position]), **changes}
+
+        leave_employees = {leave.employee_account_id for leave in request.leaves}
+        for employee_id in leave_employees:
+            for position in snapshot.employee_positions.get(employee_id, []):
+                tasks.setdefault(position, snapshot.tasks[position])
+
+        # Leaves of everyone the affected tasks are assigned to, plus the hypothetical ones
+        employees = {task.get("assignee_account_id") for task in tasks.values()} - {None, ""}
+        leaves = [
+            {"employee_account_id": employee_id, "leave_start": start, "leave_end": end}
+            for employee_id in employees
+            for start, end in snapshot.leave_index.intervals(employee_id)
+        ]
+        leaves.extend(
+            {
+                "employee_account_id": leave.employee_account_id,
+                "leave_start": _naive_utc(leave.leave_start),
+                "leave_end": _naive_utc(leave.leave_end)
+            }
+            for leave in request.leaves
+        )
+
+        positions = list(tasks)
+        scored = score_tasks([tasks[position] for position in positions], snapshot.today, LeaveIntervalIndex.from_leaves(leaves))
+
+        changes = []
+        by_level_after = Counter(snapshot.by_level)
+        for i, position in enumerate(positions):
+            before, after = snapshot.baseline.score(position), scored.score(i)
+            reasons_before, reasons_after = snapshot.baseline.reasons(position), scored.reasons(i)
+            if before == after and reasons_before == reasons_after:
+                continue
+
+            level_before, level_after = calculate_risk_level(before), calculate_risk_level(after)
+            by_level_after[level_before] -= 1
+            by_level_after[level_after] += 1
+            changes.append(RiskSimulationChange(
+                task_key=tasks[position]["key"],
+                assignee_account_id=tasks[position].get("assignee_account_id"),
+                score_before=before,
+                score_after=after,
+                level_before=level_before,
+                level_after=level_after,
+                reasons_added=[reason for reason in reasons_after if reason not in reasons_before],
+                reasons_removed=[reason for reason in reasons_before if reason not in reasons_after]
+            ))
+
+        changes.sort(key=lambda change: change.score_after - change.score_before, reverse=True)
+        return RiskSimulationResult(
+            evaluated=len(positions),
+            changes=changes,
+            by_level_before=dict(snapshot.by_level),
+            by_level_after=dict(by_level_after)
+        )
+
+# Create global risk simulation service instance
+risk_simulation_service = RiskSimulationService()
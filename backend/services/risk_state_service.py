@@ -0,0 +1,101 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from pymongo import ReturnDocument
+from db import get_database
+from utils.clock import utcnow
+
+logger = logging.getLogger(__name__)
+
+# Safety net: rescore every open task at least this often
+FULL_RESCAN_INTERVAL = timedelta(hours=24)
+
+# Past this many dirty task keys a full rescan is cheaper than an $in query
+MAX_DIRTY_KEYS = 5000
+
+
+class RiskDirtySet:
+    """What needs rescoring since the last risk run"""
+
+    def __init__(self, doc: Optional[dict] = None):
+        doc = doc or {}
+        self.task_keys = set(doc.get("dirty_task_keys", []))
+        self.employees = set(doc.get("dirty_employees", []))
+        self.full = bool(doc.get("full_pending")) or not doc.get("last_full_at")
+        self.last_full_at = doc.get("last_full_at")
+
+    def __bool__(self) -> bool:
+        return self.full or bool(self.task_keys) or bool(self.employees)
+
+
+class RiskStateService:
+    """Per-user dirty set for incremental risk analysis (collection: risk_state)"""
+
+    async def mark_dirty(
+        self,
+        user_id: str,
+        task_keys: Iterable[str] = (),
+        employees: Iterable[str] = (),
+        full: bool = False
+    ):
+        """Record tasks (by key) and employees (by account id) whose risk needs rescoring"""
+        try:
+            db = get_database()
+            task_keys = [key for key in task_keys if key]
+            employees = [employee for employee in employees if employee]
+
+            if full or len(task_keys) > MAX_DIRTY_KEYS:
+                await db.risk_state.update_one(
+                    {"_id": user_id},
+                    {"$set": {"full_pending": True, "dirty_task_keys": [], "dirty_employees": []}},
+                    upsert=True
+                )
+                return
+
+            if not task_keys and not employees:
+                return
+
+            await db.risk_state.update_one(
+                {"_id": user_id},
+                {"$addToSet": {
+                    "dirty_task_keys": {"$each": task_keys},
+                    "dirty_employees": {"$each": employees}
+                }},
+                upsert=True
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to mark risk state dirty for user {user_id}: {e}")
+
+    async def take_dirty(self, user_id: str) -> RiskDirtySet:
+        """Atomically read and clear a user's dirty set"""
+        db = get_database()
+        doc = await db.risk_state.find_one_and_update(
+            {"_id": user_id},
+            {"$set": {"dirty_task_keys": [], "dirty_employees": [], "full_pending": False}},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        dirty = RiskDirtySet(doc)
+        if dirty.last_full_at and utcnow() - dirty.last_full_at >= FULL_RESCAN_INTERVAL:
+            dirty.full = True
+        return dirty
+
+    async def restore_dirty(self, user_id: str, dirty: RiskDirtySet):
+        """Put a taken dirty set back after a failed run"""
+        await self.mark_dirty(user_id, dirty.task_keys, dirty.employees, full=dirty.full)
+
+    async def record_run(self, user_id: str, full: bool, scored: int):
+        try:
+            db = get_database()
+            now = utcnow()
+            update = {"last_run_at": now, "last_run_scored": scored}
+            if full:
+                update["last_full_at"] = now
+            await db.risk_state.update_one({"_id": user_id}, {"$set": update}, upsert=True)
+
+        except Exception as e:
+            logger.error(f"Failed to record risk run for user {user_id}: {e}")
+
+# Create global risk state service instance
+risk_state_service = RiskStateService()
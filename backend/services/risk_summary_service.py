@@ -0,0 +1,73 @@
+import logging
+from typing import Optional
+from pymongo import ReturnDocument
+from db import get_database
+from models.risk_alert import RiskSummary
+from utils.clock import utcnow
+
+logger = logging.getLogger(__name__)
+
+RISK_LEVELS = ["CRITICAL", "HIGH", "MEDIUM"]
+
+
+class RiskSummaryService:
+    """Maintains one counter document per user in risk_summaries, refreshed after alert writes"""
+
+    async def refresh(self, user_id: str) -> Optional[RiskSummary]:
+        """Recount a user's alerts; bumps the version only when the counts or timestamps moved"""
+        try:
+            db = get_database()
+            pipeline = [
+                {"$match": {"user_id": user_id, "status": "OPEN"}},
+                {"$group": {
+                    "_id": "$risk_level",
+                    "count": {"$sum": 1},
+                    "latest_created_at": {"$max": "$created_at"},
+                    "latest_updated_at": {"$max": "$updated_at"}
+                }}
+            ]
+
+            by_level = {level: 0 for level in RISK_LEVELS}
+            latest_created_at = None
+            latest_updated_at = None
+            async for doc in db.risk_alerts.aggregate(pipeline):
+                by_level[doc["_id"] or "UNKNOWN"] = doc["count"]
+                if doc.get("latest_created_at") and (latest_created_at is None or doc["latest_created_at"] > latest_created_at):
+                    latest_created_at = doc["latest_created_at"]
+                if doc.get("latest_updated_at") and (latest_updated_at is None or doc["latest_updated_at"] > latest_updated_at):
+                    latest_updated_at = doc["latest_updated_at"]
+
+            summary = {
+                "total": sum(by_level.values()),
+                "by_level": by_level,
+                "latest_created_at": latest_created_at,
+                "latest_updated_at": latest_updated_at
+            }
+
+            # Only a real change moves the version (and so the ETag)
+            current = await db.risk_summaries.find_one({"_id": user_id})
+            if current and all(current.get(field) == value for field, value in summary.items()):
+                return RiskSummary(**{**summary, "version": current.get("version", 0)})
+
+            doc = await db.risk_summaries.find_one_and_update(
+                {"_id": user_id},
+                {"$set": {**summary, "refreshed_at": utcnow()}, "$inc": {"version": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return RiskSummary(**{**summary, "version": doc["version"]})
+
+        except Exception as e:
+            logger.error(f"Failed to refresh risk summary for user {user_id}: {e}")
+            return None
+
+    async def get_summary(self, user_id: str) -> RiskSummary:
+        """Read the counter document (one _id lookup); computes it on first use"""
+        db = get_database()
+        doc = await db.risk_summaries.find_one({"_id": user_id})
+        if doc is None:
+            return await self.refresh(user_id) or RiskSummary()
+        return RiskSummary(**doc)
+
+# Create global risk summary service instance
+risk_summary_service = RiskSummaryService()
@@ -0,0 +1,124 @@
+import logging
+from typing import List, Optional, Dict, Any
+from datetime import datetime, timedelta
+from db import get_database
+from models.task_status import STATUS_CATEGORIES
+
+logger = logging.getLogger(__name__)
+
+# Trends compare today's counts with the rollup this many days back
+TREND_PERIOD_DAYS = 7
+
+
+def start_of_day(moment: datetime) -> datetime:
+    return datetime.combine(moment.date(), datetime.min.time())
+
+
+def percent_change(current: float, previous: Optional[float]) -> float:
+    """Period-over-period change in percent, 0.0 when there is no baseline"""
+    if not previous:
+        return 0.0
+    return round((current - previous) / previous * 100, 1)
+
+
+def _buckets(docs: List[dict]) -> List[Dict[str, Any]]:
+    # Stored as name/count pairs: assignee names may contain "." or "$"
+    return [{"name": doc["_id"], "count": doc["n"]} for doc in docs]
+
+
+class RollupService:
+    async def write_daily_rollup(self, user_id: str, now: Optional[datetime] = None) -> Optional[dict]:
+        """Write (or refresh) today's task snapshot rollup for a user"""
+        try:
+            db = get_database()
+            now = now or datetime.utcnow()
+            day = start_of_day(now)
+
+            def group_by(field):
+                return [
+                    {"$group": {"_id": {"$ifNull": [field, "Unknown"]}, "n": {"$sum": 1}}},
+                    {"$sort": {"n": -1}}
+                ]
+
+            pipeline = [
+                {"$match": {"user_id": user_id}},
+                {"$facet": {
+                    "total": [{"$count": "n"}],
+                    "by_status_category": group_by("$status_category"),
+                    "by_priority": group_by("$priority"),
+                    "by_issue_type": group_by("$issue_type"),
+                    "by_assignee": group_by("$assignee"),
+                    "overdue": [
+                        {"$match": {"is_open": True, "duedate": {"$lt": now}}},
+                        {"$count": "n"}
+                    ]
+                }}
+            ]
+
+            result = await db.jira_tasks.aggregate(pipeline).to_list(length=1)
+            facets = result[0] if result else {}
+
+            by_status_category = {category: 0 for category in STATUS_CATEGORIES}
+            for doc in facets.get("by_status_category", []):
+                by_status_category[doc["_id"]] = doc["n"]
+
+            total = facets["total"][0]["n"] if facets.get("total") else 0
+            overdue = facets["overdue"][0]["n"] if facets.get("overdue") else 0
+
+            rollup = {
+                "user_id": user_id,
+                "day": day,
+                "total": total,
+                "overdue": overdue,
+                "by_status_category": by_status_category,
+                "by_priority": _buckets(facets.get("by_priority", [])),
+                "by_issue_type": _buckets(facets.get("by_issue_type", [])),
+                "by_assignee": _buckets(facets.get("by_assignee", [])),
+                "generated_at": now
+            }
+
+            await db.task_daily_rollups.update_one(
+                {"user_id": user_id, "day": day},
+                {"$set": rollup},
+                upsert=True
+            )
+
+            logger.info(f"Wrote daily rollup for user {user_id} ({day.date()}): {total} tasks")
+            return rollup
+
+        except Exception as e:
+            logger.error(f"Failed to write daily rollup for user {user_id}: {e}")
+            return None
+
+    async def get_rollups(self, user_id: str, days: int = 30, now: Optional[datetime] = None) -> List[dict]:
+        """Get a user's rollups for the last `days` days, oldest first"""
+        try:
+            db = get_database()
+            since = start_of_day(now or datetime.utcnow()) - timedelta(days=days - 1)
+
+            cursor = db.task_daily_rollups.find(
+                {"user_id": user_id, "day": {"$gte": since}},
+                {"_id": 0}
+            ).sort("day", 1)
+            return await cursor.to_list(length=days)
+
+        except Exception as e:
+            logger.error(f"Failed to get rollups for user {user_id}: {e}")
+            return []
+
+    async def get_rollup_on_or_before(self, user_id: str, day: datetime) -> Optional[dict]:
+        """Get the most recent rollup written on or before `day`"""
+        try:
+            db = get_database()
+            return await db.task_daily_rollups.find_one(
+                {"user_id": user_id, "day": {"$lte": start_of_day(day)}},
+                {"_id": 0},
+                sort=[("day", -1)]
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to get rollup for user {user_id}: {e}")
+            return None
+
+# Create global rollup service instance
+rollup_service = RollupService()
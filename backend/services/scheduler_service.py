@@ -3,7 +3,7 @@ import logging
 from datetime import datetime, timedelta
 from db import get_database
 from services.jira_service import jira_service
-from services.risk_service import run_risk_analysis
+from services.risk_coordinator import risk_coordinator, request_risk_analysis
 
 logger = logging.getLogger(__name__)
 
@@ -59,7 +59,7 @@ class SchedulerService:
                         
                         # Run risk analysis for this user after successful sync
                         try:
-                            risk_result = await run_risk_analysis(user_id)
+                            risk_result = await request_risk_analysis(user_id)
                             logger.info(f"Risk analysis completed for user {user_id}: {risk_result['count']} risks found")
                         except Exception as risk_error:
                             logger.error(f"Risk analysis failed for user {user_id}: {risk_error}")
@@ -89,9 +89,10 @@ class SchedulerService:
                     user_id = user_doc["_id"]
                     logger.info(f"Running risk analysis for user {user_id}")
                     
-                    # Run risk analysis for this user
-                    risk_result = await run_risk_analysis(str(user_id))
-                    logger.info(f"Risk analysis completed for user {user_id}: {risk_result['count']} risks found")
+                    # Run risk analysis for this user (skipped when nothing could have changed)
+                    risk_result = await risk_coordinator.request_if_stale(str(user_id))
+                    if risk_result:
+                        logger.info(f"Risk analysis completed for user {user_id}: {risk_result['count']} risks found")
                     
                 except Exception as e:
                     logger.error(f"Failed to run risk analysis for user {user_doc['_id']}: {e}")
@@ -0,0 +1,42 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreCache:
+    """
+    In-process cache for time-dependent scores.
+
+    Each entry remembers the data version it was computed from and the next
+    instant at which any score could change (the earliest threshold crossing).
+    An entry is served until either the data version moves or that instant passes.
+    """
+
+    def __init__(self):
+        # (user_id, name) -> (data version, valid until, value)
+        self._entries: Dict[Tuple[str, str], Tuple[int, datetime, Any]] = {}
+
+    def get(self, user_id: str, name: str, version: int, now: datetime) -> Optional[Any]:
+        entry = self._entries.get((user_id, name))
+        if entry is None or version < 0:
+            return None
+
+        entry_version, valid_until, value = entry
+        if entry_version != version or now >= valid_until:
+            return None
+        return value
+
+    def put(self, user_id: str, name: str, value: Any, version: int, valid_until: datetime):
+        if version < 0:
+            return
+        self._entries[(user_id, name)] = (version, valid_until, value)
+        logger.debug(f"Cached {name} for user {user_id} until {valid_until}")
+
+    def invalidate(self, user_id: str, name: Optional[str] = None):
+        for key in [key for key in self._entries if key[0] == user_id and (name is None or key[1] == name)]:
+            del self._entries[key]
+
+# Create global score cache instance
+score_cache = ScoreCache()
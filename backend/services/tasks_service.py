@@ -1,12 +1,73 @@
 import logging
-from typing import List, Optional
+import re
+from typing import List, Optional, Tuple
 from datetime import datetime
 from db import get_database
 from models.jira import JiraTask
-from models.tasks import TaskFilter
+from models.tasks import TaskFilter, TaskSuggestion, summary_tokens
 
 logger = logging.getLogger(__name__)
 
+# Jira issue keys look like "SCRUM-12"; "SCRUM-" and "SCRUM-1" are key prefixes
+KEY_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9_]*-\d*$")
+
+
+def build_search_clause(search: str) -> Tuple[dict, bool]:
+    """Build an index-backed search predicate.
+
+    Key-like input is an anchored prefix match on the (user_id, key) index,
+    anything else a $text query. Returns (clause, is_text_query).
+    """
+    term = search.strip()
+    if KEY_PATTERN.match(term):
+        return {"key": {"$regex": f"^{term.upper()}"}}, False
+    return {"$text": {"$search": term}}, True
+
+
+def build_prefix_clause(prefix: str) -> Optional[dict]:
+    """Partial-word predicate: key prefix, or every typed word as a prefix of a summary word.
+
+    $text only matches whole stemmed words, so partial input ("migr") goes
+    through anchored regexes on the (user_id, summary_tokens) multikey index.
+    Used by typeahead and by the Tasks page filter. None when the input has
+    no words (only spaces or punctuation), which matches nothing.
+    """
+    term = prefix.strip()
+    if KEY_PATTERN.match(term):
+        return {"key": {"$regex": f"^{term.upper()}"}}
+    words = summary_tokens(term)[:5]
+    if not words:
+        return None
+    return {"$and": [{"summary_tokens": {"$regex": f"^{re.escape(word)}"}} for word in words]}
+
+
+def task_from_doc(doc: dict) -> JiraTask:
+    """Build a JiraTask from a jira_tasks document"""
+    return JiraTask(
+        id=str(doc["_id"]),
+        user_id=doc["user_id"],
+        jira_id=doc["jira_id"],
+        key=doc["key"],
+        summary=doc["summary"],
+        status=doc["status"],
+        status_category=doc.get("status_category"),
+        is_open=doc.get("is_open"),
+        priority=doc["priority"],
+        assignee=doc["assignee"],
+        assignee_email=doc.get("assignee_email"),
+        assignee_account_id=doc.get("assignee_account_id"),
+        story_points=doc.get("story_points"),
+        start_date=doc.get("start_date"),
+        sprint=doc.get("sprint"),
+        created=doc["created"],
+        updated=doc["updated"],
+        duedate=doc["duedate"],
+        project_key=doc["project_key"],
+        project_name=doc["project_name"],
+        issue_type=doc["issue_type"]
+    )
+
+
 class TasksService:
     async def get_tasks(self, user_id: str, filter_params: TaskFilter, page: int = 1, size: int = 50) -> dict:
         """Get tasks for a user with filtering and pagination"""
@@ -17,11 +78,11 @@ class TasksService:
             # Build query based on filters
             query = {"user_id": user_id}
             
-            if filter_params.search:
-                query["$or"] = [
-                    {"summary": {"$regex": filter_params.search, "$options": "i"}},
-                    {"key": {"$regex": filter_params.search, "$options": "i"}}
-                ]
+            if filter_params.search and filter_params.search.strip():
+                search_clause = build_prefix_clause(filter_params.search)
+                if search_clause is None:
+                    return {"tasks": [], "total": 0, "page": page, "size": size}
+                query.update(search_clause)
             
             if filter_params.status:
                 query["status"] = filter_params.status
@@ -45,28 +106,7 @@ class TasksService:
             cursor = tasks_collection.find(query).skip(skip).limit(size).sort("updated", -1)
             tasks = []
             async for doc in cursor:
-                task = JiraTask(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    jira_id=doc["jira_id"],
-                    key=doc["key"],
-                    summary=doc["summary"],
-                    status=doc["status"],
-                    priority=doc["priority"],
-                    assignee=doc["assignee"],
-                    assignee_email=doc.get("assignee_email"),
-                    assignee_account_id=doc.get("assignee_account_id"),
-                    story_points=doc.get("story_points"),
-                    start_date=doc.get("start_date"),
-                    sprint=doc.get("sprint"),
-                    created=doc["created"],
-                    updated=doc["updated"],
-                    duedate=doc["duedate"],
-                    project_key=doc["project_key"],
-                    project_name=doc["project_name"],
-                    issue_type=doc["issue_type"]
-                )
-                tasks.append(task)
+                tasks.append(task_from_doc(doc))
             
             return {
                 "tasks": tasks,
@@ -84,6 +124,74 @@ class TasksService:
                 "size": size
             }
 
+    async def search_tasks(self, user_id: str, search: str, page: int = 1, size: int = 20) -> dict:
+        """Ranked task search: key matches ordered by key (exact match first), text matches by score"""
+        try:
+            db = get_database()
+            tasks_collection = db.jira_tasks
+            
+            search_clause, is_text = build_search_clause(search)
+            query = {"user_id": user_id, **search_clause}
+            skip = (page - 1) * size
+            
+            total = await tasks_collection.count_documents(query)
+            
+            if is_text:
+                cursor = tasks_collection.find(
+                    query, {"score": {"$meta": "textScore"}}
+                ).sort([("score", {"$meta": "textScore"}), ("updated", -1)])
+            else:
+                cursor = tasks_collection.find(query).sort("key", 1)
+            
+            tasks = []
+            async for doc in cursor.skip(skip).limit(size):
+                tasks.append(task_from_doc(doc))
+            
+            return {
+                "tasks": tasks,
+                "total": total,
+                "page": page,
+                "size": size
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to search tasks for user {user_id}: {e}")
+            return {
+                "tasks": [],
+                "total": 0,
+                "page": page,
+                "size": size
+            }
+
+    async def suggest_tasks(self, user_id: str, prefix: str, limit: int = 8) -> List[TaskSuggestion]:
+        """Typeahead suggestions: a handful of ids, keys and summaries, no counts"""
+        try:
+            prefix_clause = build_prefix_clause(prefix)
+            if prefix_clause is None:
+                return []
+            
+            db = get_database()
+            tasks_collection = db.jira_tasks
+            
+            query = {"user_id": user_id, **prefix_clause}
+            projection = {"key": 1, "summary": 1, "status": 1}
+            cursor = tasks_collection.find(query, projection).sort("key", 1)
+            
+            suggestions = []
+            async for doc in cursor.limit(limit):
+                suggestions.append(TaskSuggestion(
+                    id=str(doc["_id"]),
+                    key=doc["key"],
+                    summary=doc.get("summary", ""),
+                    status=doc.get("status", "")
+                ))
+            
+            return suggestions
+            
+        except Exception as e:
+            logger.error(f"Failed to suggest tasks for user {user_id}: {e}")
+            return []
+
     async def get_task_by_id(self, user_id: str, task_id: str) -> Optional[JiraTask]:
         """Get a specific task by ID"""
         try:
@@ -100,6 +208,8 @@ class TasksService:
                     key=doc["key"],
                     summary=doc["summary"],
                     status=doc["status"],
+                    status_category=doc.get("status_category"),
+                    is_open=doc.get("is_open"),
                     priority=doc["priority"],
                     assignee=doc["assignee"],
                     assignee_email=doc.get("assignee_email"),
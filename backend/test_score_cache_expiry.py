@@ -0,0 +1,178 @@
+import asyncio
+import importlib
+import random
+from datetime import datetime, timedelta
+from services.dashboard_service import calculate_urgency, dashboard_service
+from services.leave_index import LeaveIntervalIndex
+from services.risk_engine import score_task, score_tasks
+from services.score_cache import ScoreCache
+from utils.clock import FixedClock, set_clock, utcnow, next_utc_midnight
+
+# services/__init__ re-exports the service instance under the module's name
+dashboard_module = importlib.import_module("services.dashboard_service")
+
+TICK = timedelta(microseconds=1)
+
+
+class PipelineCollection:
+    """Runs the $match / $facet / $sort / $limit / $project stages next_urgency_change uses over a list"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    @staticmethod
+    def _matches(doc, query):
+        for field, condition in query.items():
+            value = doc.get(field)
+            if isinstance(condition, dict):
+                if "$gte" in condition and not (value is not None and value >= condition["$gte"]):
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    def _run(self, docs, pipeline):
+        for stage in pipeline:
+            (operator, spec), = stage.items()
+            if operator == "$match":
+                docs = [doc for doc in docs if self._matches(doc, spec)]
+            elif operator == "$sort":
+                (field, direction), = spec.items()
+                docs = sorted(docs, key=lambda doc: doc[field], reverse=direction < 0)
+            elif operator == "$limit":
+                docs = docs[:spec]
+            elif operator == "$project":
+                docs = [{field: doc[field] for field, keep in spec.items() if keep and field in doc} for doc in docs]
+            elif operator == "$facet":
+                docs = [{name: self._run(docs, stages) for name, stages in spec.items()}]
+        return docs
+
+    def aggregate(self, pipeline):
+        collection = self
+
+        class Cursor:
+            async def to_list(self, length=None):
+                return collection._run(list(collection.docs), pipeline)[:length]
+
+        return Cursor()
+
+
+class FakeDatabase:
+    def __init__(self, tasks):
+        self.jira_tasks = PipelineCollection(tasks)
+
+
+def test_midnight_expiry():
+    """Date-based entries are served until UTC midnight and recomputed after it"""
+    clock = FixedClock(datetime(2026, 3, 15, 23, 59, 58))
+    set_clock(clock)
+    try:
+        cache = ScoreCache()
+        cache.put("user", "risk_snapshot", "monday", 7, next_utc_midnight(utcnow()))
+
+        clock.advance(seconds=1)
+        assert cache.get("user", "risk_snapshot", 7, utcnow()) == "monday", "entry expired before midnight"
+        assert cache.get("user", "risk_snapshot", 8, utcnow()) is None, "entry served for a newer data version"
+
+        clock.advance(seconds=1)
+        assert cache.get("user", "risk_snapshot", 7, utcnow()) is None, "entry served after midnight"
+    finally:
+        set_clock()
+    print("✅ Snapshot cache hits before UTC midnight and misses after it")
+
+
+def urgencies(clock, tasks, moment):
+    clock.set(moment)
+    return [calculate_urgency(task) for task in tasks]
+
+
+def test_next_urgency_change():
+    """next_urgency_change is the first instant any open task's urgency can move, never later"""
+    now = datetime(2026, 3, 15, 9, 30)
+    # Due dates on and around each day threshold (N + 1 days ahead), plus far, near and past ones
+    dues = [now + timedelta(days=days + 1) + shift for days in (10, 5, 2) for shift in (-TICK, timedelta(0), TICK, timedelta(hours=7))]
+    dues += [now + timedelta(days=40), now + timedelta(hours=3), now - timedelta(days=1)]
+    tasks = [
+        {"user_id": "user", "is_open": True, "duedate": due, "status": "To Do", "key": f"SCRUM-{i}"}
+        for i, due in enumerate(dues)
+    ]
+
+    clock = FixedClock(now)
+    set_clock(clock)
+    original_get_database = dashboard_module.get_database
+    try:
+        moment = now
+        crossings = 0
+        # Walk from one reported crossing to the next until nothing is left to cross
+        while True:
+            dashboard_module.get_database = lambda: FakeDatabase(tasks)
+            crossing = asyncio.run(dashboard_service.next_urgency_change("user", moment))
+            if crossing == dashboard_module.NO_DUE_DATE_SORT:
+                break
+            assert crossing >= moment, f"crossing {crossing} is before {moment}"
+
+            before = urgencies(clock, tasks, moment)
+            # No urgency moves up to the reported instant (an entry cached until then is never stale)...
+            assert urgencies(clock, tasks, crossing) == before, f"urgency moved before {crossing}"
+            # ...and it is not reported early: some task moves right after it
+            assert urgencies(clock, tasks, crossing + TICK) != before, f"nothing moved at {crossing}"
+
+            moment = crossing + TICK
+            crossings += 1
+
+        # Past the last crossing nothing moves any more
+        assert urgencies(clock, tasks, moment) == urgencies(clock, tasks, moment + timedelta(days=60))
+    finally:
+        dashboard_module.get_database = original_get_database
+        set_clock()
+    print(f"✅ next_urgency_change reported {crossings} urgency crossings exactly at their thresholds")
+
+
+def test_risk_next_change():
+    """next_change_at is the UTC midnight a date rule first flips: same score the day before, a new one that day"""
+    rng = random.Random(20260315)
+    today = datetime(2026, 3, 15).date()
+    base = datetime(2026, 3, 15, 12)
+    leave_index = LeaveIntervalIndex()
+    tasks = []
+    for i in range(400):
+        due = base + timedelta(days=rng.randint(-3, 25), hours=rng.randint(-12, 11)) if rng.random() < 0.9 else None
+        start = base - timedelta(days=rng.randint(0, 30)) if rng.random() < 0.7 else None
+        tasks.append({
+            "key": f"SCRUM-{i}",
+            "assignee_account_id": rng.choice(["acc-1", "acc-2", None]),
+            "duedate": due,
+            "start_date": start,
+            "story_points": rng.choice([None, 3, 8]),
+            "priority": rng.choice(["High", "Medium"]),
+            "status": rng.choice(["To Do", "In Progress", "Blocked", "Done"]),
+        })
+
+    scored = score_tasks(tasks, today, leave_index)
+    flips = 0
+    for i, task in enumerate(tasks):
+        current = score_task(task, today, leave_index)[:2]
+        next_change = scored.next_change_at(i)
+        horizon = next_change.date() if next_change else today + timedelta(days=60)
+
+        if next_change:
+            assert next_change == next_utc_midnight(next_change - TICK), f"{task['key']}: {next_change} is not a UTC midnight"
+            assert next_change.date() > today, f"{task['key']}: change {next_change} is not in the future"
+
+        day = today + timedelta(days=1)
+        while day < horizon:
+            assert score_task(task, day, leave_index)[:2] == current, f"{task['key']}: score moved on {day}, before {next_change}"
+            day += timedelta(days=1)
+
+        if next_change:
+            assert score_task(task, next_change.date(), leave_index)[:2] != current, f"{task['key']}: nothing flipped on {next_change}"
+            flips += 1
+
+    assert flips, "no task had a pending date rule"
+    print(f"✅ risk next_change_at matches the day a rule flips for {flips} tasks (and never for the rest)")
+
+
+if __name__ == "__main__":
+    test_midnight_expiry()
+    test_next_urgency_change()
+    test_risk_next_change()
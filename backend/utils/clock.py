@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class SystemClock:
+    """Wall clock (naive UTC, like datetime.utcnow)"""
+
+    def now(self) -> datetime:
+        return datetime.utcnow()
+
+
+class FixedClock:
+    """Clock frozen at a given instant; tests move it with set()/advance()"""
+
+    def __init__(self, moment: datetime):
+        self.moment = moment
+
+    def now(self) -> datetime:
+        return self.moment
+
+    def set(self, moment: datetime):
+        self.moment = moment
+
+    def advance(self, **kwargs):
+        self.moment += timedelta(**kwargs)
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    return _clock
+
+
+def set_clock(clock: Optional[object] = None):
+    """Swap the process clock (None restores the system clock)"""
+    global _clock
+    _clock = clock or SystemClock()
+
+
+def utcnow() -> datetime:
+    """Current time according to the process clock"""
+    return _clock.now()
+
+
+def next_utc_midnight(moment: datetime) -> datetime:
+    """First instant of the following UTC day; date-based scores can only change there"""
+    return datetime.combine(moment.date(), datetime.min.time()) + timedelta(days=1)
@@ -1,6 +1,6 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from services.auth_service import auth_service
+from services.auth_service import auth_service, EVENTS_TICKET_SCOPE
 from models.auth import UserInDB
 from typing import Optional
 import logging
@@ -41,6 +41,26 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     logger.info(f"✅ User authenticated: {user.email} (verified: {user.is_verified})")
     return user
 
+async def get_current_user_from_ticket(
+    ticket: Optional[str] = Query(None, description="Stream ticket from POST /api/events/ticket (EventSource cannot send headers)")
+) -> UserInDB:
+    """Get current user from a short-lived ?ticket= issued for the event stream"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired stream ticket",
+    )
+    if not ticket:
+        raise credentials_exception
+
+    token_data = await auth_service.verify_token(ticket, scope=EVENTS_TICKET_SCOPE)
+    if token_data is None or token_data.email is None:
+        raise credentials_exception
+
+    user = await auth_service.get_user_by_email(token_data.email)
+    if user is None:
+        raise credentials_exception
+    return user
+
 async def get_current_verified_user(current_user: UserInDB = Depends(get_current_user)) -> UserInDB:
     """Get current verified user"""
     logger.info(f"📝 Checking verification status for: {current_user.email}")
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { Button } from '@/components/ui/button';
 import { AlertTriangle } from 'lucide-react';
 import { riskService } from '@/services/risks';
+import { eventService } from '@/services/events';
 import { useNavigate } from 'react-router-dom';
 
 const RiskIndicator = () => {
@@ -11,8 +12,9 @@ const RiskIndicator = () => {
 
   useEffect(() => {
     fetchRiskCount();
-    // Set up polling to check for new risks
-    const interval = setInterval(fetchRiskCount, 30000); // Check every 30 seconds
+    // Risk changes are pushed over /api/events; the slow poll only covers a dropped stream
+    eventService.connect();
+    const interval = setInterval(fetchRiskCount, 300000); // Fallback every 5 minutes
     
     // Listen for risk-update events to refresh immediately
     const handleRiskUpdate = () => {
@@ -24,13 +26,14 @@ const RiskIndicator = () => {
     return () => {
       clearInterval(interval);
       window.removeEventListener('risk-update', handleRiskUpdate);
+      eventService.disconnect();
     };
   }, []);
 
   const fetchRiskCount = async () => {
     try {
-      const risks = await riskService.getAllRisks();
-      setRiskCount(risks.length);
+      const summary = await riskService.getRiskSummary();
+      setRiskCount(summary.total);
       setLoading(false);
     } catch (error) {
       console.error('Failed to fetch risk count:', error);
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { AlertTriangle, X } from 'lucide-react';
 import { riskService } from '@/services/risks';
+import { eventService } from '@/services/events';
 import { useNavigate } from 'react-router-dom';
 import { Button } from '@/components/ui/button';
 
@@ -12,15 +13,21 @@ const RiskNotification = () => {
 
   useEffect(() => {
     checkForNewRisks();
-    // Set up polling to check for new risks
-    const interval = setInterval(checkForNewRisks, 60000); // Check every minute
-    return () => clearInterval(interval);
+    // New risks are pushed over /api/events; the slow poll only covers a dropped stream
+    eventService.connect();
+    const interval = setInterval(checkForNewRisks, 300000); // Fallback every 5 minutes
+    window.addEventListener('risk-update', checkForNewRisks);
+    return () => {
+      clearInterval(interval);
+      window.removeEventListener('risk-update', checkForNewRisks);
+      eventService.disconnect();
+    };
   }, []);
 
   const checkForNewRisks = async () => {
     try {
-      const risks = await riskService.getAllRisks();
-      const currentRiskCount = risks.length;
+      const summary = await riskService.getRiskSummary();
+      const currentRiskCount = summary.total;
       
       setRiskCount(currentRiskCount);
       
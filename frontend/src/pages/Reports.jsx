@@ -114,8 +114,8 @@ const reportTypes = [
 ];
 
 const exportFormats = [
-  { id: "pdf", name: "PDF" },
   { id: "csv", name: "CSV" },
+  { id: "ndjson", name: "JSON Lines" },
   { id: "excel", name: "Excel" }
 ];
 
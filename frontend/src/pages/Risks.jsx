@@ -42,6 +42,9 @@ const Info = ({ label, value, icon: Icon }) => (
 
 const Risks = () => {
   const [risks, setRisks] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalRisks, setTotalRisks] = useState(0);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -53,10 +56,10 @@ const Risks = () => {
     try {
       setLoading(true);
       console.log('Fetching risks...');
-      const data = await riskService.getAllRisks();
-      console.log('Received risks data:', data);
-      console.log('Number of risks:', data.length);
-      setRisks(data);
+      const [page, summary] = await Promise.all([riskService.getRisksPage({ status: 'OPEN' }), riskService.getRiskSummary()]);
+      setRisks(page.risks);
+      setNextCursor(page.nextCursor);
+      setTotalRisks(summary.total);
     } catch (err) {
       setError('Failed to fetch risks');
       console.error('Error fetching risks:', err);
@@ -65,6 +68,19 @@ const Risks = () => {
     }
   };
 
+  const loadMoreRisks = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await riskService.getRisksPage({ status: 'OPEN', cursor: nextCursor });
+      setRisks((current) => [...current, ...page.risks]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Error loading more risks:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const formatDate = (dateString) => {
     if (!dateString) return 'N/A';
     const date = new Date(dateString);
@@ -114,10 +130,10 @@ const Risks = () => {
     try {
       setLoading(true);
       console.log('Refreshing risks...');
-      const data = await riskService.getAllRisks();
-      console.log('Received refreshed risks data:', data);
-      console.log('Number of refreshed risks:', data.length);
-      setRisks(data);
+      const [page, summary] = await Promise.all([riskService.getRisksPage({ status: 'OPEN' }), riskService.getRiskSummary()]);
+      setRisks(page.risks);
+      setNextCursor(page.nextCursor);
+      setTotalRisks(summary.total);
     } catch (err) {
       setError('Failed to fetch risks');
       console.error('Error fetching risks:', err);
@@ -157,7 +173,7 @@ const Risks = () => {
           </button>
           <Badge variant="secondary" className="text-lg py-1 px-3">
             <AlertTriangle className="mr-2 h-4 w-4" />
-            {risks.length} Active Risks
+            {Math.max(totalRisks, risks.length)} Active Risks
           </Badge>
         </div>
       </div>
@@ -236,6 +252,15 @@ const Risks = () => {
 </Card>
 
           ))}
+          {nextCursor && (
+            <button
+              onClick={loadMoreRisks}
+              disabled={loadingMore}
+              className="px-4 py-2 border rounded-md hover:bg-muted disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          )}
         </div>
       )}
     </div>
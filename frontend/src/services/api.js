@@ -7,7 +7,9 @@ class ApiService {
     this.baseURL = API_BASE_URL;
   }
 
-  async request(endpoint, options = {}) {
+  // options.withHeaders: resolve to { data, headers } instead of just the parsed body
+  // options.asBlob: resolve to { blob, headers } for file downloads
+  async request(endpoint, { withHeaders = false, asBlob = false, ...options } = {}) {
     const url = `${this.baseURL}${endpoint}`;
     // Build headers: don't force JSON Content-Type when sending FormData
     const headers = {
@@ -50,19 +52,25 @@ class ApiService {
         throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
       }
 
+      if (asBlob) {
+        return { blob: await response.blob(), headers: response.headers };
+      }
+
       const responseText = await response.text();
       console.log('Response text:', responseText);
       
+      let data;
       if (!responseText) {
-        return {};
-      }
-      
-      try {
-        return JSON.parse(responseText);
-      } catch (e) {
-        console.error('Failed to parse JSON response:', e);
-        return { message: responseText };
+        data = {};
+      } else {
+        try {
+          data = JSON.parse(responseText);
+        } catch (e) {
+          console.error('Failed to parse JSON response:', e);
+          data = { message: responseText };
+        }
       }
+      return withHeaders ? { data, headers: response.headers } : data;
     } catch (error) {
       console.error('API request failed:', error);
       throw error;
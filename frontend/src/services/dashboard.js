@@ -35,6 +35,16 @@ class DashboardService {
     }
   }
 
+  async getTaskTrends(days = 30) {
+    try {
+      const response = await apiService.get(`${this.basePath}/trends?days=${days}`);
+      return { success: true, data: response.trends || [] };
+    } catch (error) {
+      console.error('Failed to fetch task trends:', error);
+      return { success: false, error: error.message };
+    }
+  }
+
   async getAnalyticsData() {
     try {
       const response = await apiService.get(`${this.basePath}/analytics`);
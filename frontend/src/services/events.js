@@ -0,0 +1,94 @@
+import { apiService } from './api';
+
+// Server events re-dispatched as window events the components already listen for
+const WINDOW_EVENTS = {
+  'risk.updated': 'risk-update',
+  'sync.completed': 'sync-complete',
+  'sync.failed': 'sync-failed',
+  'leave.processed': 'leave-processed',
+  'report.completed': 'report-complete',
+  'report.progress': 'report-progress',
+  // Missed too many events while disconnected: refetch
+  resync: 'risk-update',
+};
+
+// Delay before reopening a stream the browser gave up on (e.g. its ticket expired)
+const REOPEN_DELAY_MS = 5000;
+
+class EventService {
+  constructor() {
+    this.source = null;
+    this.users = 0;
+    this.lastEventId = null;
+    this.reopenTimer = null;
+  }
+
+  // Open the shared /api/events stream. The URL carries a short-lived ticket rather than
+  // the access token; EventSource resumes with Last-Event-ID while the ticket is valid,
+  // and once it is rejected the stream is reopened here with a fresh ticket.
+  connect() {
+    this.users += 1;
+    if (this.users === 1) this.open();
+  }
+
+  async open() {
+    if (this.source || !localStorage.getItem('access_token')) return;
+
+    let ticket;
+    try {
+      ({ ticket } = await apiService.post('/api/events/ticket'));
+    } catch (error) {
+      console.error('Failed to get event stream ticket:', error);
+      this.scheduleReopen();
+      return;
+    }
+    // Disconnected (or already reopened) while the ticket was on its way
+    if (this.users === 0 || this.source) return;
+
+    const params = new URLSearchParams({ ticket });
+    if (this.lastEventId) params.append('resume_after', this.lastEventId);
+    const source = new EventSource(`${apiService.baseURL}/api/events?${params}`);
+    this.source = source;
+
+    Object.entries(WINDOW_EVENTS).forEach(([type, windowEvent]) => {
+      source.addEventListener(type, (event) => {
+        if (event.lastEventId) this.lastEventId = event.lastEventId;
+        let detail = {};
+        try {
+          detail = JSON.parse(event.data);
+        } catch (e) {
+          // heartbeat or empty payload
+        }
+        window.dispatchEvent(new CustomEvent(windowEvent, { detail }));
+      });
+    });
+
+    source.onerror = () => {
+      if (source.readyState !== EventSource.CLOSED) return;
+      source.close();
+      if (this.source === source) this.source = null;
+      this.scheduleReopen();
+    };
+  }
+
+  scheduleReopen() {
+    if (this.users === 0 || this.reopenTimer) return;
+    this.reopenTimer = setTimeout(() => {
+      this.reopenTimer = null;
+      this.open();
+    }, REOPEN_DELAY_MS);
+  }
+
+  disconnect() {
+    this.users = Math.max(0, this.users - 1);
+    if (this.users > 0) return;
+    clearTimeout(this.reopenTimer);
+    this.reopenTimer = null;
+    if (this.source) {
+      this.source.close();
+      this.source = null;
+    }
+  }
+}
+
+export const eventService = new EventService();
@@ -46,6 +46,37 @@ class ReportsService {
     }
   }
 
+  // Queue a report in the background; progress arrives as 'report-progress' window events
+  async generateReportAsync(reportData) {
+    try {
+      const response = await apiService.post(`${this.basePath}/generate?async=true`, reportData);
+      return { success: true, data: response };
+    } catch (error) {
+      console.error('Failed to queue report:', error);
+      return { success: false, error: error.message };
+    }
+  }
+
+  async getReportJob(jobId) {
+    try {
+      const response = await apiService.get(`${this.basePath}/jobs/${jobId}`);
+      return { success: true, data: response };
+    } catch (error) {
+      console.error(`Failed to fetch report job ${jobId}:`, error);
+      return { success: false, error: error.message };
+    }
+  }
+
+  async cancelReportJob(jobId) {
+    try {
+      const response = await apiService.delete(`${this.basePath}/jobs/${jobId}`);
+      return { success: true, data: response };
+    } catch (error) {
+      console.error(`Failed to cancel report job ${jobId}:`, error);
+      return { success: false, error: error.message };
+    }
+  }
+
   async deleteReport(reportId) {
     try {
       const response = await apiService.delete(`${this.basePath}/${reportId}`);
@@ -56,10 +87,23 @@ class ReportsService {
     }
   }
 
+  // Downloads the exported file (CSV, NDJSON or XLSX) straight to the browser
   async exportReport(reportId, exportData) {
     try {
-      const response = await apiService.post(`${this.basePath}/${reportId}/export`, exportData);
-      return { success: true, data: response };
+      const { blob, headers } = await apiService.post(`${this.basePath}/${reportId}/export`, exportData, { asBlob: true });
+      const disposition = headers.get('Content-Disposition') || '';
+      const filename = disposition.match(/filename="([^"]+)"/)?.[1] || `report-${reportId}`;
+
+      const url = URL.createObjectURL(blob);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = filename;
+      document.body.appendChild(link);
+      link.click();
+      link.remove();
+      URL.revokeObjectURL(url);
+
+      return { success: true, data: { filename } };
     } catch (error) {
       console.error(`Failed to export report ${reportId}:`, error);
       return { success: false, error: error.message };
@@ -1,19 +1,45 @@
 import { apiService } from './api';
 
 class RiskService {
-  async getAllRisks() {
+  // One page of alerts, newest first; pass nextCursor back to get the following page
+  async getRisksPage({ cursor, limit = 50, level, projectKey, assignee, status } = {}) {
     try {
-      console.log('Calling risk service getAllRisks');
-      const risks = await apiService.get('/api/risks');
-      console.log('Risk service received:', risks);
-      console.log('Risk service array length:', Array.isArray(risks) ? risks.length : 'Not an array');
-      return risks;
+      const params = new URLSearchParams({ limit: String(limit) });
+      if (cursor) params.append('cursor', cursor);
+      if (level) params.append('level', level);
+      if (projectKey) params.append('project_key', projectKey);
+      if (assignee) params.append('assignee', assignee);
+      if (status) params.append('status', status);
+
+      const { data, headers } = await apiService.get(`/api/risks?${params.toString()}`, { withHeaders: true });
+      return { risks: data, nextCursor: headers.get('X-Next-Cursor') };
     } catch (error) {
       console.error('Error fetching risks:', error);
       throw error;
     }
   }
 
+  async getAllRisks(filters = {}) {
+    const risks = [];
+    let cursor = null;
+    do {
+      const page = await this.getRisksPage({ ...filters, cursor, limit: 200 });
+      risks.push(...page.risks);
+      cursor = page.nextCursor;
+    } while (cursor);
+    return risks;
+  }
+
+  // Counts only; the browser revalidates with If-None-Match and gets a 304 while nothing changed
+  async getRiskSummary() {
+    try {
+      return await apiService.get('/api/risks/summary', { cache: 'no-cache' });
+    } catch (error) {
+      console.error('Error fetching risk summary:', error);
+      throw error;
+    }
+  }
+
   async checkRisks() {
     try {
       const result = await apiService.get('/api/risks/check');
@@ -30,6 +30,17 @@ class TasksService {
     }
   }
 
+  async suggestTasks(query, limit = 8) {
+    try {
+      const params = new URLSearchParams({ q: query, limit });
+      const response = await apiService.get(`${this.basePath}/suggest?${params.toString()}`);
+      return { success: true, data: response.suggestions || [] };
+    } catch (error) {
+      console.error('Failed to fetch task suggestions:', error);
+      return { success: false, error: error.message };
+    }
+  }
+
   async getTaskById(taskId) {
     try {
       const response = await apiService.get(`${this.basePath}/${taskId}`);